@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import pandas as pd
+
+from collections import Counter
+from TweetStatistics import FollowStatistics
+from TweetTimeIndex import parse_dates
+
+
+#Columns of the author profile aggregate
+PROFILE_COLUMNS = ['author', 'account_category', 'publish_date', 'following', 'followers']
+
+
+class TweetAggregator:
+    """
+    Class containing aggregates of the processed tweets that can be updated one chunk of tweets at a time, so that summary
+    data is available without keeping every tweet in memory. Aggregators built on separate chunks, such as in separate
+    processes, can be combined with the merge method.
+    """
+    def __init__(self):
+        """
+        Initialize empty aggregates:
+        1) Number of tweets by account category
+        2) Number of tweets containing each hash tag
+        3) Set of distinct hash tags by account category
+        4) Latest following/followers figures for each author and account category
+        5) Statistics of the following/followers figures of every tweet, overall and by account category
+        """
+        self.rows = 0
+        self.category_counts = Counter()
+        self.hashtag_counts = Counter()
+        self.category_hashtags = {}
+        self.author_profiles = pd.DataFrame(columns=PROFILE_COLUMNS)
+        self.tweet_follow_statistics = FollowStatistics()
+
+    def update(self, df):
+        """
+        Method to add a chunk of processed tweets to the aggregates.
+        """
+        self.rows += len(df)
+        self.category_counts.update(df['account_category'].value_counts().to_dict())
+
+        #Hash tags are counted once per tweet, as in the hash tag index
+        hashtags = df[['account_category', 'hash_tags']].explode('hash_tags').dropna().reset_index().drop_duplicates()
+        self.hashtag_counts.update(hashtags['hash_tags'].value_counts().to_dict())
+        for category, tags in hashtags.groupby('account_category')['hash_tags']:
+            self.category_hashtags.setdefault(category, set()).update(tags)
+
+        #Keep the latest tweet of each author in the chunk, then combine it with the latest tweets of previous chunks
+        profiles = df[PROFILE_COLUMNS].copy()
+        profiles['publish_date'] = parse_dates(profiles['publish_date'])
+        self.author_profiles = self.latest_profiles([self.author_profiles, profiles])
+        self.tweet_follow_statistics.update(df)
+
+    def merge(self, other):
+        """
+        Method to combine the aggregates of another aggregator into this aggregator.
+        """
+        self.rows += other.rows
+        self.category_counts.update(other.category_counts)
+        self.hashtag_counts.update(other.hashtag_counts)
+        for category, tags in other.category_hashtags.items():
+            self.category_hashtags.setdefault(category, set()).update(tags)
+        self.author_profiles = self.latest_profiles([self.author_profiles, other.author_profiles])
+        self.tweet_follow_statistics.merge(other.tweet_follow_statistics)
+
+        return self
+
+    @staticmethod
+    def latest_profiles(frames):
+        """
+        Function to return the latest row of each author and account category from a list of profile dataframes.
+        """
+        frames = [df for df in frames if len(df) > 0]
+        if len(frames) == 0:
+            return pd.DataFrame(columns=PROFILE_COLUMNS)
+        
+        profiles = pd.concat(frames, ignore_index=True).sort_values(by='publish_date', kind='stable')
+
+        return profiles.drop_duplicates(subset=['author', 'account_category'], keep='last').reset_index(drop=True)
+
+    def get_follow_statistics(self, k=200):
+        """
+        Function to return the followers/following statistics of the latest profile of each author, as used by TweetCalculator.
+        The author profiles are already aggregated, so no pass over the tweets is needed.
+        """
+        return FollowStatistics(k).update(self.author_profiles)
+
+    def get_cat_hash_tags(self, cat_list):
+        """
+        Function to return a list containing the set of hash tags of each account category in cat_list.
+        """
+        return [self.category_hashtags.get(category, set()) for category in cat_list]
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+import TweetDataHandler as tdh
+
+from datetime import datetime
+from os import cpu_count, makedirs, path, remove
+from TweetCalculator import TweetCalculator
+from TweetHashtagIndex import TweetHashtagIndex
+from TweetProfiler import TweetProfiler
+
+
+#Share of tweets by account category, roughly as in the troll tweet dataset
+CATEGORY_MIX = {
+    'NonEnglish': 0.29,
+    'RightTroll': 0.24,
+    'NewsFeed': 0.20,
+    'LeftTroll': 0.14,
+    'HashtagGamer': 0.08,
+    'Commercial': 0.04,
+    'Unknown': 0.006,
+    'Fearmonger': 0.004
+    }
+
+#Account type of each account category
+ACCOUNT_TYPES = {
+    'NonEnglish': 'Russian',
+    'RightTroll': 'Right',
+    'NewsFeed': 'local',
+    'LeftTroll': 'left',
+    'HashtagGamer': 'Hashtager',
+    'Commercial': 'Commercial',
+    'Unknown': '?',
+    'Fearmonger': 'Right'
+    }
+
+#Words used to build tweet content, including stopwords and words with a sentiment polarity
+TWEET_WORDS = ['the', 'a', 'is', 'are', 'was', 'to', 'of', 'and', 'in', 'on', 'for', 'with', 'this', 'that', 'it', 'we',
+               'they', 'you', 'not', "don't", "it's", 'good', 'bad', 'great', 'terrible', 'happy', 'sad', 'best', 'worst',
+               'true', 'fake', 'strong', 'weak', 'love', 'hate', 'news', 'police', 'president', 'election', 'vote', 'people',
+               'america', 'russia', 'media', 'school', 'city', 'country', 'money', 'war', 'tax', 'health', 'women', 'children',
+               'voters', 'officers', 'cities', 'reports', 'running', 'said', 'says', 'today', 'tonight', 'again', 'never']
+
+#Other punctuation added to the end of tweets
+TWEET_PUNCTUATION = ['', '', '!', '?', '...', '!!', ':)', '"']
+
+#Stages of the benchmark, in pipeline order
+STAGES = ['get_csv_data', 'put_hash_tags', 'clean_tweet_text', 'get_batch_sentiment', 'process_tweet_frame',
+          'hashtag_index', 'get_cat_hash_tags', 'calculator', 'calc_followers_and_following', 'top_profiles',
+          'hbar_counts', 'wordcloud_hashtag_counts', 'wordcloud_tweet_text', 'donut_counts']
+
+
+def generate_tweets(rows, seed=0, hashtag_density=1.0, duplicate_rate=0.1, category_mix=None, english_rate=0.95,
+                    num_authors=None, num_hashtags=None):
+    """
+    Function to generate a deterministic synthetic troll tweet dataframe with the columns of the troll_tweets data source. The
+    same parameters always generate the same tweets:
+    1) hashtag_density is the average number of hash tags per tweet
+    2) duplicate_rate is the share of tweets that repeat the content of another tweet, as retweets do
+    3) category_mix is a dictionary of the share of tweets of each account category, CATEGORY_MIX by default
+    4) english_rate is the share of tweets in English, tweets of the NonEnglish category are never in English
+    5) num_authors and num_hashtags are the number of distinct authors and hash tags, which scale with rows by default
+    """
+    rng = np.random.default_rng(seed)
+    category_mix = category_mix or CATEGORY_MIX
+    num_authors = num_authors or max(10, rows // 500)
+    num_hashtags = num_hashtags or max(50, rows // 50)
+
+    #Each author belongs to one category, authors are chosen so that some authors tweet much more than others
+    categories = np.array(list(category_mix))
+    weights = np.array(list(category_mix.values()), dtype=np.float64)
+    author_categories = categories[rng.choice(len(categories), size=num_authors, p=weights / weights.sum())]
+    author_weights = rng.pareto(1.5, size=num_authors) + 1
+    author_followers = rng.lognormal(7, 1.5, size=num_authors)
+    author_following = rng.lognormal(6, 1.0, size=num_authors)
+
+    authors = np.sort(rng.choice(num_authors, size=rows, p=author_weights / author_weights.sum()))
+    rng.shuffle(authors)
+    tweet_categories = author_categories[authors]
+
+    #Distinct tweet content, the remaining tweets repeat the content of a distinct tweet
+    num_distinct = max(1, int(np.ceil(rows * (1 - duplicate_rate))))
+    distinct_content = generate_content(rng, num_distinct, hashtag_density, num_hashtags)
+    content_ids = np.concatenate([np.arange(num_distinct), rng.integers(0, num_distinct, size=rows - num_distinct)])
+    rng.shuffle(content_ids)
+    content = distinct_content[content_ids]
+
+    english = (rng.random(rows) < english_rate) & (tweet_categories != 'NonEnglish')
+    language = np.where(english, 'English', np.where(tweet_categories == 'NonEnglish', 'Russian', 'Ukrainian'))
+
+    #Publish dates are spread between 2015 and mid 2018 in the format of the source files, which has no zero padding
+    seconds = rng.integers(int(datetime(2015, 1, 1).timestamp()), int(datetime(2018, 6, 1).timestamp()), size=rows)
+    dates = pd.to_datetime(seconds, unit='s')
+    publish_date = (pd.Series(dates.month.astype(str)) + '/' + pd.Series(dates.day.astype(str)) + '/' + pd.Series(dates.year.astype(str))
+                    + ' ' + pd.Series(dates.hour.astype(str)) + ':' + pd.Series(dates.strftime('%M')))
+
+    post_type = rng.choice(np.array(['RETWEET', 'QUOTE_TWEET', None], dtype=object), size=rows, p=[0.4, 0.05, 0.55])
+
+    return pd.DataFrame({
+        'external_author_id': (authors.astype(np.int64) * 7919 + 10 ** 9).astype(str),
+        'author': np.char.add('AUTHOR_', authors.astype(str)),
+        'content': content,
+        'region': rng.choice(np.array(['United States', 'Unknown', 'Russian Federation', None], dtype=object), size=rows, p=[0.8, 0.1, 0.08, 0.02]),
+        'language': language,
+        'publish_date': publish_date.to_numpy(),
+        'harvested_date': publish_date.to_numpy(),
+        'following': (author_following[authors] * rng.uniform(0.8, 1.2, size=rows)).astype(np.int64),
+        'followers': (author_followers[authors] * rng.uniform(0.8, 1.2, size=rows)).astype(np.int64),
+        'updates': rng.integers(0, 20000, size=rows),
+        'post_type': post_type,
+        'account_type': pd.Series(tweet_categories).map(ACCOUNT_TYPES).to_numpy(),
+        'new_june_2018': rng.integers(0, 2, size=rows),
+        'retweet': (post_type == 'RETWEET').astype(np.int64),
+        'account_category': tweet_categories
+        })
+
+
+def generate_content(rng, num_tweets, hashtag_density, num_hashtags):
+    """
+    Function to generate an array of num_tweets distinct tweets made up of words, hash tags, links and punctuation. About 1% of
+    the tweets have no content.
+    """
+    #Words, hash tags and links are followed by a space, the space after the last of them is removed when the tweets are joined
+    word_counts = rng.poisson(9, size=num_tweets)
+    words = np.array([word + " " for word in TWEET_WORDS], dtype=object)[rng.integers(0, len(TWEET_WORDS), size=word_counts.sum())]
+
+    #Hash tag popularity follows a power law, the case of the first letter varies as it does in the source data
+    tag_counts = rng.poisson(hashtag_density, size=num_tweets)
+    tag_ids = (rng.zipf(1.3, size=tag_counts.sum()) - 1) % num_hashtags
+    tag_names = np.array(["#tag" + str(num) + " " for num in range(num_hashtags)] + ["#Tag" + str(num) + " " for num in range(num_hashtags)], dtype=object)
+    tags = tag_names[tag_ids + num_hashtags * (rng.random(len(tag_ids)) < 0.3)]
+
+    links = rng.random(num_tweets) < 0.3
+    link_ids = rng.integers(0, 10 ** 9, size=num_tweets)
+    punctuation = np.array(["\t" + mark for mark in TWEET_PUNCTUATION], dtype=object)[rng.integers(0, len(TWEET_PUNCTUATION), size=num_tweets)]
+
+    #The pieces of each tweet are placed in tweet order and joined into one string, which is split at the end of each tweet. A
+    #tweet ends with its punctuation, which starts with a tab that marks the space to remove, and its number, which keeps every
+    #tweet distinct so the duplicate rate is only set by duplicate_rate
+    ends = np.cumsum(word_counts + tag_counts + links + 2)
+    starts = ends - word_counts - tag_counts - links - 2
+    pieces = np.empty(ends[-1], dtype=object)
+    pieces[np.repeat(starts, word_counts) + np.arange(len(words)) - np.repeat(np.cumsum(word_counts) - word_counts, word_counts)] = words
+    pieces[np.repeat(starts + word_counts, tag_counts) + np.arange(len(tags)) - np.repeat(np.cumsum(tag_counts) - tag_counts, tag_counts)] = tags
+    pieces[(ends - 3)[links]] = np.char.add(np.char.add("https://t.co/", link_ids[links].astype(str)), " ").astype(object)
+    pieces[ends - 2] = punctuation
+    pieces[ends - 1] = np.char.add(np.char.add(" ", np.arange(num_tweets).astype(str)), "\n").astype(object)
+
+    content = np.array("".join(pieces).replace(" \t", "").replace("\t", "").split("\n")[:-1], dtype=object)
+    content[rng.random(num_tweets) < 0.01] = np.nan
+
+    return content
+
+
+class TweetBenchmark:
+    """
+    Class used to measure the time and memory used by each stage of the tweet pipeline on synthetic tweets, so that changes in
+    speed and memory use can be tracked without the troll tweet dataset. Each corpus size is generated into a working directory
+    with the file layout of the troll_tweets data source, and every stage runs on the output of the previous stage.
+    """
+    def __init__(self, work_dir=None, files=3, seed=0, trace_memory=True, config=None, **generator_options):
+        """
+        Initialize the benchmark. The synthetic source files are written to work_dir, a temporary directory that is removed after
+        each size is run by default. Each corpus is split into files source files and generated from seed, generator_options are
+        passed to generate_tweets. If trace_memory is set, the peak memory allocated by each stage is traced, which slows the stages
+        down. The config dictionary overrides the TweetDataHandler configuration, the caches are cleared at the start of each size.
+        Each stage is recorded as a span by the profiler attribute, the spans of the data handler stages it calls are nested in it.
+        """
+        self.work_dir = work_dir
+        self.files = files
+        self.seed = seed
+        self.trace_memory = trace_memory
+        self.config = config or {}
+        self.generator_options = generator_options
+        self.results = []
+        self.profiler = TweetProfiler()
+
+    def write_corpus(self, rows, work_dir):
+        """
+        Method to generate a corpus of rows synthetic tweets and write it to the source files of a data handler using work_dir,
+        returns the data handler.
+        """
+        handler = tdh.TweetDataHandler()
+        handler.my_path = path.join(work_dir, '')
+        handler.config.update({"isMsg": False, "isSavePreproc": False})
+        handler.config.update(self.config)
+        handler.profiler = self.profiler
+        makedirs(handler.my_path + "\\data\\" + "Processed\\", exist_ok=True)
+
+        files = handler.data_sources['troll_tweets'][0]
+        files[2] = self.files
+
+        #Each file is generated separately, so the memory used depends on the size of a file
+        file_rows = np.diff(np.linspace(0, rows, self.files + 1).astype(np.int64))
+        for num, file in enumerate(handler.get_csv_files('troll_tweets')):
+            generate_tweets(int(file_rows[num]), seed=[self.seed, num], **self.generator_options).to_csv(file, index=False)
+
+        return handler
+
+    def clear_caches(self, handler):
+        """
+        Method to remove the lemma and sentiment caches of a data handler from memory and from the processed data directory, so
+        that each size is measured without the caches filled by a previous size.
+        """
+        for cache_file in ["lemma_cache.json", "sentiment_cache.pkl"]:
+            if path.exists(handler.my_path + "\\data\\" + "Processed\\" + cache_file):
+                remove(handler.my_path + "\\data\\" + "Processed\\" + cache_file)
+        handler.lemma_cache = None
+        handler.sentiment_cache = None
+
+    def measure(self, rows, stage, func, rows_in):
+        """
+        Function to run a stage in a profiler span and record its wall time, CPU time, input and output rows and memory use,
+        returns the output of the stage.
+        """
+        with self.profiler.span("TweetBenchmark." + stage, rows_in=rows_in, rows=rows) as span:
+            if self.trace_memory == True:
+                tracemalloc.start()
+            try:
+                #Status messages and printed results are not part of the measurement
+                with contextlib.redirect_stdout(io.StringIO()):
+                    output = func()
+                span.attributes['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1] if self.trace_memory == True else None
+            finally:
+                if self.trace_memory == True:
+                    tracemalloc.stop()
+            span.rows_out = len(output) if hasattr(output, '__len__') else None
+
+        peak = span.attributes['peak_traced_bytes']
+        self.results.append({
+            'rows': rows,
+            'stage': stage,
+            'wall_seconds': span.wall_seconds,
+            'cpu_seconds': span.cpu_seconds,
+            'rows_in': rows_in,
+            'rows_out': span.rows_out,
+            'rows_per_second': round(rows_in / span.wall_seconds, 1) if span.wall_seconds > 0 else None,
+            'peak_traced_mb': round(peak / 2 ** 20, 2) if peak is not None else None,
+            'max_rss_mb': span.max_rss_mb
+            })
+
+        return output
+
+    def run_size(self, rows, stages=None):
+        """
+        Method to generate a corpus of rows tweets and measure each stage in stages (all of STAGES by default). Stages that are
+        not selected are still run when a later stage needs their output, but are not recorded.
+        """
+        stages = stages or STAGES
+        work_dir = self.work_dir or tempfile.mkdtemp(prefix="tweet_benchmark_")
+
+        def run(stage, func, rows_in):
+            if stage in stages:
+                return self.measure(rows, stage, func, rows_in)
+            with contextlib.redirect_stdout(io.StringIO()):
+                return func()
+
+        try:
+            handler = self.write_corpus(rows, work_dir)
+            self.clear_caches(handler)
+
+            #Source data and pre-processing
+            data = run('get_csv_data', lambda: handler.get_csv_data('troll_tweets'), rows)
+            df = run('put_hash_tags', lambda: handler.put_hash_tags(data, "content")[0], len(data))
+
+            english = df[df['language'] == 'English']['content'].rename('processed_content')
+            processed_tweets = run('clean_tweet_text', lambda: handler.clean_tweet_text(english), len(english))
+            run('get_batch_sentiment', lambda: handler.get_batch_sentiment(processed_tweets), len(processed_tweets))
+
+            #The text caches are warm after the previous stages, so this stage mostly measures assembling the processed frame
+            df = run('process_tweet_frame', lambda: handler.process_tweet_frame(df), len(df))
+            handler.troll_tweet_df = df
+
+            #Hash tag index and category hash tags
+            handler.hashtag_index = run('hashtag_index', lambda: TweetHashtagIndex(df['hash_tags']), len(df))
+            run('get_cat_hash_tags', handler.get_cat_hash_tags, len(df))
+
+            #Calculations
+            calc = run('calculator', lambda: TweetCalculator(df), len(df))
+            run('calc_followers_and_following', calc.calc_followers_and_following, len(calc.tweeters_and_followers))
+            run('top_profiles', lambda: [calc.get_top_profiles(10, sort_col, category) for category in [None] + handler.cat_list
+                                         for sort_col in ['followers', 'following']], len(calc.tweeters_and_followers))
+
+            #Data prepared by the visualizer for each chart
+            run('hbar_counts', lambda: df['account_category'].value_counts(), len(df))
+            run('wordcloud_hashtag_counts', lambda: [handler.hashtag_index.tag_frequencies(
+                None if category is None else df['account_category'].to_numpy() == category, lowercase=True)
+                for category in [None] + handler.cat_list], len(df))
+            run('wordcloud_tweet_text', lambda: [' '.join(df[(df['account_category'] == category) | (category is None)]['processed_content'].dropna())
+                                                 for category in [None] + handler.cat_list], len(df))
+            run('donut_counts', lambda: df[['processed_content', 'account_category', 'class_sentiment']].drop_duplicates().groupby(
+                by=['account_category', 'class_sentiment']).count(), len(df))
+        finally:
+            if self.work_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return [result for result in self.results if result['rows'] == rows]
+
+    def run(self, sizes, stages=None):
+        """
+        Method to run the benchmark for each corpus size in sizes, returns the results of every stage and size.
+        """
+        for rows in sizes:
+            self.run_size(rows, stages)
+
+        return self.results
+
+    def get_metadata(self):
+        """
+        Function to return the environment and settings of the benchmark, stored with the results so that runs can be compared.
+        """
+        return {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': cpu_count(),
+            'files': self.files,
+            'seed': self.seed,
+            'trace_memory': self.trace_memory,
+            'config': self.config,
+            'generator_options': self.generator_options
+            }
+
+    def get_report(self):
+        """
+        Function to return the results as a dataframe with a row for each size and stage.
+        """
+        return pd.DataFrame(self.results).set_index(['rows', 'stage'])
+
+    def save(self, output_file):
+        """
+        Method to write the metadata, results and profiler spans to a JSON file.
+        """
+        with open(output_file, 'w') as f:
+            json.dump({'metadata': self.get_metadata(), 'results': self.results,
+                       'spans': [span.to_dict() for span in self.profiler.spans]}, f, indent=2, default=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tweet pipeline stages on synthetic tweets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help="corpus sizes in rows")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=None, help="stages to measure, all by default")
+    parser.add_argument('--files', type=int, default=3, help="number of source files per corpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--hashtag-density', type=float, default=1.0, help="average hash tags per tweet")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="share of tweets repeating another tweet")
+    parser.add_argument('--english-rate', type=float, default=0.95, help="share of tweets in English")
+    parser.add_argument('--fast-sentiment', action='store_true', help="calculate polarity and subjectivity only")
+    parser.add_argument('--no-trace-memory', action='store_true', help="do not trace the memory allocated by each stage")
+    parser.add_argument('--work-dir', default=None, help="directory for the synthetic source files, kept after the run")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the results")
+    args = parser.parse_args()
+
+    benchmark = TweetBenchmark(work_dir=args.work_dir, files=args.files, seed=args.seed, trace_memory=not args.no_trace_memory,
+                               config={"preproc_sentiment_fast": args.fast_sentiment}, hashtag_density=args.hashtag_density,
+                               duplicate_rate=args.duplicate_rate, english_rate=args.english_rate)
+
+    for rows in args.sizes:
+        print(f"Benchmarking {rows:,} rows")
+        benchmark.run_size(rows, args.stages)
+        benchmark.save(args.output)
+
+    print(benchmark.get_report()[['wall_seconds', 'rows_per_second', 'peak_traced_mb']])
+
+if __name__ == '__main__':
+    main()
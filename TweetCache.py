@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import hashlib
+import json
+import pickle
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from os import path, remove, replace, stat
+
+#pyarrow, TextBlob and tqdm are imported when first used, so that importing the module is fast
+
+
+class TweetCache:
+    """
+    Class used to store processed tweet data in a binary columnar cache (Parquet). List columns such as the tweet
+    hash tags are stored natively, so no parsing is needed when the data is read back, and the file is memory-mapped
+    when it is loaded.
+
+    Each cache entry is stored with a fingerprint of the source files and the pre-processing settings used to create it.
+    The entry is only considered valid while the fingerprint matches, so a change to the source files or settings causes
+    the cache to be rebuilt.
+    """
+    def __init__(self, cache_dir, name):
+        """
+        Initialize the cache entry, the data is stored in <cache_dir><name>.parquet and the fingerprint in <cache_dir><name>.json
+        """
+        self.cache_dir = cache_dir
+        self.name = name
+        self.data_file = cache_dir + name + ".parquet"
+        self.meta_file = cache_dir + name + ".json"
+
+    @staticmethod
+    def fingerprint(files, settings):
+        """
+        Function to compute the fingerprint of a list of source files and a dictionary of settings. Files are identified
+        by path, size and modification time so the files do not need to be read to compute the fingerprint.
+        """
+        file_info = []
+        for file in files:
+            if path.exists(file):
+                file_stat = stat(file)
+                file_info.append([file, file_stat.st_size, file_stat.st_mtime_ns])
+            else:
+                file_info.append([file, None, None])
+
+        key = json.dumps({"files": file_info, "settings": settings}, sort_keys=True, default=str)
+
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get_meta(self):
+        """
+        Function to return the stored metadata of the cache entry, None is returned if the entry does not exist.
+        """
+        if not (path.exists(self.meta_file) and path.exists(self.data_file)):
+            return None
+
+        with open(self.meta_file, 'r') as f:
+            return json.load(f)
+
+    def is_valid(self, fingerprint):
+        """
+        Function to check whether the cache entry exists and was created with the provided fingerprint.
+        """
+        meta = self.get_meta()
+
+        return meta is not None and meta.get("fingerprint") == fingerprint
+
+    def save(self, df, fingerprint, str_columns=()):
+        """
+        Method to write a dataframe to the cache entry. Columns in str_columns hold nested python objects that have no columnar
+        type, these are stored as their string representation as they would be in a CSV file, null values are kept as nulls.
+        """
+        df = df.copy()
+        for col in str_columns:
+            if col in df.columns:
+                df[col] = df[col].astype(str).where(df[col].notna())
+
+        #The metadata is removed first and written last so that a partially written data file is never treated as valid
+        if path.exists(self.meta_file):
+            remove(self.meta_file)
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        pq.write_table(table, self.data_file)
+
+        with open(self.meta_file, 'w') as f:
+            json.dump({"fingerprint": fingerprint, "rows": len(df), "columns": list(df.columns)}, f)
+
+    def load(self, columns=None, list_columns=()):
+        """
+        Function to read the cache entry into a dataframe, optionally reading only the specified columns. List columns are
+        converted back to python lists.
+        """
+        import pyarrow.parquet as pq
+        
+        table = pq.read_table(self.data_file, columns=columns, memory_map=True, use_pandas_metadata=True)
+
+        #Arrow list columns are converted to numpy arrays by default, converting them directly to lists keeps the data as it was saved
+        list_values = {col: table.column(col).to_pylist() for col in list_columns if col in table.column_names}
+        df = table.drop(list(list_values)).to_pandas()
+
+        for col, values in list_values.items():
+            df[col] = pd.Series(values, index=df.index, dtype=object)
+
+        #Restore the saved column order
+        return df[[col for col in table.column_names if col in df.columns or col in list_values]]
+
+
+class TweetLemmaCache:
+    """
+    Class containing a cache of the lemma of each word, keyed by the word as it appears in the pre-processed tweets. The
+    vocabulary of the tweets is much smaller than the number of words in the tweets, so each distinct word is lemmatized
+    once and the tweets are then lemmatized with dictionary lookups. The cache is stored as a JSON file between runs, and
+    is discarded if it was created with a different version of TextBlob.
+    """
+    def __init__(self, cache_file):
+        """
+        Initialize the lemma cache, loading the cached lemmas from the cache file if it exists.
+        """
+        self.cache_file = cache_file
+        self.lemmas = {}
+        
+        if path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("version") == get_textblob_version():
+                self.lemmas = cache["lemmas"]
+
+    def update(self, words, workers=None, chunk_size=5000):
+        """
+        Method to lemmatize the words that are not already cached. If workers is not None, the words are lemmatized in
+        chunks by a pool of that many processes (0 lets the pool decide). Returns the number of words lemmatized.
+        """
+        missing = [word for word in words if word not in self.lemmas]
+        
+        if workers is None or len(missing) <= chunk_size:
+            self.lemmas.update(zip(missing, lemmatize_words(missing)))
+        else:
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers or None) as executor:
+                for chunk, lemmas in zip(chunks, executor.map(lemmatize_words, chunks)):
+                    self.lemmas.update(zip(chunk, lemmas))
+                    
+        return len(missing)
+
+    def lemmatize(self, tweets, workers=None):
+        """
+        Function to lemmatize a series of tweets, or of the list of words of each tweet, each word is replaced by its cached
+        lemma and the lemmatized tweets are returned as strings. The vocabulary of the tweets is added to the cache first.
+        """
+        words = tweets if len(tweets) > 0 and isinstance(tweets.iloc[0], list) else tweets.str.split()
+        self.update(pd.unique(pd.Series(list(chain.from_iterable(words)), dtype=object)), workers)
+        lemmas = self.lemmas
+        
+        return words.map(lambda x: " ".join([lemmas[word] for word in x]))
+
+    def lookup(self, words):
+        """
+        Function to return the lemma of each word of a list, words that are not cached are lemmatized without being added to
+        the cache, so the cache is only read and lookups may run from several threads.
+        """
+        lemmas = self.lemmas
+        missing = [word for word in words if word not in lemmas]
+        missing_lemmas = dict(zip(missing, lemmatize_words(missing))) if len(missing) > 0 else {}
+        
+        return [lemmas[word] if word in lemmas else missing_lemmas[word] for word in words]
+
+    def trim(self, max_size):
+        """
+        Method to discard the oldest cached lemmas, keeping at most max_size words. The lemmas are replaced rather than
+        deleted in place, so lookups running in other threads keep reading a complete dictionary.
+        """
+        if len(self.lemmas) > max_size:
+            self.lemmas = dict(islice(self.lemmas.items(), len(self.lemmas) - max_size, None))
+
+    def save(self):
+        """
+        Method to write the cached lemmas to the cache file.
+        """
+        #Write to a temporary file first so an interrupted save does not corrupt the existing cache
+        with open(self.cache_file + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"version": get_textblob_version(), "lemmas": self.lemmas}, f)
+        replace(self.cache_file + ".tmp", self.cache_file)
+
+
+class TweetSentimentCache:
+    """
+    Class containing a cache of tweet sentiment scores, keyed by a hash of the tweet content. Scores calculated with and
+    without the sentiment assessments are kept separately. The cache is stored as a pickle file between runs, and is
+    discarded if it was created with a different version of TextBlob.
+    """
+    def __init__(self, cache_file, fast=False):
+        """
+        Initialize the sentiment cache, loading the cached scores from the cache file if it exists. The fast parameter selects
+        the scores calculated without sentiment assessments.
+        """
+        self.cache_file = cache_file
+        self.mode = "fast" if fast else "full"
+        self.scores = {"full": {}, "fast": {}}
+        
+        if path.exists(cache_file):
+            with open(cache_file, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.get("version") == get_textblob_version():
+                self.scores = cache["scores"]
+
+    @staticmethod
+    def content_hash(tweet):
+        """
+        Function to return the hash of a tweet used as the cache key.
+        """
+        return hashlib.blake2b(tweet.encode('utf-8'), digest_size=16).digest()
+
+    def get_sentiment(self, tweets, get_sentiment):
+        """
+        Function to return the sentiment of each tweet in a list of distinct tweets, tweets missing from the cache are scored
+        with the get_sentiment function and added to the cache.
+        """
+        from tqdm import tqdm
+        
+        scores = self.scores[self.mode]
+        keys = [self.content_hash(tweet) for tweet in tweets]
+        missing = [num for num, key in enumerate(keys) if key not in scores]
+        
+        for num in tqdm(missing, desc="Progress: "):
+            scores[keys[num]] = get_sentiment(tweets[num])
+            
+        return [scores[key] for key in keys]
+
+    def trim(self, max_size):
+        """
+        Method to discard the oldest cached scores, keeping at most max_size scores of each mode.
+        """
+        self.scores = {mode: dict(islice(scores.items(), max(len(scores) - max_size, 0), None))
+                       for mode, scores in self.scores.items()}
+
+    def save(self):
+        """
+        Method to write the cached scores to the cache file.
+        """
+        #Write to a temporary file first so an interrupted save does not corrupt the existing cache
+        with open(self.cache_file + ".tmp", 'wb') as f:
+            pickle.dump({"version": get_textblob_version(), "scores": self.scores}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(self.cache_file + ".tmp", self.cache_file)
+
+
+def lemmatize_words(words):
+    """
+    Function to lemmatize a list of words with TextBlob. Defined at module level so that it can be sent to process pool workers.
+    """
+    from textblob import Word
+    
+    return [Word(word).lemmatize() for word in words]
+
+
+def get_textblob_version():
+    """
+    Function to return the version of TextBlob used to create cached lemmas and scores.
+    """
+    import textblob
+    
+    return getattr(textblob, '__version__', None)
@@ -1,70 +1,160 @@
-import pandas as pd
 import numpy as np
 
+from TweetDataset import TweetDataset
+from TweetProfiler import TweetProfiler, profile_stage
+from TweetStatistics import FollowStatistics
+
 
 class TweetCalculator:
     """
     Class for performing calculations on the tweet data. Current uses include the ability to calculate descriptive statistics
     about troll followers and who they are following.
     """
-    def __init__(self,df):
+    def __init__(self,df, top_k=100, profiler=None):
         """
-        Initialize data for calculations performed on tweets, a dataframe is passed to the constructor.
+        Initialize data for calculations performed on tweets, a dataframe or TweetDataset is passed to the constructor. Only the
+        author and followers columns of a TweetDataset are read, so no text pre-processing is performed. The profile of each author
+        is taken from their latest tweet, and the top_k profiles by followers and by following are precomputed overall and for
+        each account category. The spans of each calculation are recorded by the profiler, such as the profiler of the
+        TweetDataHandler, or by a new profiler if none is provided.
         """
-        self.author_df = df[['author', 'publish_date', 'account_category']]
-        self.author_follow_df = df[['author', 'publish_date', 'account_category', 'following', 'followers']]
+        self.profiler = profiler if profiler is not None else TweetProfiler()
+        if isinstance(df, TweetDataset):
+            self.author_follow_df = df.get_columns(['author', 'publish_date', 'account_category', 'following', 'followers'])
+        else:
+            self.author_follow_df = df[['author', 'publish_date', 'account_category', 'following', 'followers']]
+        self.tweeters_and_followers = self.get_author_profiles(self.author_follow_df)
         
-        # Create tweet author df, grouping by the max tweet date
-        self.author_df = self.author_df.groupby(by=['author', 'account_category'], as_index=False).max()
+        self.top_k = top_k
+        self.top_profiles = self.get_top_profile_tables(top_k)
 
-        # Join followers info by author, account_category and publish date, getting latest followers for each tweeter
-        self.tweeters_and_followers = self.author_df.merge(self.author_follow_df,
-                                                           on=['author', 'account_category', 'publish_date'],
-                                                           how='left')
+    @profile_stage
+    def get_author_profiles(self, author_follow_df):
+        """
+        Returns the profile of each author and account category, taken from their latest tweet.
+        """
+        # Sort tweets by publish date, keeping the last (latest) tweet of each author and account category for their followers info
+        tweeters_and_followers = author_follow_df.sort_values(by='publish_date', kind='stable')
+        tweeters_and_followers = tweeters_and_followers.drop_duplicates(subset=['author', 'account_category'], keep='last')
         
-        self.tweeters_and_followers = self.tweeters_and_followers[['author', 'account_category', 'following', 'followers']]
+        return tweeters_and_followers[['author', 'account_category', 'following', 'followers']].reset_index(drop=True)
+
+    @profile_stage
+    def get_top_profile_tables(self, top_k):
+        """
+        Returns a dictionary of the top_k profiles overall (None) and by account category, for followers and following.
+        """
+        top_profiles = {}
+        category_rows = self.tweeters_and_followers.groupby('account_category', observed=True).indices
+        category_rows[None] = np.arange(len(self.tweeters_and_followers))
         
-        # Drop duplicates from data frame
-        self.tweeters_and_followers = self.tweeters_and_followers.drop_duplicates()
+        for sort_col in ['followers', 'following']:
+            values = self.tweeters_and_followers[sort_col].to_numpy(dtype=np.int64)
+            for category, rows in category_rows.items():
+                top_rows = rows[self.top_positions(values[rows], top_k)]
+                top_profiles[(category, sort_col)] = self.tweeters_and_followers.iloc[top_rows]
+                
+        return top_profiles
 
-    def calc_followers_and_following(self):
+    @staticmethod
+    def top_positions(values, num):
         """
-        Calculates and prints followers/following information for troll twitter handles.
-        """      
+        Returns the positions of the num largest values in descending order, selecting them with a partial sort before sorting
+        only the selected values.
+        """
+        if len(values) > num:
+            positions = np.argpartition(-values, num - 1)[:num]
+        else:
+            positions = np.arange(len(values))
+            
+        return positions[np.argsort(-values[positions], kind='stable')]
 
-        # Create arrays of followers/following
-        self.followers_array = np.array(self.tweeters_and_followers['followers'].values)
-        self.following_array = np.array(self.tweeters_and_followers['following'].values)
+    @profile_stage
+    def get_top_profiles(self, num, sort_col, account_category=None):
+        """
+        Returns a dataframe of the top n profiles by following/followers with the optional ability to specify by account category
+        """
+        sort_col = 'following' if sort_col == 'following' else 'followers'
+        
+        if num <= self.top_k:
+            top_profiles = self.top_profiles.get((account_category, sort_col), self.tweeters_and_followers.iloc[:0])
+            return top_profiles.head(n=num)
+        
+        # Profiles beyond the precomputed top profiles are selected from the full profile table
+        if account_category != None:
+            profile_df = self.tweeters_and_followers[self.tweeters_and_followers['account_category']==account_category]
+        else:
+            profile_df = self.tweeters_and_followers
+            
+        return profile_df.iloc[self.top_positions(profile_df[sort_col].to_numpy(dtype=np.int64), num)]
 
-        # Descriptive statistics for  followers/following of troll accounts at max date of tweet per troll acct
+    @profile_stage
+    def calc_followers_and_following(self, statistics=None):
+        """
+        Calculates, prints and returns followers/following information for troll twitter handles. If a FollowStatistics object is
+        provided, such as one built while streaming the tweets, its statistics are used and the medians are estimates from its
+        quantile sketches.
+        """      
+        if statistics is not None:
+            self.followers_avg = statistics.get_statistics(None, 'followers')[0].mean
+            self.followers_median = statistics.get_statistics(None, 'followers')[1].quantile(0.5)
+            self.following_avg = statistics.get_statistics(None, 'following')[0].mean
+            self.following_median = statistics.get_statistics(None, 'following')[1].quantile(0.5)
+            self.followers_sum = statistics.get_statistics(None, 'followers')[0].sum
+            self.following_sum = statistics.get_statistics(None, 'following')[0].sum
+        else:
+            # Create arrays of followers/following
+            self.followers_array = np.array(self.tweeters_and_followers['followers'].values)
+            self.following_array = np.array(self.tweeters_and_followers['following'].values)
+            
+            # Descriptive statistics for  followers/following of troll accounts at max date of tweet per troll acct
+            self.followers_avg = np.mean(self.followers_array)
+            self.followers_median = np.median(self.followers_array)
+            self.following_avg = np.mean(self.following_array)
+            self.following_median = np.median(self.following_array)
+            
+            # Compute followers sum and following sum for followers-to-following ratio
+            self.followers_sum = np.sum(self.followers_array)
+            self.following_sum = np.sum(self.following_array)
+            
+        self.follow_ratio = round(np.divide(self.followers_sum, self.following_sum), 2)
+        
         print("Russian Troll Tweets : Followers/Following")
-        self.followers_avg = np.mean(self.followers_array)
         print("Followers Avg : " + str(int(self.followers_avg)))
-        self.followers_median = np.median(self.followers_array)
         print("Followers Median : " + str(int(self.followers_median)))
-        self.following_avg = np.mean(self.following_array)
         print("Following Avg : " + str(int(self.following_avg)))
-        self.following_median = np.median(self.following_array)
         print("Following Median : " + str(int(self.following_median)))
-
-        # Compute followers sum and following sum for followers-to-following ratio
-        self.followers_sum = np.sum(self.followers_array)
-        self.following_sum = np.sum(self.following_array)
-        self.follow_ratio = round(np.divide(self.followers_sum, self.following_sum), 2)
         print("Followers-to-following : " + str(self.follow_ratio) + "\n")
         
-    def profile_top(self,num, sort_col, account_category=None):
+        return {
+            'followers_avg': self.followers_avg,
+            'followers_median': self.followers_median,
+            'following_avg': self.following_avg,
+            'following_median': self.following_median,
+            'follow_ratio': self.follow_ratio
+            }
+
+    @profile_stage
+    def get_follow_statistics(self, k=200, chunk_size=None):
         """
-        Prints the top n profiles by following/followers with the optional ability to specify by account category
+        Returns mergeable followers/following statistics of the troll profiles, overall and by account category. The profiles
+        may be added in chunks of chunk_size rows, k sets the accuracy of the quantile sketches.
         """
-        if account_category != None:
-            self.profile_df = self.tweeters_and_followers[self.tweeters_and_followers['account_category']==account_category]
-        else:
-            self.profile_df = self.tweeters_and_followers.copy()
+        statistics = FollowStatistics(k)
+        chunk_size = chunk_size or max(len(self.tweeters_and_followers), 1)
+        
+        for start in range(0, len(self.tweeters_and_followers), chunk_size):
+            statistics.update(self.tweeters_and_followers.iloc[start:start + chunk_size])
             
-        if sort_col == 'following':
-            self.profile_df = self.profile_df[['author','account_category', 'following', 'followers']].sort_values(by=['following'], ascending = False)
-        else:
-            self.profile_df = self.profile_df[['author', 'account_category', 'following', 'followers']].sort_values(by=['followers'], ascending = False)
+        return statistics
+
+    @profile_stage
+    def profile_top(self,num, sort_col, account_category=None):
+        """
+        Prints and returns the top n profiles by following/followers with the optional ability to specify by account category
+        """
+        self.profile_df = self.get_top_profiles(num, sort_col, account_category)
             
-        print(self.profile_df.head(n=num),"\n")
\ No newline at end of file
+        print(self.profile_df,"\n")
+        
+        return self.profile_df
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+#Weightings of the associated hash tags
+METRICS = ['tweets', 'jaccard', 'pmi']
+
+
+class TweetCooccurrence:
+    """
+    Class containing the number of tweets in which each pair of hash tags appear together, overall and for each account
+    category. Hash tags are interned to the integer ids of a TweetHashtagIndex, and the counts are stored as a sparse symmetric
+    matrix in compact arrays (CSR layout), so the hash tags associated with a hash tag are read from one row of the matrix.
+
+    The matrix of each category is a slice of tag rows, the overall matrix is the last slice. The hash tags of row t of slice s
+    are columns[offsets[s * num_tags + t]:offsets[s * num_tags + t + 1]], with the number of shared tweets in counts. A tweet
+    using a hash tag more than once counts once, and hash tags differing only in case are counted together if lowercase is set.
+
+    Associated hash tags are ranked by:
+    1) tweets : the number of tweets containing both hash tags
+    2) jaccard : the tweets containing both hash tags divided by the tweets containing either
+    3) pmi : the pointwise mutual information, log(tweets(a, b) * tweets / (tweets(a) * tweets(b)))
+    """
+    def __init__(self, vocabulary, categories, offsets, columns, counts, tag_tweets, slice_tweets):
+        """
+        Initialize the matrix from its arrays, see from_index to build the matrix from a hash tag index. tag_tweets contains
+        the number of tweets of each slice containing each hash tag, and slice_tweets the number of tweets of each slice.
+        """
+        self.vocabulary = vocabulary
+        self.categories = list(categories)
+        self.offsets = offsets
+        self.columns = columns
+        self.counts = counts
+        self.tag_tweets = tag_tweets
+        self.slice_tweets = slice_tweets
+        self.tag_lookup = {tag: tag_id for tag_id, tag in enumerate(vocabulary)}
+
+    @classmethod
+    def from_index(cls, hashtag_index, categories, lowercase=True, chunk_size=100000, workers=1):
+        """
+        Function to build the matrix from a TweetHashtagIndex and the category of each of its rows, in a single pass over the
+        hash tags. The rows are split into chunks of chunk_size tweets, which are counted by a pool of workers threads (None
+        uses the default number of threads, 1 counts the chunks in this thread) and summed, the NumPy sorts of each chunk run in
+        parallel. Rows without a category are counted in a 'None' category.
+        """
+        tag_ids = hashtag_index.tag_ids.astype(np.int64)
+        vocabulary = hashtag_index.vocabulary
+
+        #Map each hash tag id to the id of its lower case hash tag
+        if lowercase == True:
+            lower_ids, vocabulary = pd.factorize(pd.Series(vocabulary, dtype=object).str.lower())
+            tag_ids = lower_ids[tag_ids].astype(np.int64)
+
+        cat_codes, cat_labels = pd.factorize(pd.Series(np.asarray(categories), dtype=object), sort=True)
+        if (cat_codes < 0).any():
+            cat_labels = list(cat_labels) + ['None']
+            cat_codes = np.where(cat_codes < 0, len(cat_labels) - 1, cat_codes)
+
+        #Chunks start at row boundaries, each chunk is passed its hash tag ids and row lengths
+        row_offsets = hashtag_index.row_offsets
+        row_lengths = np.diff(row_offsets)
+        bounds = list(range(0, len(row_lengths), chunk_size)) + [len(row_lengths)]
+        chunks = [(tag_ids[row_offsets[start]:row_offsets[end]], row_lengths[start:end], cat_codes[start:end].astype(np.int64),
+                   len(vocabulary), len(cat_labels)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+        if workers == 1 or len(chunks) <= 1:
+            results = [count_chunk(*chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(count_chunk, *zip(*chunks)))
+
+        #Sum the chunks, pairs counted in more than one chunk are added together
+        pair_keys, pair_counts = sum_keys([result[0] for result in results], [result[1] for result in results])
+        tag_tweets = np.zeros((len(cat_labels), len(vocabulary)), dtype=np.int64)
+        for result in results:
+            tag_tweets += result[2]
+        slice_tweets = np.bincount(cat_codes, minlength=len(cat_labels)).astype(np.int64)
+
+        #The overall slice sums the pairs of every category
+        num_tags = np.int64(len(vocabulary))
+        overall_keys, overall_counts = sum_keys([pair_keys % (num_tags * num_tags)], [pair_counts])
+        pair_keys = np.concatenate([pair_keys, overall_keys + len(cat_labels) * num_tags * num_tags])
+        pair_counts = np.concatenate([pair_counts, overall_counts])
+        tag_tweets = np.vstack([tag_tweets, tag_tweets.sum(axis=0)])
+        slice_tweets = np.append(slice_tweets, len(row_lengths))
+
+        offsets, columns, counts = symmetric_csr(pair_keys, pair_counts, num_tags, len(cat_labels) + 1)
+
+        return cls(vocabulary, cat_labels, offsets, columns, counts, tag_tweets, slice_tweets)
+
+    def get_tag_id(self, tag):
+        """
+        Function to return the id of a hash tag, with or without the leading '#', or of its lower case hash tag if the hash tags
+        were counted in lower case. Returns None if the hash tag is not counted.
+        """
+        tag = tag[1:] if tag.startswith('#') else tag
+
+        return self.tag_lookup.get(tag, self.tag_lookup.get(tag.lower()))
+
+    def get_slice(self, account_category=None):
+        """
+        Function to return the slice of an account category, or the overall slice. Returns None for an unknown category.
+        """
+        if account_category is None:
+            return len(self.categories)
+
+        return self.categories.index(account_category) if account_category in self.categories else None
+
+    def get_row(self, tag_slice, tag_id):
+        """
+        Function to return the hash tag ids co-occurring with a hash tag in a slice and the number of shared tweets.
+        """
+        start, end = self.offsets[tag_slice * len(self.vocabulary) + tag_id], self.offsets[tag_slice * len(self.vocabulary) + tag_id + 1]
+
+        return (self.columns[start:end], self.counts[start:end])
+
+    def get_weights(self, tag_slice, left, right, counts, metric):
+        """
+        Function to return the weight of pairs of hash tag ids with counts shared tweets in a slice, see METRICS.
+        """
+        if metric == 'tweets':
+            return counts.astype(np.float64)
+
+        left_tweets = self.tag_tweets[tag_slice, left]
+        right_tweets = self.tag_tweets[tag_slice, right]
+        if metric == 'jaccard':
+            return counts / (left_tweets + right_tweets - counts)
+        if metric == 'pmi':
+            return np.log(counts * self.slice_tweets[tag_slice] / (left_tweets * right_tweets))
+
+        raise ValueError(f"Metric must be one of : {', '.join(METRICS)}")
+
+    def associated(self, tag, num=10, metric='pmi', account_category=None, min_tweets=1):
+        """
+        Function to return the top num hash tags appearing with a hash tag by metric, overall or for an account category, as a
+        dataframe indexed by hash tag with the number of shared tweets and the weight. Only hash tags sharing at least
+        min_tweets tweets are ranked, which keeps rare pairs from leading the PMI ranking.
+        """
+        tag_id = self.get_tag_id(tag)
+        tag_slice = self.get_slice(account_category)
+        if metric not in METRICS:
+            raise ValueError(f"Metric must be one of : {', '.join(METRICS)}")
+        if tag_id is None or tag_slice is None:
+            return pd.DataFrame({'tweets': pd.Series(dtype=np.int64), metric: pd.Series(dtype=np.float64)})
+
+        columns, counts = self.get_row(tag_slice, tag_id)
+        keep = counts >= min_tweets
+        columns, counts = columns[keep], counts[keep]
+        weights = self.get_weights(tag_slice, np.full(len(columns), tag_id), columns, counts, metric)
+
+        return self.get_top(columns, counts, weights, num, metric)
+
+    def top_pairs(self, num=10, metric='tweets', account_category=None, min_tweets=1):
+        """
+        Function to return the top num pairs of hash tags by metric, overall or for an account category, as a dataframe with
+        the two hash tags, the number of shared tweets and the weight.
+        """
+        tag_slice = self.get_slice(account_category)
+        if metric not in METRICS:
+            raise ValueError(f"Metric must be one of : {', '.join(METRICS)}")
+        if tag_slice is None:
+            return pd.DataFrame(columns=['tag', 'other_tag', 'tweets', metric])
+
+        #Each pair is stored in the row of both hash tags, only the pair in the row of the smaller id is ranked
+        start, end = self.offsets[tag_slice * len(self.vocabulary)], self.offsets[(tag_slice + 1) * len(self.vocabulary)]
+        left = np.repeat(np.arange(len(self.vocabulary)), np.diff(self.offsets[tag_slice * len(self.vocabulary):(tag_slice + 1) * len(self.vocabulary) + 1]))
+        right, counts = self.columns[start:end], self.counts[start:end]
+        keep = (left < right) & (counts >= min_tweets)
+        left, right, counts = left[keep], right[keep], counts[keep]
+        weights = self.get_weights(tag_slice, left, right, counts, metric)
+
+        top = self.get_top(right, counts, weights, num, metric, positions=True)
+
+        return pd.DataFrame({'tag': np.asarray(self.vocabulary, dtype=object)[left[top]],
+                             'other_tag': np.asarray(self.vocabulary, dtype=object)[right[top]],
+                             'tweets': counts[top], metric: weights[top]})
+
+    def get_top(self, tag_ids, counts, weights, num, metric, positions=False):
+        """
+        Function to return the num entries with the highest weight, ties are ranked by shared tweets and then by hash tag id.
+        A partial sort selects the top entries before they are ordered, so a query only sorts num entries. No entries are
+        returned if num is zero or negative.
+        """
+        num = min(max(int(num), 0), len(weights))
+        if num == 0:
+            candidates = np.empty(0, dtype=np.int64)
+        elif num < len(weights):
+            #Entries tied with the num-th weight are all kept, so the order of the ties is decided by the full sort key
+            threshold = np.partition(weights, len(weights) - num)[len(weights) - num]
+            candidates = np.flatnonzero(weights >= threshold)
+        else:
+            candidates = np.arange(len(weights))
+
+        order = candidates[np.lexsort((tag_ids[candidates], -counts[candidates], -weights[candidates]))][:num]
+        if positions == True:
+            return order
+
+        return pd.DataFrame({'tweets': counts[order], metric: weights[order]},
+                            index=pd.Index(np.asarray(self.vocabulary, dtype=object)[tag_ids[order]], name='hash_tag'))
+
+    def to_frame(self, account_category=None):
+        """
+        Function to return the pairs of hash tags of a slice and their number of shared tweets, with each pair listed once.
+        """
+        return self.top_pairs(len(self.columns), 'tweets', account_category)[['tag', 'other_tag', 'tweets']]
+
+
+def count_chunk(tag_ids, row_lengths, cat_codes, num_tags, num_cats):
+    """
+    Function to count the hash tag pairs of a chunk of rows, returns the key of each distinct pair, encoded as
+    (category * num_tags + tag) * num_tags + other_tag with tag < other_tag, the number of rows containing each pair, and the
+    number of rows of each category containing each hash tag.
+    """
+    num_tags = np.int64(num_tags)
+
+    #Distinct hash tags of each row, sorted by row and hash tag id
+    rows = np.repeat(np.arange(len(row_lengths), dtype=np.int64), row_lengths)
+    row_tags = np.unique(rows * num_tags + tag_ids)
+    rows, tags = row_tags // num_tags, row_tags % num_tags
+    tag_cats = cat_codes[rows]
+    tag_tweets = np.bincount(tag_cats * num_tags + tags, minlength=num_cats * num_tags).reshape(num_cats, num_tags)
+
+    #Each hash tag of a row is paired with the following hash tags of the row, the occurrence at position p of a row of k
+    #hash tags has k - 1 - p pairs
+    lengths = np.bincount(rows, minlength=len(row_lengths))
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    num_pairs = np.repeat(lengths, lengths) - 1 - (np.arange(len(tags)) - starts)
+    left = np.repeat(np.arange(len(tags)), num_pairs)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(num_pairs) - num_pairs, num_pairs)
+
+    pair_keys, pair_counts = np.unique((tag_cats[left] * num_tags + tags[left]) * num_tags + tags[right], return_counts=True)
+
+    return (pair_keys, pair_counts.astype(np.int64), tag_tweets)
+
+
+def sum_keys(keys, counts):
+    """
+    Function to sum the counts of equal keys in lists of key and count arrays, returns the sorted distinct keys and their
+    summed counts.
+    """
+    keys = np.concatenate(keys) if len(keys) > 0 else np.empty(0, dtype=np.int64)
+    counts = np.concatenate(counts) if len(counts) > 0 else np.empty(0, dtype=np.int64)
+    if len(keys) == 0:
+        return (keys.astype(np.int64), counts.astype(np.int64))
+
+    order = np.argsort(keys, kind='stable')
+    keys, counts = keys[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+    return (keys[starts], np.add.reduceat(counts, starts))
+
+
+def symmetric_csr(pair_keys, pair_counts, num_tags, num_slices):
+    """
+    Function to return the CSR arrays of the symmetric matrices of the pair keys, with a row for each hash tag of each slice.
+    Each pair is stored in the row of both hash tags and the columns of each row are in ascending order.
+    """
+    tag_slices = pair_keys // (num_tags * num_tags)
+    left = pair_keys // num_tags % num_tags
+    right = pair_keys % num_tags
+
+    #Entry keys are the row, slice * num_tags + tag, and the column, sorted to group the entries by row
+    rows = np.concatenate([tag_slices * num_tags + left, tag_slices * num_tags + right])
+    columns = np.concatenate([right, left])
+    order = np.argsort(rows * num_tags + columns, kind='stable')
+
+    offsets = np.zeros(num_slices * num_tags + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_slices * num_tags), out=offsets[1:])
+
+    return (offsets, columns[order].astype(np.int32), np.concatenate([pair_counts, pair_counts])[order])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+
+from TweetTimeIndex import DATE_FORMAT, parse_dates
+
+
+#Dimensions of the cube, in the order of the cells
+CUBE_DIMENSIONS = ['account_category', 'class_sentiment', 'post_type', 'region', 'publish_month']
+
+#Columns of the processed tweets the cube is built from
+CUBE_COLUMNS = ['account_category', 'class_sentiment', 'post_type', 'region', 'publish_date', 'processed_content']
+
+
+class TweetCube:
+    """
+    Class containing the number of tweets for each combination of account category, sentiment class, post type, region and
+    publish month of the processed tweets. The cube is built with one scan of the tweets, charts and summaries are then computed
+    from its cells, which are few compared to the tweets.
+
+    Each cell has two measures:
+    1) tweets : the number of tweets
+    2) distinct : the number of tweets whose processed content, account category and sentiment class were not seen in an
+       earlier tweet, so that rolling the cube up by account category and sentiment class gives the number of distinct tweets
+       counted by the donut chart.
+    Missing dimension values are kept as cells, so the measures of every tweet are counted.
+    """
+    def __init__(self, cells):
+        """
+        Initialize the cube from a dataframe of cells, with a column for each dimension and measure.
+        """
+        self.cells = cells
+        self.dimensions = [col for col in CUBE_DIMENSIONS if col in cells.columns]
+
+    @classmethod
+    def from_frame(cls, df, date_format=DATE_FORMAT):
+        """
+        Function to build the cube from a dataframe containing the CUBE_COLUMNS of the processed tweets, publish dates that
+        are not parsed yet are parsed with the date_format.
+        """
+        publish_date = parse_dates(df['publish_date'], date_format)
+
+        #First occurrence of each processed content within its category and sentiment class, tweets without content are not distinct
+        distinct = ~df.duplicated(subset=['processed_content', 'account_category', 'class_sentiment']) & df['processed_content'].notna()
+
+        keys = df[CUBE_DIMENSIONS[:-1]].copy()
+        keys['publish_month'] = publish_date.dt.to_period('M').dt.start_time
+        keys['tweets'] = 1
+        keys['distinct'] = distinct.to_numpy(dtype=np.int64)
+
+        cells = keys.groupby(CUBE_DIMENSIONS, dropna=False, observed=True, sort=True)[['tweets', 'distinct']].sum().reset_index()
+
+        return cls(cells)
+
+    def slice(self, **filters):
+        """
+        Function to return the cube of the cells matching the filters, given as a dimension and a value or list of values.
+        """
+        keep = np.ones(len(self.cells), dtype=bool)
+        for dimension, values in filters.items():
+            if dimension not in self.dimensions:
+                raise KeyError(f"{dimension} is not a dimension of the cube.")
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            keep &= self.cells[dimension].isin(values).to_numpy()
+
+        return TweetCube(self.cells[keep].reset_index(drop=True))
+
+    def rollup(self, dimensions, measure='tweets', dropna=True, **filters):
+        """
+        Function to return the measure summed over every dimension not in the list of dimensions, as a series indexed by the
+        dimensions, for the cells matching the optional filters. Cells with a missing value in one of the dimensions are dropped
+        if dropna is set, as value_counts and groupby drop them.
+        """
+        cube = self.slice(**filters) if len(filters) > 0 else self
+        if isinstance(dimensions, str):
+            dimensions = [dimensions]
+
+        if len(dimensions) == 0:
+            return cube.cells[measure].sum()
+
+        return cube.cells.groupby(list(dimensions), dropna=dropna, observed=True)[measure].sum()
+
+    def value_counts(self, dimension, measure='tweets', **filters):
+        """
+        Function to return the measure for each value of a dimension sorted in descending order, as value_counts of the dimension
+        would return it.
+        """
+        counts = self.rollup(dimension, measure, **filters)
+
+        return counts[counts > 0].sort_values(ascending=False, kind='stable').rename('count')
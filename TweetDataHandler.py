@@ -5,21 +5,35 @@
 #Import modules
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt; plt.rcdefaults()
+import hashlib
+import json
 import re
 
 from ast import literal_eval
-from os import getcwd
-from nltk.corpus import stopwords
-from textblob import TextBlob, Word
-from translate import Translator
-from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from glob import glob
+from os import getcwd, path, remove, stat
+from TweetCache import TweetCache, TweetLemmaCache, TweetSentimentCache
+from TweetAggregator import TweetAggregator
+from TweetDataset import TweetDataset
+from TweetDuplicates import TweetDuplicates
+from TweetHashtagIndex import TweetHashtagIndex
+from TweetProfiler import TweetProfiler, profile_stage
+from TweetTimeIndex import DATE_FORMAT, parse_dates
 
 
 
 #Configure pandas option to display all columns included within the dataframe
 pd.set_option('display.max_columns',19)
-tqdm.pandas(desc="Progress: ")
+
+#Regular expressions of the text pre-processing steps, hyperlinks, hash tags and punctuation are removed from tweets
+LINK_PATTERN = re.compile(r'\w+:\/{2}[\d\w-]+(\.[\d\w-]+)*(?:(?:\/[^\s/]*))*')
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+#nltk, TextBlob and tqdm are imported by the steps that use them, so that importing the module and starting process pool
+#workers is fast
 
 class TweetDataHandler:
     """
@@ -39,6 +53,13 @@ class TweetDataHandler:
         contained in cache. 
         
 
+        The column list of a data source is used as the import schema, only the listed columns are read from the files. Columns
+        listed in the dtype dictionary that follows are read with the specified type, the remaining columns are read as strings
+        so that pandas does not need to infer the type of each column.
+
+        The "isParallelImport" configuration reads the data source files concurrently, using a pool of "import_workers" workers
+        (None lets the pool decide). The "import_executor" configuration selects a 'thread' or 'process' pool.
+
         The "isPreProc" configuration specifies whether the program will execute the pre-processing steps at run time, or retrieve the
         processed data from a file directory. Retrieving data from the file directory increases the speed of the program for it does
         not need to reprocess the data.
@@ -47,6 +68,44 @@ class TweetDataHandler:
         program will save the newly processed file to the designated location. If testing other features, and the preprocessed data is
         fine and the user sets the file number to less than the amount of files, this setting should be set to false to ensure the
         comprehensive dataset is not overwritten.
+        The lazy dataset shared with the calculator and visualizer derives columns without running tweet_pre_processing, its
+        processed data is stored by the save_dataset method once every pre-processed column has been derived.
+        
+        The "isCache" configuration stores the processed data in a columnar cache in the processed data directory. When "isPreProc"
+        is set to false, the cache is used if it was built from the current source files and pre-processing settings, otherwise the
+        data is pre-processed again and the cache rebuilt. Settings pre-fixed with "preproc_" are the pre-processing settings included
+        in the cache fingerprint, "preproc_version" should be incremented whenever the pre-processing steps change.
+
+        The "isIncremental" configuration pre-processes only the source files, or rows appended to source files, that have not been
+        processed before. All numbered files in the data directory are used, rather than the number of files in data_sources.
+        
+        The "isParallelPreproc" configuration splits the tweet text pre-processing into chunks of "text_chunk_size" tweets, which
+        are processed by a pool of "text_workers" processes (None uses one process per CPU). The result is identical to the serial
+        pre-processing steps.
+        
+        The "isLemmaCache" configuration lemmatizes each distinct word once, the lemmas are stored in the processed data directory
+        and reused between runs.
+        
+        The "isSentimentCache" configuration stores the sentiment of each distinct tweet in the processed data directory, keyed
+        by a hash of the tweet content, so repeated tweets are only scored once across runs. The "preproc_sentiment_fast"
+        configuration calculates polarity and subjectivity only, leaving the sentiment assessments empty.
+        
+        The "stream_chunk_size" configuration is the number of rows processed at a time by stream_pre_processing, which keeps
+        aggregates of the processed tweets instead of the tweets themselves. The "stream_cache_size" configuration is the number
+        of words and tweets kept in the lemma and sentiment caches while streaming, the oldest entries are discarded after each
+        chunk so the caches do not grow with the number of chunks.
+        
+        The "isCompact" configuration converts the processed dataframe to a compact layout, see compact_frame. The hash tags of
+        each tweet are then only available through the hash tag index. The get_memory_report method shows the memory used by
+        each column.
+        
+        The "cooccurrence_chunk_size" and "cooccurrence_workers" configurations are the number of tweets counted at a time when
+        building the hash tag co-occurrence matrix and the number of threads counting them (1 counts them in the calling thread),
+        see TweetCooccurrence.
+        
+        The "isProfile" configuration records the wall time, CPU time, rows in and out and peak memory of each stage as spans in the
+        profiler attribute, status messages are recorded as events. The "isSaveProfile" configuration is used by the save_profile
+        method, which stores the spans as JSON and as a Chrome trace file in the processed data directory.
         
         The "isMsg" configuration prints the status of program execution, also helpful while testing the program, but may be turned
         off after testing as it is less verbose. The settings pre-fixed with "msg_" are preset messages that display when the
@@ -70,7 +129,12 @@ class TweetDataHandler:
                      'account_type', 
                      'new_june_2018', 
                      'retweet',
-                     'account_category']]
+                     'account_category'],
+                    {'following': 'int64',
+                     'followers': 'int64',
+                     'updates': 'int64',
+                     'new_june_2018': 'int8',
+                     'retweet': 'int8'}]
             }
         
         self.cat_list = ['Fearmonger','Commercial', 'HashtagGamer','LeftTroll', 'NewsFeed', 'RightTroll']
@@ -79,12 +143,38 @@ class TweetDataHandler:
             "isMsg": True,
             "isPreProc":True,
             "isSavePreproc": True,
+            "isParallelImport": True,
+            "import_executor": 'thread',
+            "import_workers": None,
+            "isCache": True,
+            "isIncremental": False,
+            "isParallelPreproc": False,
+            "text_workers": None,
+            "text_chunk_size": 20000,
+            "isLemmaCache": True,
+            "isSentimentCache": True,
+            "preproc_sentiment_fast": False,
+            "preproc_sentiment_near_duplicates": False,
+            "stream_chunk_size": 100000,
+            "stream_cache_size": 100000,
+            "isCompact": False,
+            "cooccurrence_workers": 1,
+            "cooccurrence_chunk_size": 100000,
+            "date_columns": ['publish_date', 'harvested_date'],
+            "preproc_date_format": DATE_FORMAT,
+            "compact_category_columns": ['external_author_id', 'author', 'region', 'language', 'post_type', 'account_type',
+                                         'account_category', 'class_sentiment'],
+            "isProfile": True,
+            "isSaveProfile": False,
+            "preproc_version": 3,
             "msg_import":'status : reading file into temp data frame',
             "msg_import_preproc":'status : reading preprocessed file into dataframe',
             "msg_import_preproc_convert":'status : converting CSV string back to list',
             "msg_append":'status : appending temp data to data frame',
+            "msg_import_parallel":'status : reading files into data frame in parallel',
             "msg_summary": 'status : summarizing data',
             "msg_calculations":'status : performing calculations',
+            "msg_preproc_links":'status : removing hyperlinks from tweets',
             "msg_preproc_lower":'status : making tweets lower case',
             "msg_preproc_hashtagcat":'status : creating sets of hashtags by account category',
             "msg_preproc_complete":'status : data preprocessing complete',
@@ -92,24 +182,50 @@ class TweetDataHandler:
             "msg_preproc_punct":'status : removing tweet punctuation',
             "msg_preproc_tags":'status : removing hashtags from tweets',
             "msg_preproc_stop":'status : removing stopwords from tweets',
+            "msg_preproc_tokenize":'status : removing hyperlinks, hash tags, stopwords and punctuation and making tweets lower case',
             "msg_preproc_lemma":'status : performing tweet lemmatization',
+            "msg_preproc_parallel":'status : pre-processing tweet text in parallel',
             "msg_preproc_splitcols":'status : splitting dataframe column',
             "msg_preproc_save":'status : saving processed tweets, you can change the configuration to utilize this dataset after completing.',
             "msg_hash_links":'status : removing hyperlinks from tweets',
+            "msg_preproc_duplicates":'status : clustering near-duplicate tweets',
             "msg_preproc_sentiment":'status : calculating tweet sentiment',
             "msg_hash_tag":'status : retrieving and storing tweet hash tags for analysis',
+            "msg_hashtag_index":'status : indexing tweets by hash tag',
+            "msg_hashtag_cooccurrence":'status : counting hash tags used together',
+            "msg_cache_load":'status : reading processed tweets from cache',
+            "msg_cache_stale":'status : processed tweet cache is missing or out of date, pre-processing tweets',
+            "msg_cache_save":'status : saving processed tweets to cache',
+            "msg_compact":'status : converting dataframe to compact layout',
+            "msg_stream":'status : pre-processing tweets in chunks',
+            "msg_incremental":'status : checking source files for unprocessed tweets',
+            "msg_incremental_file":'status : pre-processing new tweets from source file',
+            "msg_incremental_merge":'status : merging processed tweets',
+            "msg_server_load":'status : loading processed tweets and indexes for the query server',
+            "msg_server_ready":'status : query server is ready',
             }
 
         #Get current directory for relative reference of data source paths
         self.my_path = getcwd()
+        
+        #Lemma and sentiment caches, loaded when first used
+        self.lemma_cache = None
+        self.sentiment_cache = None
+        
+        #Spans of each stage, shared with the calculator and visualizer
+        self.profiler = TweetProfiler(enabled=self.config["isProfile"])
+        
+        #Lazy dataset shared with the calculator and visualizer, created when first used
+        self.dataset = None
 
     
     def msg_handle(self,message):
         """
         Method used to display program status messages. The method is called using the key for the
         dictionary with the configured status message. If the "isMsg" configuration is set to false,
-        no message is printed at run-time.
+        no message is printed at run-time. The message is also recorded as an event by the profiler.
         """
+        self.profiler.event(message)
 
         #Check if isMsg is configured
         if self.config["isMsg"] == True:
@@ -119,11 +235,10 @@ class TweetDataHandler:
                 #Print the message for the provided key value
                 print(self.config[message])
                 
-    def get_csv_data(self,data_source):
+    def get_csv_files(self,data_source):
         """
-        Function to retrieve CSV data source, based on information contained within the config dictionary.
+        Function to return the list of file paths for a data source, based on information contained within the data_sources dictionary.
         """
-
         tweet_object = self.data_sources[data_source]
         #File path extension index in data_sources values
         file_path = tweet_object[0][0]
@@ -133,63 +248,168 @@ class TweetDataHandler:
         
         #Number of files index in data_sources values
         number_of_files = tweet_object[0][2]
-        data = pd.DataFrame()
+        
+        #Incremental pre-processing picks up every numbered file in the data directory, including files added after the first run
+        if self.config["isIncremental"] == True:
+            files = glob(self.my_path + file_path + "*" + file_ext)
+            file_nums = [file[len(self.my_path + file_path):-len(file_ext)] for file in files]
+            
+            return [self.my_path + file_path + file_num + file_ext for file_num in sorted(
+                (num for num in file_nums if num.isdigit()), key=int)]
+
+        return [self.my_path + file_path + str(file_num) + file_ext for file_num in range(1, number_of_files + 1)]
 
-        #Loop through file path for number of files to be imported
-        file_num = 1
+    def get_csv_schema(self,data_source):
+        """
+        Function to return the usecols and dtype arguments used to read a data source, the columns declared in the
+        data_sources dictionary are read as strings unless a dtype is specified for them.
+        """
+        tweet_object = self.data_sources[data_source]
+        columns = tweet_object[1]
+        dtypes = tweet_object[2] if len(tweet_object) > 2 else {}
+
+        return (columns, {col: dtypes.get(col, 'object') for col in columns})
+
+    def get_date_schema(self, columns):
+        """
+        Function to return the date_columns and date_format arguments used to parse the "date_columns" of a data source that
+        are read, see read_csv_file.
+        """
+        return ([col for col in self.config["date_columns"] if col in columns], self.config["preproc_date_format"])
+
+    @profile_stage
+    def get_csv_data(self,data_source, columns=None):
+        """
+        Function to retrieve CSV data source, based on information contained within the config dictionary. If columns is
+        provided, only those columns of the data source schema are read.
+        """
+        files = self.get_csv_files(data_source)
+        schema_columns, dtypes = self.get_csv_schema(data_source)
         
-        while file_num <= number_of_files:
+        #Columns are read in schema order
+        columns = [col for col in schema_columns if columns is None or col in columns]
+        dtypes = {col: dtypes[col] for col in columns}
+        date_columns, date_format = self.get_date_schema(columns)
+
+        if self.config["isParallelImport"] == True and len(files) > 1:
+            self.msg_handle("msg_import_parallel")
+            
+            #Thread pool shares the process memory, process pool avoids the GIL at the cost of copying each frame back
+            if self.config["import_executor"] == 'process':
+                executor = ProcessPoolExecutor(max_workers=self.config["import_workers"])
+            else:
+                executor = ThreadPoolExecutor(max_workers=self.config["import_workers"])
+            
+            #Map preserves the file order so the concatenated frame matches the serial import
+            with executor:
+                frames = list(executor.map(read_csv_file, files, [columns] * len(files), [dtypes] * len(files),
+                                           [date_columns] * len(files), [date_format] * len(files)))
+        else:
+            frames = []
+            
+            #Loop through file path for number of files to be imported
+            for file in files:
                 self.msg_handle("msg_import")
-               
-                #Read csv file into dataframe
-                df = pd.read_csv(self.my_path + file_path + str(file_num) + file_ext)
-
-                #Append csv file to dataframe
-                data = data.append(df)
-                self.msg_handle("msg_append")
-                file_num += 1
+                
+                #Read csv file into list of dataframes, concatenated once all files are read
+                frames.append(read_csv_file(file, columns, dtypes, date_columns, date_format))
+
+        #Concatenate all files in a single copy
+        self.msg_handle("msg_append")
+        data = pd.concat(frames, ignore_index=True)
                 
         return data
 
     def get_hash_tags(self,df,df_col):
         """
         Function to retrieve hash tags from data. Returns a series of hashtags to join to the troll tweet datafrme
-        by index. Also returns a set of distinct hash tags.
+        by index, tweets without content have an empty list of hash tags. Also returns a set of distinct hash tags.
         """
         self.msg_handle("msg_hash_tag")
-        hash_tags_list = []
         
-        for i in df[df_col]:
-            try:
-                #Regular expression to locate all hash tag values
-                hash_tag = re.findall(r"#(\w+)",i)
-                
-                #Append hash_tags list with a list of each tweet's hash tags
-                hash_tags_list.append(hash_tag)
-            except TypeError:
-                continue
-
-        #Create pandas series to join to troll tweet dataframe   
-        hash_tag_series = pd.Series(hash_tags_list, name='hash_tags')
+        #Regular expression to locate all hash tag values, the series keeps the index of the dataframe
+        hash_tag_series = df[df_col].str.findall(r"#(\w+)").rename('hash_tags')
+        
+        #Tweets without string content have no hash tags, an empty list is used so that no rows are dropped
+        missing = hash_tag_series.isna()
+        if missing.any():
+            hash_tag_series[missing] = pd.Series([[] for i in range(missing.sum())], index=hash_tag_series.index[missing], dtype=object)
 
-        #List comprehension to extract hash tags from nested lists, and a set is constructed to filter for distinct values
-        distinct_hash_tags = set([item for sublist in hash_tags_list for item in sublist])
+        #Explode the nested lists into a flat series of hash tags, and a set is constructed to filter for distinct values
+        distinct_hash_tags = set(hash_tag_series.explode().dropna())
 
         return (hash_tag_series, distinct_hash_tags)
     
+    @profile_stage
     def get_cat_hash_tags(self):
         """
-        Function to return hashtags by account category
+        Function to return hashtags by account category, as a list of sets in the order of cat_list
         """
         self.msg_handle("msg_preproc_hashtagcat")
-        hashtag_set_list = []
-        for i in self.cat_list:
-            cat_hashtags = self.troll_tweet_df[self.troll_tweet_df['account_category'] == i]['hash_tags'].tolist()
-            hashtag_set_list.append(set([item for sublist in cat_hashtags for item in sublist]))        
+        
+        #Hash tag membership of every category is computed in one pass over the hash tag index, as a bitset per category
+        self.category_bitsets = self.hashtag_index.category_bitsets(self.troll_tweet_df['account_category'], self.cat_list)
+        hashtag_set_list = [self.hashtag_index.bitset_tags(bitset) for bitset in self.category_bitsets]
             
         return hashtag_set_list
+
+    def get_cat_hash_tag_overlap(self, metric='intersection'):
+        """
+        Function to return a matrix of the hash tags shared by each pair of account categories in cat_list, as a count of shared
+        hash tags ('intersection') or the share of the hash tags used by either category ('jaccard').
+        """
+        return TweetHashtagIndex.bitset_overlap(self.get_dataset().get_category_bitsets(), self.cat_list, metric)
+            
+
+    @profile_stage
+    def get_hashtag_index(self):
+        """
+        Function to return an inverted index from each hash tag to the troll tweet dataframe rows that contain it.
+        """
+        self.msg_handle("msg_hashtag_index")
+        
+        return TweetHashtagIndex(self.troll_tweet_df['hash_tags'])
+
+    @profile_stage
+    def compact_frame(self, df):
+        """
+        Function to return a compact copy of a troll tweet dataframe. Columns in "compact_category_columns" become categoricals,
+        integer columns use the narrowest integer type that holds their values, and the hash_tags column is dropped as the hash
+        tags are held as interned ids in the hash tag index.
+        """
+        self.msg_handle("msg_compact")
+        df = df.drop(columns=['hash_tags'], errors='ignore')
+        
+        for col in self.config["compact_category_columns"]:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        for col in df.select_dtypes(include='integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='unsigned' if df[col].min() >= 0 else 'integer')
             
+        return df
 
+    def get_memory_report(self, df=None):
+        """
+        Function to return the memory used by each column of the troll tweet dataframe, and by the arrays of the hash tag index.
+        """
+        df = self.troll_tweet_df if df is None else df
+        memory = df.memory_usage(index=True, deep=True)
+        report = pd.DataFrame({
+                'dtype': [str(df.index.dtype)] + [str(dtype) for dtype in df.dtypes],
+                'bytes': memory.values
+                }, index=memory.index)
+        
+        if hasattr(self, 'hashtag_index'):
+            for name, nbytes in self.hashtag_index.memory_usage().items():
+                report.loc['hashtag_index.' + name] = ['array', nbytes]
+        
+        report['megabytes'] = (report['bytes'] / 2 ** 20).round(2)
+        report.loc['Total'] = ['', report['bytes'].sum(), round(report['bytes'].sum() / 2 ** 20, 2)]
+        
+        return report
+
+    @profile_stage
     def put_hash_tags(self,df,df_col):
         """
         Method to join hash_tag_series to troll tweet dataframe by index, so that dataframe contains
@@ -204,12 +424,13 @@ class TweetDataHandler:
         #Upack distinct_hash_tags from tuple returned by get_hash_tags function
         distinct_hash_tags = data[1]
 
-        #Join hash_tag_series to dataframe
-        df = pd.concat([df, hash_tag_series], axis=1, join='inner')
+        #Join hash_tag_series to dataframe, aligned on the dataframe index
+        df = df.assign(hash_tags=hash_tag_series)
         distinct_hash_tags = pd.Series(list(distinct_hash_tags),name='distinct_hashtags')
         
         return (df,distinct_hash_tags)
     
+    @profile_stage
     def run_troll_tweets(self):
         """
         Method used to get csv data for the configured "troll_tweets" data source, update
@@ -240,108 +461,681 @@ class TweetDataHandler:
         Function to retrieve tweet sentiment for tweets using TextBlob, includes polarity, subjectivity and individual
         assessments of significant words
         """
+        from textblob import TextBlob
+        
         analysis = TextBlob(tweet)
         
         return list(analysis.sentiment_assessments)
+
+    def get_tweet_sentiment_fast(self, tweet):
+        """
+        Function to retrieve tweet sentiment for tweets using TextBlob, includes polarity and subjectivity only. The individual
+        assessments of significant words are not calculated and are returned as None.
+        """
+        from textblob import TextBlob
+        
+        analysis = TextBlob(tweet).sentiment
+        
+        return [analysis.polarity, analysis.subjectivity, None]
+
+    @profile_stage
+    def get_batch_sentiment(self, tweets):
+        """
+        Function to retrieve the sentiment of a series of tweets. Each distinct tweet is scored once and the result is broadcast
+        to every row containing it. If the "isSentimentCache" configuration is set, scores are kept in a cache keyed by a hash of
+        the tweet content and reused between runs. If the "preproc_sentiment_fast" configuration is set, only polarity and
+        subjectivity are calculated. If the "preproc_sentiment_near_duplicates" configuration is set, near-duplicate tweets are
+        clustered first and each tweet is given the sentiment of the first tweet of its cluster, see TweetDuplicates.
+        """
+        fast = self.config["preproc_sentiment_fast"] == True
+        get_sentiment = self.get_tweet_sentiment_fast if fast else self.get_tweet_sentiment
+        
+        #Near-duplicate tweets are scored once, with the content of the first tweet of their cluster
+        if self.config["preproc_sentiment_near_duplicates"] == True:
+            self.msg_handle("msg_preproc_duplicates")
+            duplicates = TweetDuplicates()
+            duplicates.fit(tweets)
+            tweets = pd.Series(tweets.to_numpy()[duplicates.get_representatives()], index=tweets.index)
+        
+        #Distinct tweets and the position of each row's tweet in the distinct tweets
+        codes, distinct_tweets = pd.factorize(tweets)
+        
+        if self.config["isSentimentCache"] == True:
+            distinct_sentiment = self.get_sentiment_cache(fast).get_sentiment(distinct_tweets, get_sentiment)
+        else:
+            distinct_sentiment = [get_sentiment(tweet) for tweet in get_tqdm()(distinct_tweets, desc="Progress: ")]
+        
+        #Broadcast the sentiment of each distinct tweet to its rows
+        sentiment = np.empty(len(distinct_sentiment), dtype=object)
+        sentiment[:] = distinct_sentiment
+        
+        return pd.Series(sentiment[codes], index=tweets.index, name='sentiment')
     
     
-    def tweet_pre_processing(self):
+    def get_cache_settings(self):
         """
-        Method used for manipulating tweet content for NLP methods and text analytics.
-        Includes steps for:
-        1) Removing hyperlinks
-        2) Removing hash tags
-        3) Remove punctuation
-        5) Make all words lower case
-        6) Remove Stop-words
-        7) Lemmatization
-        8) Sentiment Analysis calculations
+        Function to return the pre-processing settings included in the cache fingerprint.
+        """
+        return {key: value for key, value in self.config.items() if key.startswith("preproc_")}
+
+    def get_cache_fingerprint(self):
         """
-   
+        Function to return the fingerprint of the troll tweet source files and pre-processing settings.
+        """
+        return TweetCache.fingerprint(self.get_csv_files('troll_tweets'), self.get_cache_settings())
+
+    @profile_stage
+    def clean_tweet_text(self, processed_tweets):
+        """
+        Function to run the text pre-processing steps of tweet_pre_processing on a series of tweets. If the "isParallelPreproc"
+        configuration is set, the series is split into chunks of "text_chunk_size" tweets that are processed by a pool of
+        "text_workers" processes, the processed chunks are reassembled in index order so the result matches the serial steps.
+        If the "isLemmaCache" configuration is set, the tweets are lemmatized with the lemma cache after the other steps.
+        """
+        stop = get_stopwords()
         
-        #Condition to check if pre-processing is enabled, if false method retrieves processed data from csv file location
-        if self.config["isPreProc"] == True:
+        #Lemmatization is performed after the other steps if the lemma cache is used
+        lemmatize = self.config["isLemmaCache"] == False
+        
+        #Each tweet is split into words once, the words are lemmatized with the lemma cache before they are joined
+        if self.config["isParallelPreproc"] == False or len(processed_tweets) <= self.config["text_chunk_size"]:
+            self.msg_handle("msg_preproc_tokenize")
+            processed_tweets = tokenize_tweets(processed_tweets, stop, lemmatize, progress=True)
+        else:
+            processed_tweets = self.clean_tweet_chunks(processed_tweets, stop, lemmatize)
+        
+        if lemmatize == False:
+            return self.lemmatize_tweets(processed_tweets)
             
-            #Run troll tweet process
-            self.tweedle_collection = self.run_troll_tweets()
-            self.troll_tweet_df = self.tweedle_collection[0]
-            self.distinct_hashtags = self.tweedle_collection[1]
+        return processed_tweets.map(" ".join)
+
+    def get_query_words(self, query):
+        """
+        Function to return the words of a search query as they appear in the processed tweets, the query goes through the text
+        pre-processing steps of the tweets so that words are matched to their lemma. The stopwords and the lemma cache are only
+        read, so queries may be answered from several threads.
+        """
+        lemmatize = self.config["isLemmaCache"] == False
+        words = tokenize_tweets(pd.Series([query], dtype=object), get_stopwords(), lemmatize)
+        words = words.iloc[0] if len(words) > 0 else []
+        if lemmatize == False:
+            words = self.get_lemma_cache().lookup(words)
+        
+        return words
+
+    @profile_stage
+    def clean_tweet_chunks(self, processed_tweets, stop, lemmatize=True):
+        """
+        Function to run the text pre-processing steps on chunks of "text_chunk_size" tweets in a pool of processes, the lists of
+        words of the processed chunks are reassembled in index order.
+        """
+        self.msg_handle("msg_preproc_parallel")
+        chunk_size = self.config["text_chunk_size"]
+        chunks = [processed_tweets.iloc[i:i + chunk_size] for i in range(0, len(processed_tweets), chunk_size)]
+        
+        with ProcessPoolExecutor(max_workers=self.config["text_workers"]) as executor:
+            futures = {executor.submit(tokenize_tweets, chunk, stop, lemmatize): chunk_num for chunk_num, chunk in enumerate(chunks)}
             
-            #Copy twitter data for pre-processing
-            self.troll_tweet_df = self.troll_tweet_df[self.troll_tweet_df['language'] == 'English']
+            #Report progress as chunks complete, keeping each result in its chunk position
+            results = [None] * len(chunks)
+            for future in get_tqdm()(as_completed(futures), total=len(futures), desc="Progress: "):
+                results[futures[future]] = future.result()
+        
+        return pd.concat(results)
 
-            #Filter null tweet content
-            self.processed_tweets = pd.Series(self.troll_tweet_df['content'],index=self.troll_tweet_df.index, name='processed_content')
+    @profile_stage
+    def lemmatize_tweets(self, processed_tweets):
+        """
+        Function to lemmatize a series of processed tweets, or of their lists of words, using the lemma cache. Words missing from the cache are lemmatized
+        once, in the text pre-processing process pool if "isParallelPreproc" is set.
+        """
+        self.msg_handle("msg_preproc_lemma")
+        workers = (self.config["text_workers"] or 0) if self.config["isParallelPreproc"] == True else None
+        
+        return self.get_lemma_cache().lemmatize(processed_tweets, workers)
+
+    def get_lemma_cache(self):
+        """
+        Function to return the lemma cache, which is loaded from the processed data directory the first time it is used.
+        """
+        if self.lemma_cache is None:
+            self.lemma_cache = TweetLemmaCache(self.my_path + "\\data\\" + "Processed\\lemma_cache.json")
             
-            #Removing hyperlinks from twitter data, regular expression used to identify URLS, placed before hash tag and punctuation removal to effectively do so
-            self.msg_handle("msg_preproc_links")
-            self.processed_tweets = self.processed_tweets.str.replace(r'\w+:\/{2}[\d\w-]+(\.[\d\w-]+)*(?:(?:\/[^\s/]*))*','')
+        return self.lemma_cache
+
+    def get_sentiment_cache(self, fast=False):
+        """
+        Function to return the sentiment cache, which is loaded from the processed data directory the first time it is used.
+        """
+        if self.sentiment_cache is None or self.sentiment_cache.mode != ("fast" if fast else "full"):
+            self.sentiment_cache = TweetSentimentCache(self.my_path + "\\data\\" + "Processed\\sentiment_cache.pkl", fast)
             
-            #Removing hash tags from twitter data, regular expression used to replace tweets with nothing
-            self.msg_handle("msg_preproc_tags")
-            self.processed_tweets = self.processed_tweets.str.replace('#(\w+)','')
-            self.processed_tweets = self.processed_tweets[self.processed_tweets.isna()==False]
+        return self.sentiment_cache
+
+    @profile_stage
+    def save_text_caches(self):
+        """
+        Method to store the lemma and sentiment caches that were used, called once pre-processing is complete so that the caches
+        are written once rather than for every processed chunk.
+        """
+        for cache in (self.lemma_cache, self.sentiment_cache):
+            if cache is not None:
+                cache.save()
+
+    @profile_stage
+    def process_tweet_frame(self, df):
+        """
+        Function to run the pre-processing steps described in tweet_pre_processing on a dataframe of tweets that includes the
+        hash_tags column. Returns the English tweets joined to their processed content and sentiment.
+        """
+        #Copy twitter data for pre-processing
+        df = df[df['language'] == 'English']
+
+        #Filter null tweet content
+        processed_tweets = pd.Series(df['content'],index=df.index, name='processed_content')
+        
+        #Removing hyperlinks, hash tags, stopwords and punctuation, making tweets lower case and lemmatization
+        processed_tweets = self.clean_tweet_text(processed_tweets)
+                   
+        processed_tweets = self.get_sentiment_frame(processed_tweets)
+        
+        #Join processed tweets to dataframe
+        df = df.join(processed_tweets, how='left')
+        
+        #Classify tweets based on polarity
+        df['class_sentiment'] = self.classify_sentiment(df['sent_polarity'])
+        
+        return df
+
+    @profile_stage
+    def get_sentiment_frame(self, processed_tweets):
+        """
+        Function to return a dataframe of processed tweets and their sentiment, with the sentiment split into polarity,
+        subjectivity and assessment columns.
+        """
+        processed_tweets = pd.DataFrame(processed_tweets, index = processed_tweets.index)
+        
+        #Get Tweet Sentiment - polarity, subjectivity and textblob assessments
+        self.msg_handle("msg_preproc_sentiment")
+        processed_tweets['sentiment'] = self.get_batch_sentiment(processed_tweets['processed_content'])
+       
+        #Split tweet sentiment containing list  into muliple columns
+        self.msg_handle("msg_preproc_splitcols")
+        processed_tweets[['sent_polarity', 'sent_subjectivity', 'sent_assessments']] = pd.DataFrame(processed_tweets.sentiment.values.tolist(), index=processed_tweets.index)
+        
+        return processed_tweets
+
+    def classify_sentiment(self, sent_polarity):
+        """
+        Function to classify tweets as neutral, positive or negative based on a series of sentiment polarity values, tweets
+        without a polarity are not classified.
+        """
+        self.msg_handle("msg_preproc_class")
+        
+        conditions = [
+                (sent_polarity == 0.00),
+                (sent_polarity > 0.00),
+                (sent_polarity < 0.00)
+                     ]
+        choices = ['neutral', 'positive', 'negative']
+        
+        return np.select(conditions, choices, default= None)
+
+    @profile_stage
+    def run_pre_processing(self):
+        """
+        Method used to run the troll tweet process and the pre-processing steps described in tweet_pre_processing. If the
+        "isIncremental" configuration is set, only source data that has not been processed before is pre-processed.
+        """
+        if self.config["isIncremental"] == True:
+            return self.run_incremental_pre_processing()
+        
+        #Run troll tweet process
+        self.tweedle_collection = self.run_troll_tweets()
+        self.troll_tweet_df = self.tweedle_collection[0]
+        self.distinct_hashtags = self.tweedle_collection[1]
+        
+        self.troll_tweet_df = self.process_tweet_frame(self.troll_tweet_df)
+        self.save_text_caches()
+        
+        return (self.troll_tweet_df, self.distinct_hashtags)
+
+    def get_incremental_manifest(self):
+        """
+        Function to return the manifest of source files and row ranges that have already been pre-processed. An empty manifest
+        is returned if there is none, or if it was created with different pre-processing settings.
+        """
+        manifest_file = self.my_path + "\\data\\" + "Processed\\incremental_manifest.json"
+        empty_manifest = {"settings": self.get_cache_settings(), "files": {}}
+        
+        if not path.exists(manifest_file):
+            return empty_manifest
+        
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        
+        #Processed parts can only be reused if they were created with the same pre-processing settings
+        if manifest["settings"] != empty_manifest["settings"]:
+            return empty_manifest
+        
+        return manifest
+
+    @profile_stage
+    def run_incremental_pre_processing(self):
+        """
+        Method used to pre-process only the source data that has not been processed before. The manifest records the size, content
+        hash and processed row ranges of each source file:
+        1) New files are processed in full
+        2) Files that have grown, with unchanged existing content, have only the new rows processed
+        3) Files that have otherwise changed are processed again in full
+        4) Unchanged files are not processed, and are not read unless their modification time changed
+        
+        Each processed row range is stored as a part in the processed data directory, the parts are then merged into the troll
+        tweet dataframe and the distinct hash tags.
+        """
+        self.msg_handle("msg_incremental")
+        cache_dir = self.my_path + "\\data\\" + "Processed\\"
+        manifest = self.get_incremental_manifest()
+        settings_key = TweetCache.fingerprint([], manifest["settings"])
+        columns, dtypes = self.get_csv_schema('troll_tweets')
+        date_columns, date_format = self.get_date_schema(columns)
+        
+        files = self.get_csv_files('troll_tweets')
+        processed_files = {}
+        
+        for file in files:
+            file_stat = stat(file)
+            file_size = file_stat.st_size
+            record = manifest["files"].get(file)
             
-            #Removing stopwords from twitter data
-            self.msg_handle("msg_preproc_stop")
-            stop = stopwords.words('english')
-            self.processed_tweets = self.processed_tweets.progress_apply(lambda x: " ".join(x for x in x.split() if x not in stop))
+            #Unchanged files are skipped, the content is only hashed if the file was modified without changing size
+            if record is not None and record["size"] == file_size and (
+                    record["mtime"] == file_stat.st_mtime_ns or record["sha1"] == file_prefix_hash(file, file_size)):
+                processed_files[file] = dict(record, mtime=file_stat.st_mtime_ns)
+                continue
             
-            #Removing punctuation from twitter data, regular expression used to replace punctuation with nothing
-            self.msg_handle("msg_preproc_punct")
-            self.processed_tweets = self.processed_tweets.str.replace('[^\w\s]','')
-                       
-            #Removing null tweets, after applying preprocessing for other pre-processing methods
-            self.processed_tweets = self.processed_tweets[self.processed_tweets.isna() == False]
+            self.msg_handle("msg_incremental_file")
+            data = read_csv_file(file, columns, dtypes, date_columns, date_format)
             
-            #Making twitter data lower case
-            self.msg_handle("msg_preproc_lower")
-            self.processed_tweets= self.processed_tweets.progress_apply(lambda x: " ".join(x.lower() for x in x.split()))
-        
+            #Only process rows appended to a file if the previously processed content of the file is unchanged
+            if record is not None and record["size"] < file_size and file_prefix_hash(file, record["size"]) == record["sha1"]:
+                parts = record["parts"]
+                start_row = record["rows"]
+            else:
+                parts = []
+                start_row = 0
             
-            #Lemmatization
-            self.msg_handle("msg_preproc_lemma")
-            self.processed_tweets = self.processed_tweets.progress_apply(lambda x: " ".join([Word(word).lemmatize() for word in x.split()]))
-                       
-            self.processed_tweets = pd.DataFrame(self.processed_tweets, index = self.processed_tweets.index)
+            #Process the row delta, the hash tags are extracted before rows are filtered so the range index is restored afterwards
+            delta = data.iloc[start_row:].reset_index(drop=True)
+            delta_df, delta_hashtags = self.put_hash_tags(delta, "content")
+            delta_df = self.process_tweet_frame(delta_df)
+            delta_df.index = delta_df.index + start_row
             
-            #Get Tweet Sentiment - polarity, subjectivity and textblob assessments
-            self.msg_handle("msg_preproc_sentiment")
-            self.processed_tweets['sentiment'] = self.processed_tweets['processed_content'].progress_apply(self.get_tweet_sentiment)
-           
-            #Split tweet sentiment containing list  into muliple columns
-            self.msg_handle("msg_preproc_splitcols")
-            self.processed_tweets[['sent_polarity', 'sent_subjectivity', 'sent_assessments']] = pd.DataFrame(self.processed_tweets.sentiment.values.tolist(), index=self.processed_tweets.index)
+            part_name = "incremental_" + path.splitext(path.basename(file))[0] + "_" + str(start_row) + "_" + str(len(data))
+            TweetCache(cache_dir, part_name).save(delta_df, settings_key, str_columns=['sentiment', 'sent_assessments'])
+            TweetCache(cache_dir, part_name + "_hashtags").save(pd.DataFrame(delta_hashtags), settings_key)
             
-            #Join processed tweets to dataframe
-            self.troll_tweet_df = self.troll_tweet_df.join(self.processed_tweets, how='left')
+            processed_files[file] = {
+                "size": file_size,
+                "mtime": file_stat.st_mtime_ns,
+                "sha1": file_prefix_hash(file, file_size),
+                "rows": len(data),
+                "parts": parts + [[start_row, len(data), part_name]]
+                }
+        
+        #Remove parts of source files that were removed or processed again in full
+        current_parts = set(part[2] for record in processed_files.values() for part in record["parts"])
+        for record in manifest["files"].values():
+            for part in record["parts"]:
+                if part[2] not in current_parts:
+                    for part_cache in (TweetCache(cache_dir, part[2]), TweetCache(cache_dir, part[2] + "_hashtags")):
+                        for part_file in (part_cache.data_file, part_cache.meta_file):
+                            if path.exists(part_file):
+                                remove(part_file)
+        
+        self.save_text_caches()
+        
+        manifest["files"] = processed_files
+        with open(cache_dir + "incremental_manifest.json", 'w') as f:
+            json.dump(manifest, f)
+        
+        #Merge the processed parts, offsetting each file's row numbers so the index matches a full pre-processing run
+        self.msg_handle("msg_incremental_merge")
+        frames = []
+        distinct_hash_tags = set()
+        file_offset = 0
+        for file in files:
+            for part in processed_files[file]["parts"]:
+                part_df = TweetCache(cache_dir, part[2]).load(list_columns=['hash_tags'])
+                part_df.index = part_df.index + file_offset
+                frames.append(part_df)
+                distinct_hash_tags.update(TweetCache(cache_dir, part[2] + "_hashtags").load()['distinct_hashtags'])
+            file_offset += processed_files[file]["rows"]
+        
+        self.troll_tweet_df = pd.concat(frames)
+        self.distinct_hashtags = pd.Series(list(distinct_hash_tags), name='distinct_hashtags')
+        
+        #Store distinct hash tags for later use
+        if self.config["isSavePreproc"] == True:
+            self.distinct_hashtags.to_csv(self.my_path + "\\data\\" + "Processed\\distinct_hashtags.csv")
+        
+        return (self.troll_tweet_df, self.distinct_hashtags)
+
+    def iter_troll_tweet_chunks(self, chunk_size):
+        """
+        Generator returning the troll tweet source data in dataframes of up to chunk_size rows. Rows are numbered across all
+        source files, so the index of each chunk matches the index of the data returned by get_csv_data.
+        """
+        columns, dtypes = self.get_csv_schema('troll_tweets')
+        date_columns, date_format = self.get_date_schema(columns)
+        row_offset = 0
+        
+        for file in self.get_csv_files('troll_tweets'):
+            self.msg_handle("msg_import")
+            for chunk in pd.read_csv(file, usecols=columns, dtype=dtypes, chunksize=chunk_size):
+                chunk = parse_date_columns(chunk, date_columns, date_format)
+                chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+                row_offset += len(chunk)
+                yield chunk
+
+    def iter_pre_processing(self, chunk_size):
+        """
+        Generator returning the processed troll tweets in chunks, each chunk of source data has its hash tags extracted and
+        goes through the pre-processing steps before it is returned with its distinct hash tags.
+        """
+        for chunk in self.iter_troll_tweet_chunks(chunk_size):
+            chunk, distinct_hash_tags = self.put_hash_tags(chunk, "content")
             
-            #Classify tweets based on polarity
-            self.msg_handle("msg_preproc_class")
+            yield (self.process_tweet_frame(chunk), distinct_hash_tags)
+
+    @profile_stage
+    def stream_pre_processing(self, chunk_size=None):
+        """
+        Method used to pre-process the troll tweets in chunks of "stream_chunk_size" rows, so that memory use depends on the
+        chunk size rather than the size of the dataset. The processed tweets are not kept, instead each chunk is added to a
+        TweetAggregator and, if "isSavePreproc" is set, appended to the processed CSV file. The lemma and sentiment caches are
+        trimmed to "stream_cache_size" entries after each chunk, so the stored caches hold the most recent entries. Returns the
+        aggregator, the distinct hash tags are stored in the distinct_hashtags attribute.
+        """
+        self.msg_handle("msg_stream")
+        chunk_size = chunk_size or self.config["stream_chunk_size"]
+        output_file = self.my_path + "\\data\\" + "Processed\\processed_tweets.csv"
+        
+        self.aggregator = TweetAggregator()
+        distinct_hash_tags = set()
+        
+        for chunk_num, (chunk, chunk_hash_tags) in enumerate(self.iter_pre_processing(chunk_size)):
+            self.aggregator.update(chunk)
+            distinct_hash_tags.update(chunk_hash_tags)
+            
+            #Write the processed chunk, the header is only written with the first chunk
+            if self.config["isSavePreproc"] == True:
+                chunk.to_csv(output_file, mode='w' if chunk_num == 0 else 'a', header=chunk_num == 0)
+            
+            #Discard the oldest cached lemmas and scores, so the caches do not grow with the number of chunks
+            for cache in (self.lemma_cache, self.sentiment_cache):
+                if cache is not None:
+                    cache.trim(self.config["stream_cache_size"])
+        
+        self.save_text_caches()
+        self.distinct_hashtags = pd.Series(list(distinct_hash_tags), name='distinct_hashtags')
+        
+        #Store distinct hash tags for later use
+        if self.config["isSavePreproc"] == True:
+            self.distinct_hashtags.to_csv(self.my_path + "\\data\\" + "Processed\\distinct_hashtags.csv")
+        
+        self.msg_handle("msg_preproc_complete")
+        return self.aggregator
+
+    @profile_stage
+    def save_pre_processing(self):
+        """
+        Method used to store the processed tweets to the CSV file location for later use.
+        """
+        #Store processed tweets to CSV for later use
+        self.msg_handle("msg_preproc_save")
+        self.troll_tweet_df.to_csv(self.my_path + "\\data\\" + "Processed\\processed_tweets.csv")
+
+    @profile_stage
+    def save_dataset(self):
+        """
+        Method used to store the processed tweets derived by the lazy dataset, as tweet_pre_processing stores them with the
+        "isSavePreproc" and "isCache" configurations. Nothing is stored unless the dataset derived every pre-processed column
+        from the source files, so a run that only read source columns does not pre-process the tweets to store them.
+        """
+        dataset = self.get_dataset()
+        if dataset.get_source() != 'source' or not dataset.has_derived_columns():
+            return
+        
+        #The cache is only stored with the processed file when pre-processing is enabled, as in tweet_pre_processing
+        save_file = self.config["isSavePreproc"] == True
+        save_cache = self.config["isCache"] == True and (save_file or self.config["isPreProc"] == False)
+        if save_file == False and save_cache == False:
+            return
+        
+        self.troll_tweet_df = dataset.get_processed_frame()
+        self.distinct_hashtags = dataset.get_distinct_hashtags()
+        
+        if save_file == True:
+            self.distinct_hashtags.to_csv(self.my_path + "\\data\\" + "Processed\\distinct_hashtags.csv")
+            self.save_pre_processing()
+        if save_cache == True:
+            self.save_cache()
+
+    @profile_stage
+    def save_cache(self):
+        """
+        Method used to store the processed tweets and distinct hash tags in the processed tweet cache, with the fingerprint
+        of the current source files and pre-processing settings.
+        """
+        self.msg_handle("msg_cache_save")
+        fingerprint = self.get_cache_fingerprint()
+        
+        #Sentiment columns contain nested tuples and are stored as strings, as in the processed CSV file
+        TweetCache(self.my_path + "\\data\\" + "Processed\\", "processed_tweets").save(
+            self.troll_tweet_df, fingerprint, str_columns=['sentiment', 'sent_assessments'])
+        TweetCache(self.my_path + "\\data\\" + "Processed\\", "distinct_hashtags").save(
+            pd.DataFrame(self.distinct_hashtags), fingerprint)
+
+    @profile_stage
+    def tweet_pre_processing(self):
+        """
+        Method used for manipulating tweet content for NLP methods and text analytics.
+        Includes steps for:
+        1) Removing hyperlinks
+        2) Removing hash tags
+        3) Remove punctuation
+        5) Make all words lower case
+        6) Remove Stop-words
+        7) Lemmatization
+        8) Sentiment Analysis calculations
+        
+        If pre-processing is disabled, the processed data is read from the cache when it is up to date with the source files,
+        otherwise it is read from the processed CSV file location.
+        """
+        #Condition to check if pre-processing is enabled, if false method retrieves processed data from the cache or csv file location
+        if self.config["isPreProc"] == True:
+            self.run_pre_processing()
             
-            conditions = [
-                    (self.troll_tweet_df['sent_polarity'] == 0.00),
-                    (self.troll_tweet_df['sent_polarity'] > 0.00),
-                    (self.troll_tweet_df['sent_polarity'] < 0.00)
-                         ]
-            choices = ['neutral', 'positive', 'negative']
-            self.troll_tweet_df['class_sentiment'] = np.select(conditions, choices, default= None)
-            #Store processed tweets to CSV for later use
             if self.config["isSavePreproc"] == True:
-                self.msg_handle("msg_preproc_save")
-                self.troll_tweet_df.to_csv(self.my_path + "\\data\\" + "Processed\\processed_tweets.csv")
+                self.save_pre_processing()
+                
+                if self.config["isCache"] == True:
+                    self.save_cache()
+
+        elif self.config["isCache"] == True:
+            processed_cache = TweetCache(self.my_path + "\\data\\" + "Processed\\", "processed_tweets")
+            hashtag_cache = TweetCache(self.my_path + "\\data\\" + "Processed\\", "distinct_hashtags")
+            fingerprint = self.get_cache_fingerprint()
+            
+            #Rebuild the cache if the source files or pre-processing settings have changed since it was saved
+            if processed_cache.is_valid(fingerprint) and hashtag_cache.is_valid(fingerprint):
+                self.msg_handle("msg_cache_load")
+                with self.profiler.span("TweetDataHandler.load_cache") as span:
+                    self.troll_tweet_df = processed_cache.load(list_columns=['hash_tags'])
+                    self.distinct_hashtags = hashtag_cache.load()['distinct_hashtags']
+                    span.rows_out = len(self.troll_tweet_df)
+            else:
+                self.msg_handle("msg_cache_stale")
+                self.run_pre_processing()
+                self.save_cache()
+                
+                if self.config["isSavePreproc"] == True:
+                    self.save_pre_processing()
             
         else:
             self.msg_handle("msg_import_preproc")
             self.troll_tweet_df = pd.read_csv(self.my_path + "\\data\\" + "Processed\\processed_tweets.csv")
             
+            #Dates are written to the CSV file in ISO format
+            self.troll_tweet_df = parse_date_columns(self.troll_tweet_df, self.get_date_schema(self.troll_tweet_df.columns)[0], 'ISO8601')
+            
             #Literal evaluation of hashtag column for it is read as a string value instead of a list
             self.msg_handle("msg_import_preproc_convert")
+            get_tqdm()
             self.troll_tweet_df['hash_tags'] = self.troll_tweet_df['hash_tags'].progress_apply(lambda x: literal_eval(x))
             self.distinct_hashtags = pd.read_csv(self.my_path + "\\data\\" + "Processed\\distinct_hashtags.csv")
         
+        self.hashtag_index = self.get_hashtag_index()
         self.hashtag_set_list = self.get_cat_hash_tags()
         
+        #Compact layout, the hash tag lists are dropped as they are kept in the hash tag index
+        if self.config["isCompact"] == True:
+            self.troll_tweet_df = self.compact_frame(self.troll_tweet_df)
+        
+        self.get_dataset().set_frame(self.troll_tweet_df)
+        
         self.msg_handle("msg_preproc_complete")
         return (self.troll_tweet_df, self.distinct_hashtags, self.hashtag_set_list)
+
+    def get_dataset(self):
+        """
+        Function to return the lazy dataset of the processed troll tweets, see TweetDataset. Columns of the dataset are only read
+        or pre-processed when they are first requested.
+        """
+        if self.dataset is None:
+            self.dataset = TweetDataset(self)
+            
+        return self.dataset
+
+    def save_profile(self):
+        """
+        Method used to store the profiler spans as JSON and as a Chrome trace file in the processed data directory, if the
+        "isSaveProfile" configuration is set.
+        """
+        if self.config["isSaveProfile"] == True:
+            self.profiler.save_json(self.my_path + "\\data\\" + "Processed\\profile_spans.json")
+            self.profiler.save_chrome_trace(self.my_path + "\\data\\" + "Processed\\profile_trace.json")
+
+
+@lru_cache(maxsize=None)
+def get_stopwords():
+    """
+    Function to return the nltk english stopwords as a set, the stopwords corpus is read the first time.
+    """
+    from nltk.corpus import stopwords
     
+    return frozenset(stopwords.words('english'))
+
+
+def tokenize_tweets(processed_tweets, stop, lemmatize=False, progress=False):
+    """
+    Function to return a series of the list of words of each tweet after the text pre-processing steps, see tokenize_tweet.
+    Words are lemmatized if lemmatize is set. Tweets with no content are removed from the series. Defined at module level so
+    that it can be sent to process pool workers, progress bars are only shown if progress is set.
+    """
+    #Stopwords are checked for each word, a set makes each check a hash lookup
+    stop = frozenset(stop)
+    lemma = None
+    if lemmatize == True:
+        from textblob import Word
+        
+        #Each distinct word is lemmatized once
+        lemma = lru_cache(maxsize=None)(lambda word: Word(word).lemmatize())
+    
+    #Values that are not strings have no content, as the str accessor returns null for them
+    tweets = processed_tweets[np.array([isinstance(tweet, str) for tweet in processed_tweets], dtype=bool)]
+    index = tweets.index
+    if progress:
+        tweets = get_tqdm()(tweets, total=len(tweets), desc="Progress: ")
+    
+    return pd.Series([tokenize_tweet(tweet, stop, lemma) for tweet in tweets], index=index, name=processed_tweets.name, dtype=object)
+
+
+def tokenize_tweet(tweet, stop, lemma=None):
+    """
+    Function to return the list of words of a tweet after the text pre-processing steps, in a single pass over the words:
+    1) Removing hyperlinks
+    2) Removing hash tags
+    3) Removing stopwords, which are checked before the word is made lower case
+    4) Removing punctuation, words that are only punctuation are removed
+    5) Making words lower case
+    6) Lemmatization, if a lemma function is provided
+    The words are those of the previous steps, which each rebuilt the tweet string with str.replace or split and join.
+    """
+    #Hyperlinks are removed before hash tags, a hash tag is only removed if it is not part of a hyperlink
+    tweet = HASHTAG_PATTERN.sub('', LINK_PATTERN.sub('', tweet))
+    
+    words = []
+    for word in tweet.split():
+        if word in stop:
+            continue
+        
+        #Words containing only letters and digits have no punctuation to remove
+        if not word.isalnum():
+            word = PUNCTUATION_PATTERN.sub('', word)
+            if word == '':
+                continue
+        
+        word = word.lower()
+        words.append(word if lemma is None else lemma(word))
+    
+    return words
+
+
+def get_tqdm():
+    """
+    Function to return the tqdm progress bar, registering progress_apply with pandas. tqdm is imported when progress is first
+    displayed.
+    """
+    from tqdm import tqdm
+    
+    tqdm.pandas(desc="Progress: ")
+    
+    return tqdm
+
+
+def read_csv_file(file, columns, dtypes, date_columns=(), date_format=DATE_FORMAT):
+    """
+    Function to read a single CSV file with the data source schema, the date_columns are parsed to datetime64 with the
+    date_format. Defined at module level so that it can be sent to process pool workers.
+    """
+    return parse_date_columns(pd.read_csv(file, usecols=columns, dtype=dtypes), date_columns, date_format)
+
+
+def parse_date_columns(df, date_columns, date_format=DATE_FORMAT):
+    """
+    Function to parse the date_columns of a dataframe to datetime64 with the date_format, see TweetTimeIndex.parse_dates.
+    Dates that do not match the format become NaT.
+    """
+    for col in date_columns:
+        df[col] = parse_dates(df[col], date_format)
+    
+    return df
+
+
+def file_prefix_hash(file, size):
+    """
+    Function to compute the SHA-1 hash of the first size bytes of a file, used to check that previously processed content is unchanged.
+    """
+    sha1 = hashlib.sha1()
+    remaining = size
+    with open(file, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            sha1.update(block)
+            remaining -= len(block)
+            
+    return sha1.hexdigest()
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from TweetCache import TweetCache
+from TweetCooccurrence import TweetCooccurrence
+from TweetCube import CUBE_COLUMNS, TweetCube
+from TweetDuplicates import TweetDuplicates, get_campaigns
+from TweetFrequency import hashtag_frequencies, token_frequencies
+from TweetHashtagIndex import TweetHashtagIndex
+from TweetProfiler import profile_stage
+from TweetTextIndex import TweetTextIndex
+from TweetTimeIndex import TweetTimeIndex
+
+
+#Columns derived by the pre-processing steps, and the columns each is derived from
+DERIVED_COLUMNS = {
+    'hash_tags': ['content'],
+    'processed_content': ['content'],
+    'sentiment': ['processed_content'],
+    'sent_polarity': ['processed_content'],
+    'sent_subjectivity': ['processed_content'],
+    'sent_assessments': ['processed_content'],
+    'class_sentiment': ['sent_polarity']
+    }
+
+#Columns derived together from the processed content
+SENTIMENT_COLUMNS = ['sentiment', 'sent_polarity', 'sent_subjectivity', 'sent_assessments']
+
+
+class TweetDataset:
+    """
+    Class containing a lazy view of the processed troll tweets, shared by the visualizer and calculator through the
+    TweetDataHandler. Columns are only read or derived the first time they are requested, and are then kept, so a chart that
+    only needs one source column does not wait for the text pre-processing and sentiment analysis of every tweet.
+
+    Columns are taken from the first available of:
+    1) The processed dataframe, once tweet_pre_processing has run
+    2) The processed tweet cache, if "isPreProc" is not set and the cache is up to date
+    3) The processed CSV file, if "isPreProc" and "isCache" are not set
+    4) The source files, deriving hash_tags, processed_content and the sentiment columns with the pre-processing steps
+
+    The rows are the English tweets, as in the processed dataframe, and the index matches the processed dataframe.
+    """
+    def __init__(self, handler):
+        """
+        Initialize the dataset for a TweetDataHandler, no data is read until a column is requested.
+        """
+        self.handler = handler
+        self.profiler = handler.profiler
+        self.source = None
+        self.columns = {}
+        self.index = None
+        self.row_positions = None
+        self.frame = None
+        self.hashtag_index = None
+        self.category_bitsets = None
+        self.category_codes = None
+        self.hashtag_cooccurrence = None
+        self.frequency_tables = {}
+        self.cube = None
+        self.time_index = None
+        self.text_index = None
+        self.duplicate_clusters = None
+
+    def get_source(self):
+        """
+        Function to return where the columns of the dataset are taken from: 'frame', 'cache', 'csv' or 'source'.
+        """
+        if self.frame is not None:
+            return 'frame'
+
+        if self.source is None:
+            config = self.handler.config
+            if config["isPreProc"] == True:
+                self.source = 'source'
+            elif config["isCache"] == True:
+                fingerprint = self.handler.get_cache_fingerprint()
+                is_valid = all(TweetCache(self.get_cache_dir(), name).is_valid(fingerprint) for name in ["processed_tweets", "distinct_hashtags"])
+                self.source = 'cache' if is_valid else 'source'
+            else:
+                self.source = 'csv'
+
+        return self.source
+
+    def get_cache_dir(self):
+        """
+        Function to return the processed data directory of the data handler.
+        """
+        return self.handler.my_path + "\\data\\" + "Processed\\"
+
+    def get_columns(self, columns):
+        """
+        Function to return a dataframe of the requested columns, reading or deriving the columns that have not been requested
+        before.
+        """
+        missing = [col for col in columns if col not in self.columns]
+        if len(missing) > 0:
+            self.load_columns(missing)
+
+        return pd.DataFrame({col: self.columns[col] for col in columns}, index=self.index)
+
+    def get_column(self, column):
+        """
+        Function to return a single column of the dataset as a series.
+        """
+        return self.get_columns([column])[column]
+
+    @profile_stage
+    def load_columns(self, columns):
+        """
+        Method to read or derive columns from the source of the dataset.
+        """
+        source = self.get_source()
+
+        if source == 'frame':
+            self.set_columns(self.frame[[col for col in columns if col in self.frame.columns]])
+
+            #The compact layout drops the hash_tags column, the lists are rebuilt from the hash tag index
+            if 'hash_tags' in columns and 'hash_tags' not in self.frame.columns:
+                self.set_columns(pd.DataFrame(self.get_hashtag_index().to_lists()))
+        elif source == 'cache':
+            self.handler.msg_handle("msg_cache_load")
+            self.set_columns(TweetCache(self.get_cache_dir(), "processed_tweets").load(columns=columns, list_columns=['hash_tags']))
+        elif source == 'csv':
+            #The processed CSV file is read once, as tweet_pre_processing reads it
+            self.get_frame()
+            self.load_columns(columns)
+        else:
+            self.load_source_columns(columns)
+
+    def set_columns(self, df):
+        """
+        Method to keep the columns of a dataframe, the first dataframe sets the index of the dataset.
+        """
+        if self.index is None:
+            self.index = df.index
+
+        for col in df.columns:
+            self.columns[col] = df[col]
+
+    def load_source_columns(self, columns):
+        """
+        Method to read columns from the source files and derive the pre-processed columns. The columns each derived column
+        depends on are loaded first, only the English tweets are kept.
+        """
+        handler = self.handler
+
+        #Source columns are read together, the language column is only read to select the English tweets the first time
+        source_columns = [col for col in columns if col not in DERIVED_COLUMNS]
+        if len(source_columns) > 0:
+            if self.row_positions is None:
+                data = handler.get_csv_data('troll_tweets', source_columns + ['language'])
+                english = (data['language'] == 'English').to_numpy()
+                self.row_positions = english.nonzero()[0]
+                self.set_columns(data[english][source_columns])
+            else:
+                data = handler.get_csv_data('troll_tweets', source_columns)
+                self.set_columns(data.iloc[self.row_positions])
+
+        for col in [col for col in columns if col in DERIVED_COLUMNS]:
+            if col in self.columns:
+                continue
+
+            depends = self.get_columns(DERIVED_COLUMNS[col])
+            if col == 'hash_tags':
+                self.set_columns(pd.DataFrame(handler.get_hash_tags(depends, 'content')[0]))
+            elif col == 'processed_content':
+                processed_tweets = handler.clean_tweet_text(depends['content'].rename('processed_content'))
+                self.set_columns(pd.DataFrame(processed_tweets.reindex(self.index)))
+            elif col in SENTIMENT_COLUMNS:
+                sentiment = handler.get_sentiment_frame(depends['processed_content'].dropna())
+                self.set_columns(sentiment[SENTIMENT_COLUMNS].reindex(self.index))
+                handler.save_text_caches()
+            elif col == 'class_sentiment':
+                self.set_columns(pd.DataFrame({'class_sentiment': handler.classify_sentiment(depends['sent_polarity'])}, index=self.index))
+
+    def has_derived_columns(self):
+        """
+        Function to return whether every derived column has been read or derived.
+        """
+        return all(col in self.columns for col in DERIVED_COLUMNS)
+
+    def get_processed_frame(self):
+        """
+        Function to return the processed dataframe built from the columns of the dataset, with the columns of the dataframe
+        returned by tweet_pre_processing. Source columns that have not been requested are read, derived columns that have not
+        been requested are derived.
+        """
+        return self.get_columns(self.handler.data_sources['troll_tweets'][1] + list(DERIVED_COLUMNS))
+
+    def get_frame(self):
+        """
+        Function to return the full processed dataframe, running tweet_pre_processing the first time.
+        """
+        if self.frame is None:
+            self.handler.tweet_pre_processing()
+
+        return self.frame
+
+    def set_frame(self, df):
+        """
+        Method called by tweet_pre_processing with the processed dataframe, columns read before are then taken from the
+        processed dataframe, as are the hash tag index and bitsets of the data handler. Indexes and aggregates built from an
+        earlier frame are discarded, so they are built again from the new frame when first used.
+        """
+        self.frame = df
+        self.columns = {}
+        self.index = None
+        self.set_columns(df)
+        self.hashtag_index = self.handler.hashtag_index
+        self.category_bitsets = self.handler.category_bitsets
+        self.category_codes = None
+        self.hashtag_cooccurrence = None
+        self.frequency_tables = {}
+        self.cube = None
+        self.time_index = None
+        self.text_index = None
+        self.duplicate_clusters = None
+
+    def get_distinct_hashtags(self):
+        """
+        Function to return the distinct hash tags of the tweets in every language, as returned by tweet_pre_processing.
+        """
+        if self.get_source() == 'cache':
+            return TweetCache(self.get_cache_dir(), "distinct_hashtags").load()['distinct_hashtags']
+        if self.get_source() == 'source':
+            return self.handler.put_hash_tags(self.handler.get_csv_data('troll_tweets', ['content']), "content")[1]
+
+        self.get_frame()
+        return self.handler.distinct_hashtags
+
+    def get_hashtag_index(self):
+        """
+        Function to return the hash tag index of the dataset, which is built from the hash_tags column when first used.
+        """
+        if self.hashtag_index is None:
+            self.handler.msg_handle("msg_hashtag_index")
+            self.hashtag_index = TweetHashtagIndex(self.get_column('hash_tags'))
+
+        return self.hashtag_index
+
+    def get_category_bitsets(self):
+        """
+        Function to return the hash tag bitset of each category in the cat_list of the data handler, see TweetHashtagIndex.
+        """
+        if self.category_bitsets is None:
+            self.category_bitsets = self.get_hashtag_index().category_bitsets(self.get_column('account_category'), self.handler.cat_list)
+
+        return self.category_bitsets
+
+    @profile_stage
+    def get_hashtag_cooccurrence(self):
+        """
+        Function to return the hash tag co-occurrence matrix of the dataset, overall and by account category, which is built
+        from the hash tag index when first used, see TweetCooccurrence. Hash tags are counted in lower case.
+        """
+        if self.hashtag_cooccurrence is None:
+            self.handler.msg_handle("msg_hashtag_cooccurrence")
+            self.hashtag_cooccurrence = TweetCooccurrence.from_index(self.get_hashtag_index(), self.get_column('account_category'),
+                                                                     chunk_size=self.handler.config["cooccurrence_chunk_size"],
+                                                                     workers=self.handler.config["cooccurrence_workers"])
+
+        return self.hashtag_cooccurrence
+
+    def get_category_codes(self):
+        """
+        Function to return the account category of each row as an integer code, and the index of the account categories of the
+        codes. Rows without an account category have the code -1.
+        """
+        if self.category_codes is None:
+            codes, labels = pd.factorize(self.get_column('account_category'))
+            self.category_codes = (codes, pd.Index(labels))
+        
+        return self.category_codes
+
+    def get_time_index(self):
+        """
+        Function to return the time-partitioned index of the publish dates of the dataset, which is built when first used, see
+        TweetTimeIndex.
+        """
+        if self.time_index is None:
+            self.time_index = TweetTimeIndex(self.get_column('publish_date'))
+        
+        return self.time_index
+    
+    def get_time_counts(self, start=None, end=None, column='account_category'):
+        """
+        Function to return the number of tweets per day published from start (inclusive) to end (exclusive), with a column for
+        each value of the column, or a series of the total if column is None.
+        """
+        time_index = self.get_time_index()
+        
+        return time_index.counts(start, end, by=None if column is None else self.get_column(column))
+    
+    @profile_stage
+    def get_text_index(self):
+        """
+        Function to return the positional inverted index of the words of the processed content, see TweetTextIndex. If the
+        "isCache" configuration is set, the index is stored in the processed data directory with the fingerprint of the processed
+        tweets and is opened memory-mapped, it is only built again when the source files or pre-processing settings change.
+        """
+        if self.text_index is None:
+            use_cache = self.handler.config["isCache"] == True
+            fingerprint = self.handler.get_cache_fingerprint() if use_cache else None
+            text_index = TweetTextIndex.load(self.get_cache_dir(), "text_index", fingerprint) if use_cache else None
+            
+            #Row positions of the index must match the rows of the dataset
+            if text_index is None or (self.index is not None and len(text_index.index) != len(self.index)):
+                text_index = TweetTextIndex.from_series(self.get_column('processed_content'))
+                if use_cache:
+                    text_index.save(self.get_cache_dir(), "text_index", fingerprint)
+            
+            self.text_index = text_index
+        
+        return self.text_index
+    
+    def search_tweets(self, query, mode='and', account_category=None, start=None, end=None, columns=None):
+        """
+        Function to return the tweets containing all ('and') or any ('or') of the words of a query, or the words of the query as
+        a phrase ('phrase'). The query is pre-processed as the tweets are, and the tweets may be filtered by account category (a
+        value or list of values) and by publish date from start (inclusive) to end (exclusive). Returns a dataframe of the
+        columns of the matching tweets, by default the author, account category, publish date and processed content.
+        """
+        columns = columns or ['author', 'account_category', 'publish_date', 'processed_content']
+        rows = self.get_text_index().search(self.handler.get_query_words(query), mode)
+        
+        #Filters are applied to the matching rows only, reading the category code and date of each matching row
+        if account_category is not None:
+            categories = account_category if isinstance(account_category, (list, tuple, set)) else [account_category]
+            codes, labels = self.get_category_codes()
+            wanted = labels.get_indexer(list(categories))
+            rows = rows[np.isin(codes[rows], wanted[wanted >= 0])]
+        if start is not None or end is not None:
+            rows = self.get_time_index().filter_rows(rows, start, end)
+        
+        return self.get_rows(rows, columns)
+    
+    def get_rows(self, rows, columns):
+        """
+        Function to return a dataframe of the columns for a list of row positions, only the listed rows of each column are
+        copied.
+        """
+        missing = [col for col in columns if col not in self.columns]
+        if len(missing) > 0:
+            self.load_columns(missing)
+        
+        return pd.DataFrame({col: self.columns[col].iloc[rows] for col in columns}, index=self.index[rows])
+    
+    @profile_stage
+    def get_duplicate_clusters(self):
+        """
+        Function to return the near-duplicate cluster id of each tweet of the dataset, see TweetDuplicates. The clusters are
+        stored with the processed data if the "isCache" configuration is set, see load_aggregate.
+        """
+        if self.duplicate_clusters is None:
+            build = lambda: pd.DataFrame(TweetDuplicates().fit(self.get_column('processed_content')))
+            self.duplicate_clusters = self.load_aggregate("duplicate_clusters", build)['cluster']
+        
+        return self.duplicate_clusters
+    
+    def get_campaigns(self, min_tweets=5, min_authors=2):
+        """
+        Function to return the clusters of near-duplicate tweets posted by at least min_authors authors, with at least
+        min_tweets tweets, with the number of tweets, authors and account categories of each cluster, see get_campaigns.
+        """
+        tweets = self.get_columns(['author', 'account_category', 'processed_content'])
+        
+        return get_campaigns(self.get_duplicate_clusters(), tweets, min_tweets, min_authors)
+    
+    def get_cat_hash_tags(self):
+        """
+        Function to return a list containing the set of hash tags of each category in the cat_list of the data handler.
+        """
+        return [self.get_hashtag_index().bitset_tags(bitset) for bitset in self.get_category_bitsets()]
+
+    @profile_stage
+    def get_frequency_table(self, kind):
+        """
+        Function to return the 'tokens' or 'hashtags' frequency table of the processed tweets, indexed by token with a column of
+        counts for each account category, see TweetFrequency. Hash tags are counted in lower case. The table is stored with the
+        processed data if the "isCache" configuration is set, see load_aggregate.
+        """
+        if kind not in self.frequency_tables:
+            if kind == 'tokens':
+                def build():
+                    df = self.get_columns(['processed_content', 'account_category'])
+                    return token_frequencies(df['processed_content'], df['account_category'])
+            elif kind == 'hashtags':
+                build = lambda: hashtag_frequencies(self.get_hashtag_index(), self.get_column('account_category'))
+            else:
+                raise ValueError("Frequency table must be 'tokens' or 'hashtags'.")
+            
+            self.frequency_tables[kind] = self.load_aggregate(kind + "_frequencies", build)
+            
+        return self.frequency_tables[kind]
+    
+    @profile_stage
+    def get_cube(self):
+        """
+        Function to return the aggregate cube of the processed tweets, the number of tweets by account category, sentiment class,
+        post type, region and publish month, see TweetCube. The cube is stored with the processed data if the "isCache"
+        configuration is set, see load_aggregate.
+        """
+        if self.cube is None:
+            self.cube = TweetCube(self.load_aggregate("aggregate_cube", lambda: TweetCube.from_frame(self.get_columns(CUBE_COLUMNS)).cells))
+        
+        return self.cube
+    
+    def load_aggregate(self, name, build):
+        """
+        Function to return an aggregate of the processed tweets, calling build to create it. If the "isCache" configuration is
+        set, the aggregate is stored in the processed data directory with the fingerprint of the processed tweets, and is only
+        built again when the source files or pre-processing settings change.
+        """
+        use_cache = self.handler.config["isCache"] == True
+        cache = TweetCache(self.get_cache_dir(), name)
+        fingerprint = self.handler.get_cache_fingerprint() if use_cache else None
+        
+        if use_cache and cache.is_valid(fingerprint):
+            return cache.load()
+        
+        table = build()
+        if use_cache:
+            cache.save(table, fingerprint)
+            
+        return table
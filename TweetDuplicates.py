@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from itertools import chain
+
+
+#Mersenne prime of the MinHash hash functions, and the mask keeping the lower 32 bits of each hash
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class TweetDuplicates:
+    """
+    Class used to cluster near-duplicate tweets, such as retweets and lightly edited copies of the same text, with MinHash
+    signatures and locality sensitive hashing (LSH):
+    1) Each tweet is reduced to the set of its word shingles (sequences of shingle_size words)
+    2) A MinHash signature of num_perm values is computed for each tweet, the share of equal values of two signatures
+       estimates the Jaccard similarity of their shingle sets
+    3) Signatures are split into bands, tweets with an equal band are candidate duplicates, candidates are compared to the
+       first tweet of their band bucket and joined if their estimated similarity is at least threshold
+    4) Joined tweets are merged into clusters with a union-find over the row positions
+
+    Each step is a vectorized pass over the tweets or their shingles, so clustering is near-linear in the number of tweets.
+    Tweets without words are not clustered with other tweets.
+    """
+    def __init__(self, num_perm=64, bands=16, shingle_size=1, threshold=0.7, seed=1):
+        """
+        Initialize the clustering parameters, num_perm must be a multiple of bands. More bands of fewer rows find candidates
+        with a lower similarity.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("The number of permutations must be a multiple of the number of bands.")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.hash_a = rng.integers(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.hash_b = rng.integers(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        self.index = None
+        self.signatures = None
+        self.clusters = None
+        self.roots = None
+
+    def get_shingles(self, processed_content):
+        """
+        Function to return the shingle ids of each tweet in CSR layout, as the shingle ids and the offsets of the shingles of
+        each row. Tweets with fewer words than shingle_size have their words as a single shingle.
+        """
+        words = processed_content.str.split()
+        words = words.where(words.notna(), pd.Series([[]] * len(words), index=words.index, dtype=object))
+        lengths = words.str.len().to_numpy(dtype=np.int64)
+        codes = pd.factorize(pd.Series(list(chain.from_iterable(words)), dtype=object))[0].astype(np.int64)
+
+        #Shingles of row i are shingle_ids[shingle_offsets[i]:shingle_offsets[i + 1]], each starts at a word of the row
+        word_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=word_offsets[1:])
+        shingle_lengths = np.where(lengths > 0, np.maximum(lengths - self.shingle_size + 1, 1), 0)
+        shingle_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(shingle_lengths, out=shingle_offsets[1:])
+        
+        shingle_word = np.arange(shingle_offsets[-1], dtype=np.int64) - np.repeat(shingle_offsets[:-1], shingle_lengths)
+        starts = np.repeat(word_offsets[:-1], shingle_lengths) + shingle_word
+        ends = np.minimum(starts + self.shingle_size, np.repeat(word_offsets[1:], shingle_lengths))
+
+        #Each shingle is interned by its word ids, words missing from a short tweet are -1
+        shingle_words = np.full((len(starts), self.shingle_size), -1, dtype=np.int64)
+        for i in range(self.shingle_size):
+            present = starts + i < ends
+            shingle_words[present, i] = codes[starts[present] + i]
+        shingle_ids = pd.factorize(pd.MultiIndex.from_arrays(shingle_words.T))[0] if self.shingle_size > 1 else shingle_words[:, 0]
+
+        return (shingle_ids.astype(np.uint64), shingle_offsets)
+
+    def get_signatures(self, shingle_ids, shingle_offsets):
+        """
+        Function to return the MinHash signature of each row, an array with a row of num_perm values for each tweet. Rows
+        without shingles have the maximum value in every position.
+        """
+        num_rows = len(shingle_offsets) - 1
+        signatures = np.full((num_rows, self.num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+        has_shingles = np.diff(shingle_offsets) > 0
+        if len(shingle_ids) == 0:
+            return signatures
+
+        #Shingle ids are consecutive, each id is mapped to a random 32-bit value before it is hashed
+        rng = np.random.default_rng([self.seed, 1])
+        shingle_values = rng.integers(0, 1 << 32, size=int(shingle_ids.max()) + 1, dtype=np.uint64)[shingle_ids]
+
+        #Minimum of each hash function over the shingles of each row, reduceat starts at the first shingle of each row. The
+        #multiplication wraps around at 64 bits, as in common MinHash implementations.
+        for i in range(self.num_perm):
+            hashes = ((self.hash_a[i] * shingle_values + self.hash_b[i]) % MERSENNE_PRIME) & MAX_HASH
+            signatures[has_shingles, i] = np.minimum.reduceat(hashes, shingle_offsets[:-1][has_shingles])
+
+        return signatures
+
+    def fit(self, processed_content):
+        """
+        Function to cluster a series of processed tweets, returns a series of the cluster id of each tweet. Cluster ids are
+        numbered in order of the first tweet of each cluster.
+        """
+        self.index = processed_content.index
+        self.signatures = self.get_signatures(*self.get_shingles(processed_content))
+        num_rows = len(self.signatures)
+        has_words = self.signatures[:, 0] != np.iinfo(np.uint64).max
+
+        #Candidate pairs join each row to the first row of its bucket in each band, encoded as leader * num_rows + member
+        rows = np.flatnonzero(has_words)
+        band_size = self.num_perm // self.bands
+        pairs = []
+        for band in range(self.bands):
+            band_keys = band_hash(self.signatures[rows, band * band_size:(band + 1) * band_size])
+            order = np.argsort(band_keys, kind='stable')
+            sorted_keys = band_keys[order]
+            bucket_starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]] if len(rows) > 0 else np.empty(0, dtype=bool)
+            leaders = order[np.flatnonzero(bucket_starts)[np.cumsum(bucket_starts) - 1]]
+            members = ~bucket_starts
+            pairs.append(rows[leaders[members]] * num_rows + rows[order[members]])
+
+        pairs = np.unique(np.concatenate(pairs)) if len(pairs) > 0 else np.empty(0, dtype=np.int64)
+        left, right = pairs // max(num_rows, 1), pairs % max(num_rows, 1)
+
+        #Candidates are joined if the share of equal signature values reaches the threshold, compared in chunks of pairs
+        joined = np.zeros(len(pairs), dtype=bool)
+        for start in range(0, len(pairs), 1 << 18):
+            end = start + (1 << 18)
+            similarity = (self.signatures[left[start:end]] == self.signatures[right[start:end]]).mean(axis=1)
+            joined[start:end] = similarity >= self.threshold
+
+        #The root of each cluster is its first row, so cluster ids numbered by root follow the order of the first tweets
+        self.roots = union_find(num_rows, left[joined], right[joined])
+        self.clusters = pd.Series(np.unique(self.roots, return_inverse=True)[1], index=self.index, name='cluster')
+
+        return self.clusters
+
+    def get_representatives(self):
+        """
+        Function to return the row position of the first tweet of the cluster of each tweet, so that work on the text of a
+        tweet can be done once per cluster and broadcast to the other tweets of the cluster.
+        """
+        return self.roots
+
+
+def band_hash(band_signatures):
+    """
+    Function to combine the signature values of each row of a band into a single 64-bit key, with FNV-style multiply and
+    xor steps that wrap around. Rows with equal bands have equal keys, unequal bands with the same key are rare and are
+    removed by the similarity threshold.
+    """
+    keys = band_signatures[:, 0].copy()
+    for i in range(1, band_signatures.shape[1]):
+        keys = (keys * np.uint64(0x100000001B3)) ^ band_signatures[:, i]
+
+    return keys
+
+
+def union_find(num_rows, left, right):
+    """
+    Function to return the root of the component of each row for a list of edges between rows, the root of a component is its
+    smallest row. Roots are hooked to the smaller root of each edge and the parent pointers are compressed until every edge
+    joins rows with the same root, each round is a vectorized pass over the edges.
+    """
+    parent = np.arange(num_rows, dtype=np.int64)
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+
+    while True:
+        left_roots, right_roots = parent[left], parent[right]
+        joined = left_roots != right_roots
+        if not joined.any():
+            return parent
+
+        #Hook the larger root of each edge to the smaller root
+        np.minimum.at(parent, np.maximum(left_roots[joined], right_roots[joined]), np.minimum(left_roots[joined], right_roots[joined]))
+
+        #Compress the parent pointers so that each row points to its root
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def get_campaigns(clusters, df, min_tweets=5, min_authors=2):
+    """
+    Function to return the clusters of near-duplicate tweets posted by at least min_authors authors, with at least min_tweets
+    tweets, as a dataframe sorted by the number of tweets. The dataframe df contains the author, account_category and
+    processed_content of the clustered tweets, clusters is the cluster id of each tweet.
+    """
+    tweets = df.assign(cluster=clusters.to_numpy())
+    campaigns = tweets.groupby('cluster').agg(
+        tweets=('author', 'size'),
+        authors=('author', 'nunique'),
+        account_categories=('account_category', 'nunique'),
+        categories=('account_category', lambda x: sorted(x.dropna().unique())),
+        content=('processed_content', 'first')
+        )
+    campaigns = campaigns[(campaigns['tweets'] >= min_tweets) & (campaigns['authors'] >= min_authors)]
+
+    return campaigns.sort_values(by=['tweets', 'authors'], ascending=False, kind='stable')
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from itertools import chain
+
+
+def frequency_table(codes, vocabulary, row_lengths, categories):
+    """
+    Function to count each vocabulary id by category in a single pass. The codes are the vocabulary ids of every occurrence in
+    row order, row_lengths the number of occurrences of each row and categories the category of each row. Returns a dataframe
+    indexed by the vocabulary with a column of counts for each category.
+    """
+    cat_codes, cat_labels = pd.factorize(pd.Series(np.asarray(categories), dtype=object), sort=True)
+
+    #Rows without a category are counted in a separate column, so that the counts of every row are kept
+    if (cat_codes < 0).any():
+        cat_labels = list(cat_labels) + ['None']
+        cat_codes = np.where(cat_codes < 0, len(cat_labels) - 1, cat_codes)
+
+    #Category and vocabulary id of each occurrence are combined into one id, counted with a single bincount
+    occurrence_cats = np.repeat(cat_codes.astype(np.int64), row_lengths)
+    counts = np.bincount(occurrence_cats * len(vocabulary) + codes, minlength=len(cat_labels) * len(vocabulary))
+
+    table = pd.DataFrame(counts.reshape(len(cat_labels), len(vocabulary)).T, index=pd.Index(vocabulary, name='token'),
+                         columns=[str(label) for label in cat_labels])
+
+    return table[table.sum(axis=1) > 0]
+
+
+def token_frequencies(texts, categories):
+    """
+    Function to return the token frequency table of a series of processed tweets, with a column of counts for each category.
+    The categories series contains the category of each tweet, tweets without content are ignored.
+    """
+    has_text = texts.notna().to_numpy()
+    tokens = texts[has_text].str.split()
+    lengths = tokens.str.len().to_numpy(dtype=np.int64)
+
+    #Intern the tokens, each token is then counted by its integer id
+    codes, vocabulary = pd.factorize(pd.Series(list(chain.from_iterable(tokens)), dtype=object))
+
+    return frequency_table(codes, vocabulary, lengths, np.asarray(categories)[has_text])
+
+
+def hashtag_frequencies(hashtag_index, categories, lowercase=True):
+    """
+    Function to return the hash tag frequency table of a hash tag index, with a column of counts for each category. Hash tags
+    differing only in case are counted together if lowercase is set.
+    """
+    codes = hashtag_index.tag_ids
+    vocabulary = hashtag_index.vocabulary
+
+    #Map each hash tag id to the id of its lower case hash tag
+    if lowercase == True:
+        lower_ids, vocabulary = pd.factorize(pd.Series(vocabulary, dtype=object).str.lower())
+        codes = lower_ids[codes]
+
+    return frequency_table(codes.astype(np.int64), vocabulary, np.diff(hashtag_index.row_offsets), categories)
+
+
+def get_frequencies(table, category=None):
+    """
+    Function to return the counts of a frequency table for a category, or for every category, as a series of the tokens
+    with a count above zero.
+    """
+    if category is None:
+        counts = table.sum(axis=1)
+    elif category in table.columns:
+        counts = table[category]
+    else:
+        counts = pd.Series(dtype=np.int64)
+
+    return counts[counts > 0]
+
+
+def wordcloud_frequencies(table, category=None, stopwords=(), normalize_plurals=True):
+    """
+    Function to return a dictionary of token counts for a category that can be passed to WordCloud.generate_from_frequencies.
+    Tokens are filtered as WordCloud.generate filters words: numbers and stopwords are removed, and if normalize_plurals is
+    set, a token ending in 's' is counted with the token without the 's' when both are present. Bigram collocations are not
+    calculated.
+    """
+    counts = get_frequencies(table, category)
+    tokens = counts.index.to_series().astype(str)
+
+    stopwords = set(word.lower() for word in stopwords)
+    keep = ~(tokens.str.isdigit() | tokens.str.lower().isin(stopwords))
+    counts = counts[keep.to_numpy()]
+    tokens = tokens[keep]
+
+    if normalize_plurals == True:
+        singular = tokens.str[:-1]
+        is_plural = tokens.str.endswith('s') & ~tokens.str.endswith('ss') & singular.isin(set(tokens))
+        counts = counts.groupby(np.where(is_plural, singular, tokens)).sum()
+
+    return counts.to_dict()
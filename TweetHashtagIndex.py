@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from itertools import chain
+
+
+#Number of set bits in each byte value, used to count the members of a bitset
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+
+class TweetHashtagIndex:
+    """
+    Class containing an inverted index of the hash tags contained within the tweets. Each distinct hash tag is interned to an
+    integer id, and the rows of the tweets containing each hash tag are stored in compact arrays (CSR layout), so finding the
+    tweets, authors or categories that used a hash tag only reads the rows for that hash tag.
+    """
+    def __init__(self, hash_tags):
+        """
+        Initialize the index from a series containing a list of hash tags for each tweet. Row ids are positions in the series,
+        the index of the series is kept to translate row ids back to dataframe index values.
+        """
+        self.index = hash_tags.index
+        lengths = np.fromiter((len(tags) for tags in hash_tags), dtype=np.int64, count=len(hash_tags))
+
+        #Forward index, the hash tag ids of row i are tag_ids[row_offsets[i]:row_offsets[i + 1]]
+        self.row_offsets = np.zeros(len(hash_tags) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.row_offsets[1:])
+
+        #Intern each hash tag to an integer id
+        codes, self.vocabulary = pd.factorize(pd.Series(list(chain.from_iterable(hash_tags)), dtype=object))
+        self.tag_ids = codes.astype(np.int32)
+        self.tag_lookup = {tag: tag_id for tag_id, tag in enumerate(self.vocabulary)}
+
+        #Inverted index, a stable sort by hash tag id keeps the rows of each hash tag in ascending order
+        rows = np.repeat(np.arange(len(hash_tags), dtype=np.int32), lengths)
+        order = np.argsort(self.tag_ids, kind='stable')
+        sorted_tags = self.tag_ids[order]
+        sorted_rows = rows[order]
+
+        #Tweets using a hash tag more than once are only listed once
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (sorted_tags[1:] != sorted_tags[:-1]) | (sorted_rows[1:] != sorted_rows[:-1])
+
+        #Postings of hash tag id t are postings[postings_offsets[t]:postings_offsets[t + 1]]
+        self.postings = sorted_rows[keep]
+        self.postings_offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sorted_tags[keep], minlength=len(self.vocabulary)), out=self.postings_offsets[1:])
+
+    def get_tag_id(self, tag):
+        """
+        Function to return the id of a hash tag, with or without the leading '#'. Returns None if the hash tag is not indexed.
+        """
+        return self.tag_lookup.get(tag[1:] if tag.startswith('#') else tag)
+
+    def tweet_rows(self, tag):
+        """
+        Function to return the row positions of the tweets containing a hash tag.
+        """
+        tag_id = self.get_tag_id(tag)
+        if tag_id is None:
+            return np.empty(0, dtype=np.int32)
+
+        return self.postings[self.postings_offsets[tag_id]:self.postings_offsets[tag_id + 1]]
+
+    def tweet_index(self, tag):
+        """
+        Function to return the dataframe index values of the tweets containing a hash tag.
+        """
+        return self.index[self.tweet_rows(tag)]
+
+    def tweets(self, df, tag, columns=None):
+        """
+        Function to return the rows of the indexed dataframe containing a hash tag, optionally limited to the specified columns.
+        """
+        rows = df.iloc[self.tweet_rows(tag)]
+
+        return rows if columns is None else rows[columns]
+
+    def tweet_counts(self, df, tag, column):
+        """
+        Function to return the number of tweets containing a hash tag for each value of a column of the indexed dataframe, such
+        as author or account_category.
+        """
+        values = df[column].to_numpy()[self.tweet_rows(tag)]
+
+        return pd.Series(values, name=column).value_counts()
+
+    def row_tags(self, row):
+        """
+        Function to return the list of hash tags of the tweet at a row position.
+        """
+        return list(self.vocabulary[self.tag_ids[self.row_offsets[row]:self.row_offsets[row + 1]]])
+
+    def distinct_tags(self, mask=None):
+        """
+        Function to return the set of distinct hash tags of the rows selected by a boolean mask, or of all rows.
+        """
+        if mask is None:
+            return set(self.vocabulary)
+        
+        #Repeat the row mask for each hash tag of the row to select from the flat array of hash tag ids
+        tag_mask = np.repeat(np.asarray(mask, dtype=bool), np.diff(self.row_offsets))
+        
+        return set(self.vocabulary[np.unique(self.tag_ids[tag_mask])])
+
+    def tag_frequencies(self, mask=None, lowercase=False):
+        """
+        Function to return the number of occurrences of each hash tag in the rows selected by a boolean mask, or in all rows.
+        Hash tags differing only in case are counted together if lowercase is set.
+        """
+        tag_ids = self.tag_ids
+        if mask is not None:
+            tag_ids = tag_ids[np.repeat(np.asarray(mask, dtype=bool), np.diff(self.row_offsets))]
+        
+        counts = pd.Series(np.bincount(tag_ids, minlength=len(self.vocabulary)), index=self.vocabulary)
+        if lowercase == True:
+            counts = counts.groupby(counts.index.str.lower()).sum()
+            
+        return counts[counts > 0]
+
+    def category_bitsets(self, categories, cat_list):
+        """
+        Function to return the hash tags of each category as a bitset over hash tag ids, computed in a single pass over the
+        hash tags. The categories parameter contains the category of each row, the bitsets are returned in the order of
+        cat_list as an array with a row of packed bits for each category. Rows with a category not in cat_list are ignored.
+        """
+        cat_codes = pd.Index(cat_list).get_indexer(np.asarray(categories, dtype=object))
+        
+        #Category code of each hash tag occurrence
+        tag_cats = np.repeat(cat_codes, np.diff(self.row_offsets))
+        valid = tag_cats >= 0
+        
+        members = np.zeros((len(cat_list), len(self.vocabulary)), dtype=bool)
+        members[tag_cats[valid], self.tag_ids[valid]] = True
+        
+        return np.packbits(members, axis=1)
+
+    def bitset_tags(self, bitset):
+        """
+        Function to return the set of hash tags in a bitset returned by category_bitsets.
+        """
+        tag_ids = np.flatnonzero(np.unpackbits(bitset)[:len(self.vocabulary)])
+        
+        return set(self.vocabulary[tag_ids])
+
+    @staticmethod
+    def bitset_overlap(bitsets, labels, metric='intersection'):
+        """
+        Function to return a matrix comparing every pair of bitsets, with the labels as rows and columns. The metric is either
+        'intersection', the number of shared hash tags, or 'jaccard', the number of shared hash tags divided by the number of
+        hash tags in either bitset. The diagonal of the intersection matrix contains the size of each bitset.
+        """
+        #Bitwise AND of every pair of bitsets, the set bits are then counted with a lookup table
+        intersection = POPCOUNT[np.bitwise_and(bitsets[:, None, :], bitsets[None, :, :])].sum(axis=2)
+        
+        if metric == 'jaccard':
+            sizes = np.diag(intersection)
+            union = sizes[:, None] + sizes[None, :] - intersection
+            matrix = np.divide(intersection, union, out=np.zeros(intersection.shape), where=union > 0)
+        elif metric == 'intersection':
+            matrix = intersection
+        else:
+            raise ValueError("Metric must be 'intersection' or 'jaccard'.")
+            
+        return pd.DataFrame(matrix, index=labels, columns=labels)
+
+    def to_lists(self):
+        """
+        Function to return a series containing the list of hash tags of each row, as in the hash_tags column.
+        """
+        tags = np.split(np.asarray(self.vocabulary, dtype=object)[self.tag_ids], self.row_offsets[1:-1])
+        
+        return pd.Series([list(row) for row in tags], index=self.index, name='hash_tags', dtype=object)
+
+    def memory_usage(self):
+        """
+        Function to return the number of bytes used by each array of the index.
+        """
+        return {
+            'vocabulary': int(pd.Series(self.vocabulary).memory_usage(deep=True)),
+            'row_offsets': self.row_offsets.nbytes,
+            'tag_ids': self.tag_ids.nbytes,
+            'postings_offsets': self.postings_offsets.nbytes,
+            'postings': self.postings.nbytes
+            }
+
+    def tag_counts(self):
+        """
+        Function to return the number of tweets containing each hash tag, sorted in descending order.
+        """
+        counts = pd.Series(np.diff(self.postings_offsets), index=self.vocabulary, name='tweets')
+
+        return counts.sort_values(ascending=False)
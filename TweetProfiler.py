@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import functools
+import json
+import subprocess
+import sys
+import threading
+import time
+import pandas as pd
+
+from contextlib import contextmanager
+from os import getpid, path
+
+#Peak resident memory is only available on Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class TweetSpan:
+    """
+    Class containing the measurements of one stage of a run: the wall time, CPU time, rows in and out and peak resident memory
+    of the stage, and the stage it was called from.
+    """
+    def __init__(self, name, parent, start, rows_in=None, attributes=None):
+        """
+        Initialize a span that started at start seconds after the profiler was created.
+        """
+        self.name = name
+        self.parent = parent
+        self.start = start
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.attributes = attributes or {}
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.max_rss_mb = None
+        self.rss_growth_mb = None
+        self.thread = threading.get_ident()
+
+    def to_dict(self):
+        """
+        Function to return the span as a dictionary.
+        """
+        return {
+            'name': self.name,
+            'parent': self.parent,
+            'start': round(self.start, 6),
+            'wall_seconds': self.wall_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'max_rss_mb': self.max_rss_mb,
+            'rss_growth_mb': self.rss_growth_mb,
+            'thread': self.thread,
+            'attributes': self.attributes
+            }
+
+
+class TweetProfiler:
+    """
+    Class used to record the stages of a run as spans, and status messages as events. Spans are nested, a span started while
+    another span is open on the same thread records it as its parent. The spans can be exported as JSON, or as a Chrome trace
+    file that can be opened in chrome://tracing or Perfetto.
+    """
+    def __init__(self, enabled=True):
+        """
+        Initialize an empty profiler, if enabled is not set spans and events are not recorded.
+        """
+        self.enabled = enabled
+        self.spans = []
+        self.events = []
+        self.origin = time.perf_counter()
+        self.local = threading.local()
+
+    @contextmanager
+    def span(self, name, rows_in=None, **attributes):
+        """
+        Context manager recording a span for the code it contains. The span is returned so that rows_out and attributes may be
+        set before it closes.
+        """
+        stack = self.local.__dict__.setdefault('stack', [])
+        span = TweetSpan(name, stack[-1].name if stack else None, time.perf_counter() - self.origin, rows_in, attributes)
+        if self.enabled == False:
+            yield span
+            return
+
+        stack.append(span)
+        rss_start = get_max_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield span
+        finally:
+            span.wall_seconds = round(time.perf_counter() - wall_start, 6)
+            span.cpu_seconds = round(time.process_time() - cpu_start, 6)
+            span.max_rss_mb = get_max_rss_mb()
+            span.rss_growth_mb = round(span.max_rss_mb - rss_start, 2) if rss_start is not None else None
+            stack.pop()
+            self.spans.append(span)
+
+    def event(self, name, **attributes):
+        """
+        Method to record an instant event, such as a status message.
+        """
+        if self.enabled == True:
+            stack = self.local.__dict__.setdefault('stack', [])
+            self.events.append({
+                'name': name,
+                'parent': stack[-1].name if stack else None,
+                'time': round(time.perf_counter() - self.origin, 6),
+                'thread': threading.get_ident(),
+                'attributes': attributes
+                })
+
+    def reset(self):
+        """
+        Method to remove the recorded spans and events.
+        """
+        self.spans = []
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def get_report(self):
+        """
+        Function to return a dataframe of the recorded spans in the order they started.
+        """
+        columns = ['name', 'parent', 'start', 'wall_seconds', 'cpu_seconds', 'rows_in', 'rows_out', 'max_rss_mb', 'rss_growth_mb']
+        report = pd.DataFrame([span.to_dict() for span in self.spans], columns=columns + ['thread', 'attributes'])
+
+        return report[columns].sort_values(by='start', kind='stable').reset_index(drop=True)
+
+    def get_summary(self):
+        """
+        Function to return the number of calls and total wall and CPU time of each stage, sorted by total wall time.
+        """
+        return self.get_report().groupby('name').agg(
+            calls=('wall_seconds', 'size'),
+            wall_seconds=('wall_seconds', 'sum'),
+            cpu_seconds=('cpu_seconds', 'sum'),
+            rows_in=('rows_in', 'sum'),
+            max_rss_mb=('max_rss_mb', 'max')
+            ).sort_values(by='wall_seconds', ascending=False)
+
+    def to_chrome_trace(self):
+        """
+        Function to return the spans and events in the Chrome trace event format, times are in microseconds.
+        """
+        pid = getpid()
+        trace_events = []
+        for span in self.spans:
+            args = {key: value for key, value in span.to_dict().items() if key not in ('name', 'start', 'wall_seconds', 'thread', 'attributes')}
+            args.update(span.attributes)
+            trace_events.append({
+                'name': span.name,
+                'cat': span.name.split('.')[0],
+                'ph': 'X',
+                'ts': round(span.start * 1e6, 3),
+                'dur': round(span.wall_seconds * 1e6, 3),
+                'pid': pid,
+                'tid': span.thread,
+                'args': args
+                })
+        for event in self.events:
+            trace_events.append({
+                'name': event['name'],
+                'ph': 'i',
+                's': 't',
+                'ts': round(event['time'] * 1e6, 3),
+                'pid': pid,
+                'tid': event['thread'],
+                'args': event['attributes']
+                })
+
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def save_json(self, output_file):
+        """
+        Method to write the spans and events to a JSON file.
+        """
+        with open(output_file, 'w') as f:
+            json.dump({'spans': [span.to_dict() for span in self.spans], 'events': self.events}, f, indent=2, default=str)
+
+    def save_chrome_trace(self, output_file):
+        """
+        Method to write the spans and events to a Chrome trace file.
+        """
+        with open(output_file, 'w') as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+
+def profile_stage(func):
+    """
+    Decorator recording a span for each call of a method, named after the class and method. The span is recorded by the profiler
+    attribute of the object, the rows in are the rows of the first dataframe or series argument and the rows out are the rows of
+    the dataframe or series returned, or of the first item returned.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = getattr(self, 'profiler', None)
+        if profiler is None:
+            return func(self, *args, **kwargs)
+
+        with profiler.span(type(self).__name__ + '.' + func.__name__, rows_in=count_rows(args)) as span:
+            result = func(self, *args, **kwargs)
+            span.rows_out = count_rows([result[0] if isinstance(result, tuple) and len(result) > 0 else result])
+
+        return result
+
+    return wrapper
+
+
+def count_rows(values):
+    """
+    Function to return the number of rows of the first dataframe or series in values, None if there is none.
+    """
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+
+    return None
+
+
+def get_max_rss_mb():
+    """
+    Function to return the peak resident memory of the process in megabytes, None if it is not available on the platform.
+    """
+    if resource is None:
+        return None
+
+    #Linux reports kilobytes, macOS reports bytes
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return round(max_rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 2)
+
+
+def get_import_times(modules, top=3):
+    """
+    Function to return the time taken to import each module in a new interpreter, measured with python -X importtime, so that
+    modules imported earlier do not affect the time. The slowest top modules imported directly by each module are also listed.
+    """
+    rows = []
+    for module in modules:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], capture_output=True, text=True,
+                                cwd=path.dirname(path.abspath(__file__)))
+        
+        #Each line contains the self and cumulative time in microseconds and the module name, indented by import depth
+        imports = []
+        for line in result.stderr.splitlines():
+            fields = line[len('import time:'):].split('|') if line.startswith('import time:') else []
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                name = fields[2].rstrip()
+                imports.append((name.strip(), (len(name) - len(name.lstrip()) - 1) // 2, int(fields[1]) / 1e6))
+        
+        seconds = next((seconds for name, depth, seconds in reversed(imports) if name == module and depth == 0), None)
+        direct_imports = sorted(((name, seconds) for name, depth, seconds in imports if depth == 1), key=lambda x: -x[1])
+        rows.append({
+            'module': module,
+            'seconds': seconds,
+            'slowest_imports': ", ".join(f"{name} {seconds:.2f}s" for name, seconds in direct_imports[:top]),
+            'error': result.stderr.strip().splitlines()[-1] if result.returncode != 0 else None
+            })
+    
+    return pd.DataFrame(rows).set_index('module')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import json
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from os import getpid, makedirs, path
+from TweetVisualizer import RENDERERS
+
+
+#Venn diagrams comparing Left Trolls and Right Trolls to other categories, as drawn by main.py
+VENN_CATEGORY_LISTS = [['LeftTroll', 'RightTroll'], ['LeftTroll', 'Fearmonger'], ['LeftTroll', 'Commercial'],
+                       ['LeftTroll', 'HashtagGamer'], ['LeftTroll', 'NewsFeed'], ['RightTroll', 'Fearmonger'],
+                       ['RightTroll', 'Commercial'], ['RightTroll', 'HashtagGamer'], ['RightTroll', 'NewsFeed']]
+
+
+class TweetReport:
+    """
+    Class used to render the charts of a TweetVisualizer to image files in a batch, with the non-interactive Agg backend. The
+    data of every chart (tweet counts, word frequencies, hash tag sets and sentiment counts) is prepared once in the main
+    process from the visualizer's dataset, and the charts are then rendered in parallel by a pool of worker processes, which
+    only receive the data of the charts they render. A manifest of the rendered files and timings is written with the report.
+    """
+    def __init__(self, viz, output_dir, workers=None, file_format='png', dpi=100):
+        """
+        Initialize the report for a TweetVisualizer, the charts are written to output_dir. The workers parameter is the number of
+        render processes (None uses one process per CPU, 0 renders in the main process).
+        """
+        self.viz = viz
+        self.output_dir = output_dir
+        self.workers = workers
+        self.file_format = file_format
+        self.dpi = dpi
+        self.manifest = None
+
+    def get_charts(self, categories, venn_category_lists=VENN_CATEGORY_LISTS):
+        """
+        Function to return the charts of the report drawn by main.py, as a list of the chart name, renderer and a function that
+        returns the data of the chart.
+        """
+        viz = self.viz
+        charts = [('hbar_account_category', 'hbar', lambda: viz.get_hbar_data('account_category')),
+                  ('wordcloud_hash_tags_None', 'wordcloud', lambda: viz.get_wordcloud_hash_tags_data())]
+
+        for category in categories:
+            charts.append(('wordcloud_tweets_' + str(category), 'wordcloud', lambda category=category: viz.get_wordcloud_tweets_data(category)))
+        for category_list in venn_category_lists:
+            charts.append(('venn_' + '_'.join(category_list), 'venn', lambda category_list=category_list: viz.get_venn_data(category_list)))
+        for category in categories:
+            charts.append(('donut_sentiment_' + str(category), 'donut', lambda category=category: viz.get_donut_data(category)))
+
+        return charts
+
+    def run(self, categories, venn_category_lists=VENN_CATEGORY_LISTS):
+        """
+        Method to prepare and render the charts of the report for the list of categories (None for every category), returns the
+        manifest, which is also written to manifest.json in the output directory. Charts without data are recorded as skipped.
+        """
+        makedirs(self.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        entries = []
+        jobs = []
+
+        #Chart data is prepared in the main process, where the dataset and its frequency tables are shared by every chart
+        for name, renderer, get_data in self.get_charts(categories, venn_category_lists):
+            entry = {'name': name, 'renderer': renderer, 'file': None, 'status': 'pending'}
+            data_start = time.perf_counter()
+            try:
+                with self.viz.profiler.span("TweetReport.prepare", chart=name):
+                    data = get_data()
+            except (KeyError, ValueError) as error:
+                data = None
+                entry.update(status='skipped', error=repr(error))
+            entry['data_seconds'] = round(time.perf_counter() - data_start, 6)
+            entries.append(entry)
+
+            if data is not None:
+                jobs.append((entry, renderer, data, path.join(self.output_dir, name + '.' + self.file_format)))
+
+        #Each chart is rendered independently, so the charts are rendered in parallel unless workers is 0
+        render_start = time.perf_counter()
+        if self.workers == 0:
+            use_agg_backend()
+            results = [render_chart(renderer, data, file, self.dpi) for entry, renderer, data, file in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=use_agg_backend) as executor:
+                futures = [executor.submit(render_chart, renderer, data, file, self.dpi) for entry, renderer, data, file in jobs]
+                results = [future.result() for future in futures]
+
+        for (entry, renderer, data, file), result in zip(jobs, results):
+            entry.update(result)
+        render_seconds = time.perf_counter() - render_start
+
+        self.manifest = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'output_dir': self.output_dir,
+            'workers': self.workers,
+            'total_seconds': round(time.perf_counter() - start, 6),
+            'render_seconds': round(render_seconds, 6),
+            'charts': entries
+            }
+        with open(path.join(self.output_dir, 'manifest.json'), 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+        return self.manifest
+
+
+def use_agg_backend():
+    """
+    Function to select the non-interactive Agg backend of matplotlib, called in each render process before pyplot is imported.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_chart(renderer, data, file, dpi=100):
+    """
+    Function to render a chart with its renderer in TweetVisualizer and save it to file, returns the status and timing of the
+    chart. Defined at module level so that it can be sent to process pool workers.
+    """
+    from TweetVisualizer import get_pyplot
+
+    start = time.perf_counter()
+    try:
+        fig = RENDERERS[renderer](**data)
+        fig.savefig(file, dpi=dpi, bbox_inches='tight')
+        get_pyplot().close(fig)
+    except ValueError as error:
+        return {'status': 'skipped', 'error': repr(error), 'render_seconds': round(time.perf_counter() - start, 6), 'pid': getpid()}
+
+    return {'status': 'rendered', 'file': file, 'render_seconds': round(time.perf_counter() - start, 6), 'pid': getpid()}
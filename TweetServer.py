@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import argparse
+import json
+import threading
+import time
+import numpy as np
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qsl, urlencode, urlparse
+from urllib.request import urlopen
+
+
+#Queries answered by the query service, the name of each query is the name of its method
+QUERIES = ['top_profiles', 'counts', 'sentiment', 'hashtag', 'top_hashtags', 'overlap', 'time_counts', 'search', 'campaigns', 'associations']
+
+
+class TweetQueryService:
+    """
+    Class used to answer queries from the processed tweets held in memory. The dataset of a TweetDataHandler is loaded once,
+    with the calculator's profile tables, the aggregate cube, the hash tag index, frequency table and co-occurrence matrix, the
+    time index, the text index and the near-duplicate clusters, so each query is answered from these structures without reading
+    or pre-processing the tweets. Query results are returned as dictionaries and lists that can be written as JSON.
+    """
+    def __init__(self, handler=None, latency_window=1000):
+        """
+        Initialize the query service for a TweetDataHandler, a new data handler is created if none is provided. The latency of
+        the last latency_window calls of each query is kept for the latency report.
+        """
+        import TweetDataHandler as tdh
+
+        self.handler = handler if handler is not None else tdh.TweetDataHandler()
+        self.dataset = self.handler.get_dataset()
+        self.profiler = self.handler.profiler
+        self.calc = None
+        self.tweet_columns = None
+        self.campaign_table = None
+        self.latency_window = latency_window
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Method to load the dataset and build the structures used by the queries. Structures of the dataset are built lazily and
+        are not safe to build from several threads, so they are all built here before the service answers queries. The profiler
+        is turned off once they are built, as the latency of each query is recorded by the service and the profiler would keep
+        a span for every call of a profiled lookup.
+        """
+        from TweetCalculator import TweetCalculator
+
+        self.handler.msg_handle("msg_server_load")
+        with self.profiler.span("TweetQueryService.load"):
+            self.calc = TweetCalculator(self.dataset, profiler=self.profiler)
+            self.dataset.get_cube()
+            self.dataset.get_category_bitsets()
+            self.dataset.get_category_codes()
+            self.dataset.get_frequency_table('hashtags')
+            self.dataset.get_hashtag_cooccurrence()
+            self.dataset.get_time_index()
+            self.dataset.get_text_index()
+            self.handler.get_query_words('')
+            self.dataset.get_duplicate_clusters()
+            self.tweet_columns = self.dataset.get_columns(['author', 'account_category'])
+            self.campaign_table = self.dataset.get_campaigns(min_tweets=2, min_authors=1)
+        self.profiler.enabled = False
+
+        return self
+
+    def query(self, name, **params):
+        """
+        Function to answer a query by name with its parameters, returns the result and records the latency of the query.
+        """
+        if name not in QUERIES:
+            raise KeyError(f"Unknown query {name}, the queries are : {', '.join(QUERIES)}")
+
+        start = time.perf_counter()
+        try:
+            return getattr(self, name)(**params)
+        except Exception:
+            with self.lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+            raise
+        finally:
+            self.record_latency(name, time.perf_counter() - start)
+
+    def record_latency(self, name, seconds):
+        """
+        Method to record the latency of a query.
+        """
+        with self.lock:
+            self.latencies.setdefault(name, deque(maxlen=self.latency_window)).append(seconds)
+
+    def get_latency_report(self):
+        """
+        Function to return the number of calls and errors of each query, and the mean, median, 95th percentile and maximum
+        latency in milliseconds of its recent calls.
+        """
+        with self.lock:
+            latencies = {name: np.array(values) * 1000 for name, values in self.latencies.items()}
+            errors = dict(self.errors)
+
+        return {name: {
+            'calls': len(values),
+            'errors': errors.get(name, 0),
+            'mean_ms': round(float(values.mean()), 3),
+            'p50_ms': round(float(np.percentile(values, 50)), 3),
+            'p95_ms': round(float(np.percentile(values, 95)), 3),
+            'max_ms': round(float(values.max()), 3)
+            } for name, values in latencies.items()}
+
+    def top_profiles(self, num=10, sort_col='followers', account_category=None):
+        """
+        Query returning the top num author profiles by followers or following, optionally for an account category.
+        """
+        profiles = self.calc.get_top_profiles(int(num), sort_col, account_category=account_category)
+
+        return json.loads(profiles.to_json(orient='records'))
+
+    def counts(self, column='account_category', measure='tweets', **filters):
+        """
+        Query returning the number of tweets, or distinct tweets if measure is 'distinct', for each value of a dimension of the
+        aggregate cube. Other parameters filter the cube by dimension value.
+        """
+        return json.loads(self.dataset.get_cube().value_counts(column, measure, **filters).to_json())
+
+    def sentiment(self, account_category=None):
+        """
+        Query returning the number of distinct positive, neutral and negative tweets, as counted by the donut chart, optionally
+        for an account category.
+        """
+        filters = {} if account_category is None else {'account_category': account_category}
+        counts = self.dataset.get_cube().rollup('class_sentiment', 'distinct', **filters)
+
+        return {sentiment: int(counts.get(sentiment, 0)) for sentiment in ['positive', 'neutral', 'negative']}
+
+    def hashtag(self, tag, num=10):
+        """
+        Query returning the number of tweets containing a hash tag, the number of those tweets of each account category and the
+        top num authors of those tweets.
+        """
+        hashtag_index = self.dataset.get_hashtag_index()
+
+        return {
+            'tag': tag,
+            'tweets': int(len(hashtag_index.tweet_rows(tag))),
+            'account_category': json.loads(hashtag_index.tweet_counts(self.tweet_columns, tag, 'account_category').to_json()),
+            'authors': json.loads(hashtag_index.tweet_counts(self.tweet_columns, tag, 'author').head(int(num)).to_json())
+            }
+
+    def top_hashtags(self, num=10, account_category=None):
+        """
+        Query returning the top num lower case hash tags by number of occurrences, optionally for an account category.
+        """
+        from TweetFrequency import get_frequencies
+
+        counts = get_frequencies(self.dataset.get_frequency_table('hashtags'), account_category)
+
+        return json.loads(counts.sort_values(ascending=False, kind='stable').head(int(num)).to_json())
+
+    def overlap(self, metric='intersection'):
+        """
+        Query returning the hash tags shared by each pair of account categories, as a count ('intersection') or a share
+        ('jaccard') of their hash tags.
+        """
+        return json.loads(self.handler.get_cat_hash_tag_overlap(metric).to_json())
+
+    def time_counts(self, start=None, end=None, column='account_category'):
+        """
+        Query returning the number of tweets per day published from start (inclusive) to end (exclusive), for each value of the
+        column, or in total if the column is 'none'.
+        """
+        counts = self.dataset.get_time_counts(start, end, None if column == 'none' else column)
+        counts.index = counts.index.strftime('%Y-%m-%d')
+
+        return json.loads(counts.to_json())
+
+    
+    def search(self, q, mode='and', account_category=None, start=None, end=None, num=10):
+        """
+        Query returning the number of tweets containing all ('and') or any ('or') of the words of q, or q as a phrase
+        ('phrase'), optionally filtered by account category and publish date, with the first num matching tweets.
+        """
+        tweets = self.dataset.search_tweets(q, mode, account_category, start, end)
+        
+        return {'tweets': len(tweets), 'results': json.loads(tweets.head(int(num)).to_json(orient='records', date_format='iso'))}
+
+    
+    def campaigns(self, num=10, min_tweets=5, min_authors=2):
+        """
+        Query returning the num largest clusters of near-duplicate tweets posted by at least min_authors authors, with at least
+        min_tweets tweets. Clusters of at least two tweets are summarized by load, so a min_tweets below two returns the same
+        clusters as two.
+        """
+        campaigns = self.campaign_table
+        campaigns = campaigns[(campaigns['tweets'] >= int(min_tweets)) & (campaigns['authors'] >= int(min_authors))].head(int(num))
+        
+        return json.loads(campaigns.reset_index().to_json(orient='records'))
+
+    
+    def associations(self, tag=None, num=10, metric='pmi', account_category=None, min_tweets=1):
+        """
+        Query returning the top num hash tags used together with a hash tag by metric ('tweets', 'jaccard' or 'pmi'), or the
+        top num pairs of hash tags if no hash tag is provided, optionally for an account category.
+        """
+        cooccurrence = self.dataset.get_hashtag_cooccurrence()
+        if tag is None:
+            return json.loads(cooccurrence.top_pairs(int(num), metric, account_category, int(min_tweets)).to_json(orient='records'))
+        
+        associated = cooccurrence.associated(tag, int(num), metric, account_category, int(min_tweets))
+        
+        return json.loads(associated.reset_index().to_json(orient='records'))
+
+
+class TweetQueryServer(ThreadingHTTPServer):
+    """
+    Class containing an HTTP server answering queries of a TweetQueryService. Requests are handled by a pool of worker threads
+    rather than a new thread per request, the routes are:
+    1) /query/<name>?<parameters> : the result of a query and its latency
+    2) /stats : the latency report of each query
+    3) /health : the status of the server
+    """
+    def __init__(self, service, host='127.0.0.1', port=8765, workers=4):
+        """
+        Initialize the server for a loaded TweetQueryService, listening on host and port.
+        """
+        super().__init__((host, port), TweetQueryRequestHandler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        """
+        Method to handle a request with the worker pool.
+        """
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        """
+        Method to close the server once the requests being handled are finished.
+        """
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+class TweetQueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Class used to handle the HTTP requests of a TweetQueryServer, responses are JSON.
+    """
+    def do_GET(self):
+        """
+        Method to answer a GET request, unknown queries return 404, invalid parameters return 400 and other errors of a query
+        return 500.
+        """
+        url = urlparse(self.path)
+        service = self.server.service
+
+        if url.path == '/health':
+            return self.send_json(200, {'status': 'ok'})
+        if url.path == '/stats':
+            return self.send_json(200, service.get_latency_report())
+        if not url.path.startswith('/query/'):
+            return self.send_json(404, {'error': f"Unknown path {url.path}"})
+
+        name = url.path[len('/query/'):]
+        if name not in QUERIES:
+            return self.send_json(404, {'error': f"Unknown query {name}, the queries are : {', '.join(QUERIES)}"})
+
+        start = time.perf_counter()
+        try:
+            result = service.query(name, **dict(parse_qsl(url.query)))
+        except (KeyError, ValueError, TypeError) as error:
+            return self.send_json(400, {'error': repr(error)})
+        except Exception as error:
+            return self.send_json(500, {'error': repr(error)})
+
+        self.send_json(200, {'query': name, 'result': result, 'latency_ms': round((time.perf_counter() - start) * 1000, 3)})
+
+    def send_json(self, status, body):
+        """
+        Method to write a JSON response.
+        """
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """
+        Method to silence the request log, latencies are reported by the /stats route.
+        """
+        pass
+
+
+class TweetQueryClient:
+    """
+    Class used to send queries to a TweetQueryServer.
+    """
+    def __init__(self, host='127.0.0.1', port=8765, timeout=30):
+        """
+        Initialize the client for the server listening on host and port.
+        """
+        self.url = f"http://{host}:{port}"
+        self.timeout = timeout
+
+    def get(self, path):
+        """
+        Function to return the JSON response of a path of the server, a ValueError is raised with the error of the server if
+        the request fails.
+        """
+        try:
+            with urlopen(self.url + path, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as error:
+            raise ValueError(json.loads(error.read()).get('error')) from None
+
+    def query(self, name, **params):
+        """
+        Function to return the result of a query, parameters that are None are not sent.
+        """
+        params = {key: value for key, value in params.items() if value is not None}
+
+        return self.get('/query/' + name + ('?' + urlencode(params) if len(params) > 0 else ''))['result']
+
+    def stats(self):
+        """
+        Function to return the latency report of the server.
+        """
+        return self.get('/stats')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Query server for the processed Russian troll tweets.")
+    parser.add_argument('--host', default='127.0.0.1', help="address the server listens on or the client connects to")
+    parser.add_argument('--port', type=int, default=8765, help="port the server listens on or the client connects to")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="load the processed tweets and answer queries")
+    serve_parser.add_argument('--workers', type=int, default=4, help="number of threads answering queries")
+    query_parser = subparsers.add_parser('query', help="send a query to a running server")
+    query_parser.add_argument('name', choices=QUERIES + ['stats'], help="query to send")
+    query_parser.add_argument('params', nargs='*', help="query parameters as key=value")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = TweetQueryServer(TweetQueryService().load(), args.host, args.port, args.workers)
+        server.service.handler.msg_handle("msg_server_ready")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        client = TweetQueryClient(args.host, args.port)
+        if args.name == 'stats':
+            result = client.stats()
+        else:
+            result = client.query(args.name, **dict(param.split('=', 1) for param in args.params))
+        print(json.dumps(result, indent=2))
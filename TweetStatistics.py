@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+from math import ceil
+
+
+class RunningMoments:
+    """
+    Class containing running statistics of a numeric variable (count, sum, mean, variance, min and max). Statistics are updated
+    one array of values at a time, and statistics computed separately, such as per chunk or per worker, can be merged.
+    """
+    def __init__(self):
+        """
+        Initialize empty statistics.
+        """
+        self.count = 0
+        self.sum = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """
+        Method to add an array of values to the statistics.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return self
+
+        other = RunningMoments()
+        other.count = len(values)
+        other.sum = float(values.sum())
+        other.mean = other.sum / other.count
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+
+        return self.merge(other)
+
+    def merge(self, other):
+        """
+        Method to combine the statistics of another RunningMoments object, using the pairwise update of the mean and sum of
+        squared differences so that no values need to be kept.
+        """
+        if other.count == 0:
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        return self
+
+    def variance(self):
+        """
+        Returns the population variance of the values.
+        """
+        return self.m2 / self.count if self.count > 0 else np.nan
+
+
+class KLLSketch:
+    """
+    Class containing a KLL quantile sketch. The sketch keeps a bounded sample of the values in levels of compactors, where an
+    item at level h stands for 2^h values, so quantiles can be estimated in fixed memory from any number of values. Sketches
+    built on separate chunks of values can be merged.
+
+    The accuracy is set by k, the normalized rank error of an estimated quantile is at most approximately 1 / k (0.5% for
+    the default k of 200), the memory used grows with k rather than the number of values. Quantiles are exact until the
+    sketch first needs to compact.
+    """
+    def __init__(self, k=200, seed=None):
+        """
+        Initialize an empty sketch with accuracy parameter k, the seed makes the random compactions reproducible.
+        """
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def k_for_error(epsilon):
+        """
+        Returns the value of k giving an approximate normalized rank error of epsilon.
+        """
+        return max(8, int(ceil(1 / epsilon)))
+
+    def error_bound(self):
+        """
+        Returns the approximate normalized rank error of the sketch.
+        """
+        return 1 / self.k
+
+    def capacity(self, level):
+        """
+        Returns the number of items a level may hold before it is compacted, lower levels hold fewer items.
+        """
+        depth = len(self.levels) - level - 1
+
+        return max(2, int(ceil(self.k * (2 / 3) ** depth)))
+
+    def size(self):
+        """
+        Returns the number of items held by the sketch.
+        """
+        return sum(len(level) for level in self.levels)
+
+    def update(self, values):
+        """
+        Method to add an array of values to the sketch.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self.compress()
+
+        return self
+
+    def merge(self, other):
+        """
+        Method to combine another sketch into this sketch, each level of the other sketch is added to the same level.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.compress()
+
+        return self
+
+    def compress(self):
+        """
+        Method to compact levels that are over capacity until the sketch fits within its capacity. Compacting a level sorts its
+        items and moves every second item, starting at a random offset, to the level above.
+        """
+        while self.size() > sum(self.capacity(level) for level in range(len(self.levels))):
+            for level in range(len(self.levels)):
+                if len(self.levels[level]) >= self.capacity(level):
+                    if level + 1 == len(self.levels):
+                        self.levels.append(np.empty(0))
+
+                    items = np.sort(self.levels[level])
+
+                    #An odd item is kept at the current level so that the total weight is unchanged
+                    keep = items[:len(items) % 2]
+                    items = items[len(items) % 2:]
+                    offset = self.rng.integers(2)
+
+                    self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+                    self.levels[level] = keep
+                    break
+
+    def weighted_items(self):
+        """
+        Returns the sorted items of the sketch and the cumulative weight of each item.
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.int64) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+
+        return (items[order], np.cumsum(weights[order]))
+
+    def quantile(self, q):
+        """
+        Returns the estimated q quantile (0 <= q <= 1) of the values added to the sketch, q may also be an array.
+        """
+        if self.n == 0:
+            return np.nan
+
+        items, cumulative_weights = self.weighted_items()
+        positions = np.searchsorted(cumulative_weights, np.asarray(q) * cumulative_weights[-1], side='left')
+
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def rank(self, value):
+        """
+        Returns the estimated fraction of values added to the sketch that are less than or equal to value.
+        """
+        if self.n == 0:
+            return np.nan
+
+        items, cumulative_weights = self.weighted_items()
+        position = np.searchsorted(items, value, side='right')
+
+        return cumulative_weights[position - 1] / cumulative_weights[-1] if position > 0 else 0.0
+
+
+class FollowStatistics:
+    """
+    Class containing mergeable statistics of the followers and following figures of troll accounts, overall and for each
+    account category. Each figure has running moments and a KLL quantile sketch, so the statistics can be updated chunk by
+    chunk or per worker and combined without keeping the figures in memory.
+    """
+    def __init__(self, k=200, seed=None):
+        """
+        Initialize empty statistics, k sets the accuracy of the quantile sketches (see KLLSketch).
+        """
+        self.k = k
+        self.seed = seed
+        self.statistics = {}
+
+    def get_statistics(self, category, column):
+        """
+        Function to return the running moments and quantile sketch of a column for a category (None for all categories).
+        """
+        if (category, column) not in self.statistics:
+            self.statistics[(category, column)] = (RunningMoments(), KLLSketch(self.k, self.seed))
+
+        return self.statistics[(category, column)]
+
+    def update(self, df):
+        """
+        Method to add the followers and following figures of a dataframe with an account_category column.
+        """
+        for column in ['followers', 'following']:
+            values = df[column].to_numpy(dtype=np.float64)
+            moments, sketch = self.get_statistics(None, column)
+            moments.update(values)
+            sketch.update(values)
+
+            for category, rows in df.groupby('account_category', observed=True).indices.items():
+                moments, sketch = self.get_statistics(category, column)
+                moments.update(values[rows])
+                sketch.update(values[rows])
+
+        return self
+
+    def merge(self, other):
+        """
+        Method to combine the statistics of another FollowStatistics object.
+        """
+        for key, (moments, sketch) in other.statistics.items():
+            own_moments, own_sketch = self.get_statistics(*key)
+            own_moments.merge(moments)
+            own_sketch.merge(sketch)
+
+        return self
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)):
+        """
+        Returns a dataframe of the statistics of each category and column, including the estimated quantiles and the
+        followers-to-following ratio of each category. The overall statistics have a category of None.
+        """
+        rows = []
+        for (category, column), (moments, sketch) in self.statistics.items():
+            row = {
+                'account_category': category,
+                'column': column,
+                'count': moments.count,
+                'sum': moments.sum,
+                'mean': moments.mean,
+                'std': np.sqrt(moments.variance()),
+                'min': moments.min,
+                'max': moments.max
+                }
+            for q, value in zip(quantiles, np.atleast_1d(sketch.quantile(list(quantiles)))):
+                row['p' + str(int(q * 100))] = value
+            rows.append(row)
+
+        return pd.DataFrame(rows).set_index(['account_category', 'column'])
+
+    def follow_ratio(self, category=None):
+        """
+        Returns the followers-to-following ratio for a category, or for all categories.
+        """
+        followers = self.get_statistics(category, 'followers')[0].sum
+        following = self.get_statistics(category, 'following')[0].sum
+
+        return followers / following if following > 0 else np.nan
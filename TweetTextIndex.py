@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import json
+import numpy as np
+import pandas as pd
+
+from itertools import chain
+from os import path, remove
+
+
+#Arrays of the index, each stored as <name>.<array>.npy
+INDEX_ARRAYS = ['index', 'postings_offsets', 'postings_rows', 'postings_positions']
+
+
+class TweetTextIndex:
+    """
+    Class containing a positional inverted index of the words of the processed tweets. Each distinct word is interned to an
+    integer id, and the row and position of every occurrence of each word are stored in compact arrays (CSR layout) sorted by
+    row and position, so a query only reads the postings of its words.
+
+    The index supports word queries, AND/OR queries over several words and phrase queries. It can be saved as NumPy files and
+    loaded memory-mapped, so a saved index is opened without reading the postings into memory.
+    """
+    def __init__(self, vocabulary, index, postings_offsets, postings_rows, postings_positions):
+        """
+        Initialize the index from its arrays, see from_series to build an index from processed tweets. The postings of word id
+        t are postings_rows[postings_offsets[t]:postings_offsets[t + 1]] and the matching postings_positions.
+        """
+        self.vocabulary = vocabulary
+        self.index = index
+        self.postings_offsets = postings_offsets
+        self.postings_rows = postings_rows
+        self.postings_positions = postings_positions
+        self.word_lookup = {word: word_id for word_id, word in enumerate(vocabulary)}
+
+    @classmethod
+    def from_series(cls, processed_content):
+        """
+        Function to build the index from a series of processed tweets, words are separated by whitespace. Row ids are positions
+        in the series, tweets without content have no words. The index of the series is kept to translate row ids back to
+        dataframe index values.
+        """
+        words = processed_content.str.split()
+        words = words.where(words.notna(), pd.Series([[]] * len(words), index=words.index, dtype=object))
+        lengths = words.str.len().to_numpy(dtype=np.int64)
+
+        #Row and position of each word occurrence, in row order
+        row_offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=row_offsets[1:])
+        rows = np.repeat(np.arange(len(words), dtype=np.int32), lengths)
+        positions = (np.arange(row_offsets[-1], dtype=np.int64) - np.repeat(row_offsets[:-1], lengths)).astype(np.int32)
+
+        #Intern each word to an integer id, a stable sort by word id keeps the occurrences of each word in row and position order
+        codes, vocabulary = pd.factorize(pd.Series(list(chain.from_iterable(words)), dtype=object))
+        order = np.argsort(codes, kind='stable')
+        postings_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(vocabulary)), out=postings_offsets[1:])
+
+        return cls(list(vocabulary), processed_content.index.to_numpy(), postings_offsets, rows[order], positions[order])
+
+    def get_word_id(self, word):
+        """
+        Function to return the id of a word, None is returned if the word is not indexed.
+        """
+        return self.word_lookup.get(word)
+
+    def get_postings(self, word):
+        """
+        Function to return the rows and positions of the occurrences of a word.
+        """
+        word_id = self.get_word_id(word)
+        if word_id is None:
+            return (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+
+        start, end = self.postings_offsets[word_id], self.postings_offsets[word_id + 1]
+
+        return (np.asarray(self.postings_rows[start:end]), np.asarray(self.postings_positions[start:end]))
+
+    def word_rows(self, word):
+        """
+        Function to return the row positions of the tweets containing a word, in ascending order.
+        """
+        rows = self.get_postings(word)[0]
+
+        #Rows are sorted, a tweet containing the word more than once is listed once
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = rows[1:] != rows[:-1]
+
+        return rows[keep]
+
+    def search(self, words, mode='and', mask=None):
+        """
+        Function to return the row positions of the tweets containing all ('and') or any ('or') of a list of words, or the
+        words as a phrase ('phrase'), in ascending order. If a boolean mask over the rows is provided, only rows selected by
+        the mask are returned.
+        """
+        if len(words) == 0:
+            rows = np.empty(0, dtype=np.int32)
+        elif mode == 'and':
+            #Intersect from the rarest word, so each intersection reads the fewest rows
+            word_rows = sorted((self.word_rows(word) for word in words), key=len)
+            rows = word_rows[0]
+            for other_rows in word_rows[1:]:
+                rows = np.intersect1d(rows, other_rows, assume_unique=True)
+        elif mode == 'or':
+            rows = np.unique(np.concatenate([self.word_rows(word) for word in words]))
+        elif mode == 'phrase':
+            rows = self.phrase_rows(words)
+        else:
+            raise ValueError("Search mode must be 'and', 'or' or 'phrase'.")
+
+        if mask is not None:
+            rows = rows[np.asarray(mask, dtype=bool)[rows]]
+
+        return rows
+
+    def phrase_rows(self, words):
+        """
+        Function to return the row positions of the tweets containing the words in order at consecutive positions.
+        """
+        #Occurrences are keyed by row and position, the keys of each word are sorted as its postings are
+        def get_keys(word):
+            rows, positions = self.get_postings(word)
+            return rows.astype(np.int64) << 32 | positions.astype(np.int64)
+
+        keys = get_keys(words[0])
+        for offset, word in enumerate(words[1:], start=1):
+            word_keys = get_keys(word)
+
+            #Binary search for the key of the next word at the following position of each occurrence
+            found = np.searchsorted(word_keys, keys + offset)
+            matched = found < len(word_keys)
+            matched[matched] = word_keys[found[matched]] == keys[matched] + offset
+            keys = keys[matched]
+
+        return np.unique((keys >> 32).astype(np.int32))
+
+    def tweet_index(self, rows):
+        """
+        Function to return the dataframe index values of row positions.
+        """
+        return self.index[rows]
+
+    def save(self, cache_dir, name, fingerprint):
+        """
+        Method to write the index to <cache_dir><name>.<array>.npy files, with the vocabulary and the fingerprint of the
+        processed tweets in <cache_dir><name>.json. The metadata is removed first and written last so that a partially written
+        index is never treated as valid.
+        """
+        meta_file = cache_dir + name + ".json"
+        if path.exists(meta_file):
+            remove(meta_file)
+
+        for array in INDEX_ARRAYS:
+            np.save(cache_dir + name + "." + array + ".npy", np.asarray(getattr(self, array)))
+
+        with open(meta_file, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": fingerprint, "vocabulary": self.vocabulary}, f)
+
+    @classmethod
+    def load(cls, cache_dir, name, fingerprint=None):
+        """
+        Function to open an index saved with save, the arrays are memory-mapped. None is returned if the index does not exist
+        or, if a fingerprint is provided, was saved with a different fingerprint.
+        """
+        meta_file = cache_dir + name + ".json"
+        array_files = [cache_dir + name + "." + array + ".npy" for array in INDEX_ARRAYS]
+        if not (path.exists(meta_file) and all(path.exists(file) for file in array_files)):
+            return None
+
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if fingerprint is not None and meta["fingerprint"] != fingerprint:
+            return None
+
+        return cls(meta["vocabulary"], *[np.load(file, mmap_mode='r', allow_pickle=False) for file in array_files])
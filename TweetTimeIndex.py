@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+
+
+#Format of the date columns in the source files, such as 11/5/2015 20:11
+DATE_FORMAT = '%m/%d/%Y %H:%M'
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    """
+    Function to parse a series of date strings with a fixed format to datetime64, values that are missing or do not match the
+    format become NaT. Tweets are published at minute resolution, so many tweets share a date string, each distinct string is
+    parsed once and the parsed dates are then taken by the code of each value. Series that are already datetime64 are returned
+    unchanged.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce').to_numpy()
+
+    #Missing values have code -1, which takes the appended NaT
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns').astype(parsed.dtype))
+
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+
+class TweetTimeIndex:
+    """
+    Class containing a time-partitioned index of the tweets. The row positions of the tweets are stored sorted by date, and the
+    sorted rows are partitioned by period (day by default), so the tweets between two dates are found with a binary search over
+    the sorted dates, and counts per period only read the rows of the range. Tweets without a date are not indexed.
+    """
+    def __init__(self, dates, freq='D'):
+        """
+        Initialize the index from a series of datetime64 dates, row ids are positions in the series. The index of the series is
+        kept to translate row ids back to dataframe index values.
+        """
+        self.index = dates.index
+        self.freq = freq
+        values = parse_dates(dates).to_numpy(dtype='datetime64[ns]')
+        self.values = values
+
+        #Row positions sorted by date, a stable sort keeps the rows of each date in ascending order
+        rows = np.flatnonzero(~np.isnat(values))
+        self.rows = rows[np.argsort(values[rows], kind='stable')]
+        self.dates = values[self.rows]
+
+        #Partition p holds the sorted rows partition_offsets[p]:partition_offsets[p + 1], starting at partition_keys[p]
+        periods = pd.DatetimeIndex(self.dates).floor(freq).to_numpy()
+        starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]]) if len(periods) > 0 else np.array([], dtype=np.int64)
+        self.partition_keys = periods[starts]
+        self.partition_offsets = np.append(starts, len(periods)).astype(np.int64)
+        self.partition_ids = np.repeat(np.arange(len(starts), dtype=np.int64), np.diff(self.partition_offsets))
+
+    def get_bounds(self, start=None, end=None):
+        """
+        Function to return the positions in the sorted rows of the tweets published from start (inclusive) to end (exclusive),
+        either of which may be None for an open range.
+        """
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), side='left')
+
+        return (int(lo), int(max(lo, hi)))
+
+    def range_rows(self, start=None, end=None):
+        """
+        Function to return the row positions of the tweets published from start (inclusive) to end (exclusive), in date order.
+        """
+        lo, hi = self.get_bounds(start, end)
+
+        return self.rows[lo:hi]
+
+    def filter_rows(self, rows, start=None, end=None):
+        """
+        Function to return the row positions of a list of rows published from start (inclusive) to end (exclusive), in the
+        order of the list. Only the dates of the listed rows are read, rows without a date are removed.
+        """
+        rows = np.asarray(rows)
+        keep = ~np.isnat(self.values[rows])
+        if start is not None:
+            keep &= self.values[rows] >= np.datetime64(pd.Timestamp(start), 'ns')
+        if end is not None:
+            keep &= self.values[rows] < np.datetime64(pd.Timestamp(end), 'ns')
+
+        return rows[keep]
+
+    def range_index(self, start=None, end=None):
+        """
+        Function to return the dataframe index values of the tweets published from start (inclusive) to end (exclusive).
+        """
+        return self.index[self.range_rows(start, end)]
+
+    def get_partitions(self):
+        """
+        Function to return the number of tweets in each partition, as a series indexed by the start of the partition.
+        """
+        return pd.Series(np.diff(self.partition_offsets), index=pd.DatetimeIndex(self.partition_keys, name='period'), name='tweets')
+
+    def counts(self, start=None, end=None, by=None):
+        """
+        Function to return the number of tweets per partition published from start (inclusive) to end (exclusive). If by is
+        provided, a series of values such as the account category of each row, the counts are returned as a dataframe with a
+        column for each value. Partitions without tweets in the range are not returned.
+        """
+        lo, hi = self.get_bounds(start, end)
+        partition_ids = self.partition_ids[lo:hi]
+        first = partition_ids[0] if len(partition_ids) > 0 else 0
+        num_partitions = partition_ids[-1] - first + 1 if len(partition_ids) > 0 else 0
+        periods = pd.DatetimeIndex(self.partition_keys[first:first + num_partitions], name='period')
+
+        if by is None:
+            counts = pd.Series(np.bincount(partition_ids - first, minlength=num_partitions), index=periods, name='tweets')
+            return counts[counts > 0]
+
+        #Partition and value of each row are combined into one id, counted with a single bincount
+        codes, labels = pd.factorize(pd.Series(np.asarray(by)[self.rows[lo:hi]], dtype=object), sort=True)
+        keep = codes >= 0
+        counts = np.bincount((partition_ids - first)[keep] * len(labels) + codes[keep], minlength=num_partitions * len(labels))
+        counts = pd.DataFrame(counts.reshape(num_partitions, len(labels)), index=periods, columns=[str(label) for label in labels])
+
+        return counts[counts.sum(axis=1) > 0]
@@ -7,16 +7,14 @@ Created on Sat Mar  2 10:01:00 2019
 #Import modules
 import TweetDataHandler as tdh
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib as mpl
 
+from TweetCube import CUBE_DIMENSIONS
+from TweetFrequency import get_frequencies, wordcloud_frequencies
+from TweetProfiler import profile_stage
 
-from os import path
-from PIL import Image
-from wordcloud import WordCloud
-from collections import Counter
-from matplotlib_venn import venn2, venn2_circles
+#matplotlib, wordcloud and matplotlib_venn are imported by the charts that use them, so the visualizer and its dataset can be
+#used without importing the plotting libraries
+pyplot = None
 
 
 class TweetVisualizer:
@@ -25,172 +23,283 @@ class TweetVisualizer:
     """
     def __init__(self):
         """
-        Initializes the tweet visualizer class, setting the tweedle_collection attribute to data retrieved from the TweetDataHandler class. From the
-        tweedle_collection attribute, the data frame from the troll tweets is derived, as well as the distinct hash tags contained within the tweet
-        content, and the hashtag categories. Calling the tweet_pre_processing method performs text processing and sentiment
-        analysis on tweets' content.
+        Initializes the tweet visualizer class, setting the tweedle attribute to the TweetDataHandler class and the dataset attribute to
+        its lazy dataset. Each chart reads only the columns it needs from the dataset, so pre-processing steps such as text processing
+        and sentiment analysis on tweets' content are only performed when a chart uses their results.
+        
+        The tweedle_collection and troll_tweet_df attributes run the tweet_pre_processing method of the data handler the first time they
+        are used.
         """
         self.tweedle = tdh.TweetDataHandler()
-        self.tweedle_collection = self.tweedle.tweet_pre_processing()
-        self.troll_tweet_df = self.tweedle_collection[0]
-        self.distinct_hashtags = self.tweedle_collection[1]
-        self.hashtag_categories = self.tweedle_collection[2]
+        self.dataset = self.tweedle.get_dataset()
+        
+        #Charts are recorded by the data handler's profiler
+        self.profiler = self.tweedle.profiler
+    
+    @property
+    def tweedle_collection(self):
+        """
+        Tuple of the processed dataframe, distinct hash tags and hashtag categories returned by tweet_pre_processing.
+        """
+        self.dataset.get_frame()
+        
+        return (self.tweedle.troll_tweet_df, self.tweedle.distinct_hashtags, self.tweedle.hashtag_set_list)
+    
+    @property
+    def troll_tweet_df(self):
+        """
+        Processed troll tweet dataframe.
+        """
+        return self.dataset.get_frame()
+    
+    @property
+    def distinct_hashtags(self):
+        """
+        Distinct hash tags contained within the tweet content.
+        """
+        return self.dataset.get_distinct_hashtags()
+    
+    @property
+    def hashtag_categories(self):
+        """
+        List containing the set of hash tags of each account category, in the order of the data handler's category list.
+        """
+        return self.dataset.get_cat_hash_tags()
         
    
+    @profile_stage
     def hbar_tweets_by_col(self,column):
         """
         Method to generate a horizontal bar chart, displaying a numerical value (number of tweets) grouped by the parameter column
         passed to the function.
         """
-        #Create acct category data frame for matplotlib figure 
-        df = pd.DataFrame(self.troll_tweet_df[column].value_counts())
-        df = df.reset_index()
-        
-        #Setup & show matplot lib figure for number of tweets per column
-        fig, ax = plt.subplots()
-        
-        y_pos = np.arange(len(df['index']))
-        number_of_tweets = df[column]
-        
-        for i, v in enumerate(number_of_tweets):
-            plt.text(v, i, " "+ "{:,}".format(v), va='center', fontweight='bold')
-            
-        plt.barh(y_pos, number_of_tweets, align='center')
-        plt.yticks(y_pos,df['index'])
-        
-        plt.xticks(rotation = '75')
+        self.show_figure(render_hbar(**self.get_hbar_data(column)))
+    
+    def get_hbar_data(self, column):
+        """
+        Function to return the data of the horizontal bar chart, the number of tweets for each value of the column. Dimensions of
+        the aggregate cube are counted from the cube.
+        """
+        if column in CUBE_DIMENSIONS:
+            return {'counts': self.dataset.get_cube().value_counts(column), 'column': column}
         
-        ax.xaxis.set_major_formatter(mpl.ticker.StrMethodFormatter('{x:,.0f}'))
-        plt.xlabel('Number of Tweets')
-
-        #Display title containing the column used to group the numerical "number of tweets" data
-        plt.title('Russian Troll Tweets by ' + str(column))
-        plt.show()
+        return {'counts': self.dataset.get_column(column).value_counts(), 'column': column}
     
+    @profile_stage
     def wordcloud_hash_tags(self, account_category=None):
         """
         Method to generate a wordcloud containing the most frequently occurring hash tags in the tweets. There is an optional 
         account_category parameter that allows for the word cloud to filter the dataframe by the specified troll account
         category.
         """
-        #Condition used to filter the dataframe according to the optional "account_category" parameter.
-        #List comprehension  is used to create a list of each hash tag sublist contained in the troll tweet data frame
         try:
-            if account_category == None:
-                tags = [tag.lower() for row in self.troll_tweet_df['hash_tags'] for tag in row]
-            else:
-                tags = [tag.lower() for row in self.troll_tweet_df[self.troll_tweet_df['account_category'] == account_category]['hash_tags'] for tag in row]
-           
-            #Create a dictionary containing a count for each hash tag contained within the "hash tags" list
-            word_cloud_dict = Counter(tags)
-            wordcloud = WordCloud(max_font_size=50, max_words = 100, background_color='white').generate_from_frequencies(word_cloud_dict)
-            plt.figure()
-            plt.imshow(wordcloud, interpolation='bilinear')
-    
-            #Turn off axis as it there is none used for a wordcloud visualization
-            plt.axis("off")
-            plt.title("Hash Tag Word Cloud : Category - " + str(account_category))
-            plt.show()
+            self.show_figure(render_wordcloud(**self.get_wordcloud_hash_tags_data(account_category)))
         except ValueError:
             print(f"Warning: No words available for wordcloud using account category : {account_category}")
     
+    def get_wordcloud_hash_tags_data(self, account_category=None):
+        """
+        Function to return the data of the hash tag wordcloud, a dictionary containing a count for each hash tag of the optional
+        account category.
+        """
+        #The hash tag frequency table holds the count of each lower case hash tag by account category, it is built once and cached
+        word_cloud_dict = get_frequencies(self.dataset.get_frequency_table('hashtags'), account_category).to_dict()
+        
+        return {'frequencies': word_cloud_dict, 'title': "Hash Tag Word Cloud : Category - " + str(account_category)}
+    
+    @profile_stage
     def wordcloud_tweets(self, account_category=None):
         """
         Method to generate a wordcloud containing the most frequent words in the tweet content. There is an optional 
         account_category parameter that allows for the word cloud to filter the dataframe by the specified troll account
         category.
         """
-        #Condition used to filter the dataframe according to the optional "account_category" parameter.
-        #Filter out null values, which cause an issue for the wordcloud constructor, some tweets do not have content following
-        #the pre-processing steps. i.e Content does not include URL and hashtags, etc.
-
         try:
-            if account_category is not None:
-                tweet_content = self.troll_tweet_df[self.troll_tweet_df['account_category'] == account_category]
-                tweet_content = tweet_content[tweet_content['processed_content'].isna() == False]['processed_content']
-                
-            else:
-                tweet_content = self.troll_tweet_df[self.troll_tweet_df['processed_content'].isna() == False]['processed_content']
-            
-            wordcloud = WordCloud(max_font_size=50, max_words = 100, background_color='white').generate(' '.join(tweet_content))
-            plt.figure()
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis("off")
-            plt.title("Tweet Content Cloud : Category -  " + str(account_category) )
-            plt.show()
+            self.show_figure(render_wordcloud(**self.get_wordcloud_tweets_data(account_category)))
         except ValueError:
             print(f"Warning: No words available for wordcloud using account category : {account_category}")
     
+    def get_wordcloud_tweets_data(self, account_category=None):
+        """
+        Function to return the data of the tweet content wordcloud, a dictionary containing a count for each word of the optional
+        account category.
+        """
+        from wordcloud import STOPWORDS
+        
+        #The token frequency table holds the count of each word of the processed content by account category, it is built once
+        #and cached. Words are filtered as WordCloud.generate filters them, without re-tokenizing the tweets.
+        word_cloud_dict = wordcloud_frequencies(self.dataset.get_frequency_table('tokens'), account_category, STOPWORDS)
+        
+        return {'frequencies': word_cloud_dict, 'title': "Tweet Content Cloud : Category -  " + str(account_category)}
+    
+    @profile_stage
     def venn_hashtags(self, account_category_list):
         """
         Method to generate a venn diagram containing matching distinct hashtag values for each account category to show the relationship
-        between each account categories messaging"""
+        between each account categories messaging. Two or three account categories may be provided."""
+        self.show_figure(render_venn(**self.get_venn_data(account_category_list)))
+    
+    def get_venn_data(self, account_category_list):
+        """
+        Function to return the data of the venn diagram, the set of hash tags of each account category in the list.
+        """
+        if len(account_category_list) not in (2, 3):
+            raise Exception('May only provide 2 or 3 values for venn diagram.')
         
-        if len(account_category_list) > 2:
-            raise Exception('May only provide up to 2 values for venn diagram.')
-        else:
-            sets = {
-            "Fearmonger" : self.hashtag_categories[0],
-            "Commercial" : self.hashtag_categories[1],
-            "HashtagGamer" : self.hashtag_categories[2],
-            "LeftTroll" : self.hashtag_categories[3],
-            "NewsFeed" : self.hashtag_categories[4],
-            "RightTroll" : self.hashtag_categories[5]
-                    }
-            set_list = [sets[i] for i in account_category_list]            
-            v = venn2(set_list, (account_category_list[0], account_category_list[1]))
-            c = venn2_circles(subsets = set_list, linestyle='dashed', color='grey', linewidth=1.0)
-            
-            c[0].set_lw(1.0)
-            c[0].set_ls('dotted')
-
-            plt.title("Shared Hashtags by Account Category:")
-            plt.show()
+        #Hashtag sets are stored in the order of the data handler's category list
+        sets = dict(zip(self.tweedle.cat_list, self.hashtag_categories))
+        
+        return {'set_list': [sets[i] for i in account_category_list], 'labels': list(account_category_list)}
 
+    @profile_stage
     def donut_sentiment(self, account_category=None):
         """
         Method to generate a donut chart containing the breakdown of positive, neutral and negative tweets. User
         may specify an optional account category parameter to compare results across troll types
         """
         try:
-            #Prepare dataframe for viz
-            tweets = self.troll_tweet_df[['processed_content', 'account_category', 'class_sentiment']].drop_duplicates()
-            tweets_sent_count = tweets.groupby(by=['account_category', 'class_sentiment']).count()
-            
-            #Get values for pie group size
-            if account_category == None:
-                tweets = tweets_sent_count.groupby(by=['class_sentiment']).sum()
-                positive_tweets = tweets.loc['positive'].values
-                neutral_tweets = tweets.loc['neutral'].values
-                negative_tweets = tweets.loc['negative'].values
-            else:
-                tweets = tweets_sent_count.loc[account_category]
-                positive_tweets = tweets.loc['positive'].values
-                neutral_tweets = tweets.loc['neutral'].values
-                negative_tweets = tweets.loc['negative'].values
-                
-            #Create Colors, assign group size and names
-            pos_color, neu_color, neg_color = plt.cm.Greens, plt.cm.Greys, plt.cm.Reds
-            group_size = [positive_tweets, neutral_tweets, negative_tweets]
-            group_names = ['Positive Tweets', 'Neutral Tweets', 'Negative Tweets']
-            
-            
-            #Set the size of the plot
-            fig, ax = plt.subplots(figsize=(3,3))
-            
-            ax.axis('equal')
-            mypie,_,pct = ax.pie(group_size, radius=1.3, labels=group_names,colors=[pos_color(.5), neu_color(.5), neg_color(.5)], autopct='%1.1f%%', pctdistance= .8)
-            plt.setp(mypie, width=.7, edgecolor='white')
-            
-            
-            
-            #Show figure
-            plt.title(f"Tweet Sentiment: Category - {account_category}\n\n")
-    
-            #Show Plot             
-            plt.show()
+            self.show_figure(render_donut(**self.get_donut_data(account_category)))
         except KeyError:
-            print(f'Warning : account category is unavailable in dataset, continuing.')
+            print('Warning : account category is unavailable in dataset, continuing.')
+    
+    def get_donut_data(self, account_category=None):
+        """
+        Function to return the data of the donut chart, the number of distinct positive, neutral and negative tweets. A KeyError
+        is raised if the account category does not have tweets of each sentiment class.
+        """
+        #The distinct measure of the aggregate cube counts the distinct processed content of each category and sentiment class
+        tweets_sent_count = self.dataset.get_cube().rollup(['account_category', 'class_sentiment'], 'distinct')
+        
+        #Get values for pie group size
+        if account_category == None:
+            tweets = tweets_sent_count.groupby(level='class_sentiment').sum()
+        else:
+            tweets = tweets_sent_count.loc[account_category]
+        
+        positive_tweets = tweets.loc['positive']
+        neutral_tweets = tweets.loc['neutral']
+        negative_tweets = tweets.loc['negative']
+        
+        return {'group_size': [positive_tweets, neutral_tweets, negative_tweets], 'account_category': account_category}
+    
+    def show_figure(self, fig):
+        """
+        Method to display a rendered figure.
+        """
+        get_pyplot().show()
+
+
+def render_hbar(counts, column):
+    """
+    Function to render the horizontal bar chart of the number of tweets for each value of a column, returns the figure.
+    """
+    #Setup matplot lib figure for number of tweets per column
+    plt = get_pyplot()
+    from matplotlib.ticker import StrMethodFormatter
+    
+    fig, ax = plt.subplots()
+    
+    y_pos = np.arange(len(counts))
+    number_of_tweets = counts.values
+    
+    for i, v in enumerate(number_of_tweets):
+        plt.text(v, i, " "+ "{:,}".format(v), va='center', fontweight='bold')
+        
+    plt.barh(y_pos, number_of_tweets, align='center')
+    plt.yticks(y_pos, counts.index)
+    
+    plt.xticks(rotation = 75)
+    
+    ax.xaxis.set_major_formatter(StrMethodFormatter('{x:,.0f}'))
+    plt.xlabel('Number of Tweets')
+
+    #Display title containing the column used to group the numerical "number of tweets" data
+    plt.title('Russian Troll Tweets by ' + str(column))
+    
+    return fig
+
+
+def render_wordcloud(frequencies, title):
+    """
+    Function to render a wordcloud from a dictionary of word counts, returns the figure. A ValueError is raised if there are no
+    words.
+    """
+    plt = get_pyplot()
+    from wordcloud import WordCloud
+    
+    wordcloud = WordCloud(max_font_size=50, max_words = 100, background_color='white').generate_from_frequencies(frequencies)
+    fig = plt.figure()
+    plt.imshow(wordcloud, interpolation='bilinear')
+
+    #Turn off axis as it there is none used for a wordcloud visualization
+    plt.axis("off")
+    plt.title(title)
+    
+    return fig
 
-            
 
+def render_venn(set_list, labels):
+    """
+    Function to render a venn diagram of two or three sets of hash tags, returns the figure.
+    """
+    plt = get_pyplot()
+    from matplotlib_venn import venn2, venn2_circles, venn3, venn3_circles
+    
+    fig = plt.figure()
+    if len(set_list) == 2:
+        venn2(set_list, tuple(labels))
+        c = venn2_circles(subsets = set_list, linestyle='dashed', color='grey', linewidth=1.0)
+    else:
+        venn3(set_list, tuple(labels))
+        c = venn3_circles(subsets = set_list, linestyle='dashed', color='grey', linewidth=1.0)
+    
+    c[0].set_lw(1.0)
+    c[0].set_ls('dotted')
+
+    plt.title("Shared Hashtags by Account Category:")
+    
+    return fig
+
+
+def render_donut(group_size, account_category):
+    """
+    Function to render the donut chart of positive, neutral and negative tweets, returns the figure.
+    """
+    #Create Colors, assign group size and names
+    plt = get_pyplot()
+    pos_color, neu_color, neg_color = plt.cm.Greens, plt.cm.Greys, plt.cm.Reds
+    group_names = ['Positive Tweets', 'Neutral Tweets', 'Negative Tweets']
+    
+    #Set the size of the plot
+    fig, ax = plt.subplots(figsize=(3,3))
+    
+    ax.axis('equal')
+    mypie,_,pct = ax.pie(group_size, radius=1.3, labels=group_names,colors=[pos_color(.5), neu_color(.5), neg_color(.5)], autopct='%1.1f%%', pctdistance= .8)
+    plt.setp(mypie, width=.7, edgecolor='white')
+    
+    plt.title(f"Tweet Sentiment: Category - {account_category}\n\n")
+    
+    return fig
+
+
+#Render function of each chart, used by batch reports
+RENDERERS = {
+    'hbar': render_hbar,
+    'wordcloud': render_wordcloud,
+    'venn': render_venn,
+    'donut': render_donut
+    }
+
+
+def get_pyplot():
+    """
+    Function to return matplotlib's pyplot module, which is imported with the default style the first time a chart is drawn.
+    """
+    global pyplot
+    
+    if pyplot is None:
+        import matplotlib.pyplot as plt
+        plt.rcdefaults()
+        pyplot = plt
+        
+    return pyplot
@@ -1,12 +1,21 @@
+import argparse
 import TweetVisualizer as visual
 import TweetCalculator as calculator
-import numpy as np
 
-def main():
+from TweetFrequency import get_frequencies
+from TweetProfiler import get_import_times
+from TweetReport import VENN_CATEGORY_LISTS, TweetReport
+
+def main(headless=False, report_dir=None, workers=None):
+    """
+    Runs the tweet calculations and charts. In headless mode the charts are replaced by printed summaries, and the plotting
+    libraries are never imported. If report_dir is provided, the charts are rendered to files in report_dir by a pool of
+    workers processes instead of being displayed, see TweetReport.
+    """
     #Create list for looping, load data and initialize tweet visualizer/calculator
     categories = [None,'Fearmonger','Commercial', 'HashtagGamer','LeftTroll', 'NewsFeed', 'RightTroll']
     viz = visual.TweetVisualizer()
-    calc = calculator.TweetCalculator(viz.troll_tweet_df)
+    calc = calculator.TweetCalculator(viz.dataset, profiler=viz.profiler)
     
     #Perform tweet calculations
     calc.calc_followers_and_following()
@@ -24,54 +33,80 @@ def main():
         print(f"Top 10 following - {category} \n")
         calc.profile_top(10,'following', account_category=category)
         
-    #Horizontal Bar chart
-    viz.hbar_tweets_by_col('account_category')
-    
-    
-    #Hashtag Wordcloud
-    #for category in categories:
-    viz.wordcloud_hash_tags()
-
-    #Tweet Wordlcloud
-    for category in categories:
-        viz.wordcloud_tweets(account_category=category)
+    if headless == True or report_dir is not None:
+        print("Russian Troll Tweets by account_category\n")
+        print(viz.dataset.get_cube().value_counts('account_category'), "\n")
         
+        #Most frequent hashtags and tweet words, in place of the wordclouds
+        print("Top 10 hashtags - Overall\n")
+        print(get_frequencies(viz.dataset.get_frequency_table('hashtags')).nlargest(10), "\n")
+        for category in categories:
+            print(f"Top 10 tweet words - {category} \n")
+            print(get_frequencies(viz.dataset.get_frequency_table('tokens'), category).nlargest(10), "\n")
+    else:
+        #Horizontal Bar chart
+        viz.hbar_tweets_by_col('account_category')
+        
+        
+        #Hashtag Wordcloud
+        #for category in categories:
+        viz.wordcloud_hash_tags()
     
-    #Venn Diagram
-    
-    #Comparing Left Trolls to other categories
-    category_list = ['LeftTroll', 'RightTroll']
-    viz.venn_hashtags(category_list)
-    
-    category_list = ['LeftTroll', 'Fearmonger']
-    viz.venn_hashtags(category_list)
-    
-    category_list = ['LeftTroll', 'Commercial']
-    viz.venn_hashtags(category_list)
-    
-    category_list = ['LeftTroll', 'HashtagGamer']
-    viz.venn_hashtags(category_list)
-    
-    category_list = ['LeftTroll', 'NewsFeed']
-    viz.venn_hashtags(category_list)
-    
+        #Tweet Wordlcloud
+        for category in categories:
+            viz.wordcloud_tweets(account_category=category)
+        
     
-    #Comparing Right Trolls to other categories
-    category_list = ['RightTroll', 'Fearmonger']
-    viz.venn_hashtags(category_list)
+    #Shared hashtags between every pair of account categories
+    print("Shared hashtags by account category\n")
+    print(viz.tweedle.get_cat_hash_tag_overlap('intersection'), "\n")
+    print("Hashtag Jaccard similarity by account category\n")
+    print(viz.tweedle.get_cat_hash_tag_overlap('jaccard').round(3), "\n")
     
-    category_list = ['RightTroll', 'Commercial']
-    viz.venn_hashtags(category_list)
+    if headless == False and report_dir is None:
+        #Venn Diagram, comparing Left Trolls and Right Trolls to other categories
+        for category_list in VENN_CATEGORY_LISTS:
+            viz.venn_hashtags(category_list)
+        
+        #Sentiment analysis donut chart
+        for category in categories:
+            viz.donut_sentiment(account_category=category)
+    else:
+        #Hashtags used by only one or both categories of each pair, in place of the venn diagrams
+        print("Hashtags used by only one or both account categories\n")
+        for category_list in VENN_CATEGORY_LISTS:
+            left, right = viz.get_venn_data(category_list)['set_list']
+            print(f"{category_list[0]} only : {len(left - right)}, both : {len(left & right)}, {category_list[1]} only : {len(right - left)}")
+        print()
+        
+        #Distinct tweets of each sentiment class, as counted by the donut charts
+        print("Distinct tweets by sentiment - account_category\n")
+        sentiment = viz.dataset.get_cube().rollup(['account_category', 'class_sentiment'], 'distinct').unstack(fill_value=0)
+        sentiment = sentiment.reindex(columns=['positive', 'neutral', 'negative'], fill_value=0)
+        sentiment.loc['Overall'] = sentiment.sum()
+        print(sentiment, "\n")
     
-    category_list = ['RightTroll', 'HashtagGamer']
-    viz.venn_hashtags(category_list)
+    #Render every chart to files, with a manifest of the charts and timings
+    if report_dir is not None:
+        manifest = TweetReport(viz, report_dir, workers).run(categories)
+        print(f"Report : {sum(chart['status'] == 'rendered' for chart in manifest['charts'])} charts rendered to {report_dir} in {manifest['total_seconds']:.1f}s\n")
     
-    category_list = ['RightTroll', 'NewsFeed']
-    viz.venn_hashtags(category_list)
+    #Store the processed tweets derived by the lazy dataset, as tweet_pre_processing stores them
+    viz.tweedle.save_dataset()
     
-    #Sentiment analysis donut chart
-    for category in categories:
-        viz.donut_sentiment(account_category=category)
+    #Store the time and memory used by each stage, if configured
+    viz.tweedle.save_profile()
         
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Russian troll tweet analysis.")
+    parser.add_argument('--headless', action='store_true', help="print summaries instead of drawing charts")
+    parser.add_argument('--import-times', action='store_true', help="print the time taken to import each module and exit")
+    parser.add_argument('--report', default=None, help="render the charts to files in this directory instead of displaying them")
+    parser.add_argument('--workers', type=int, default=None, help="number of processes rendering the report, 0 renders in this process")
+    args = parser.parse_args()
+    
+    if args.import_times == True:
+        print(get_import_times(['TweetDataHandler', 'TweetCalculator', 'TweetVisualizer', 'TweetBenchmark', 'matplotlib.pyplot',
+                                'wordcloud', 'matplotlib_venn', 'textblob', 'nltk.corpus']).to_string())
+    else:
+        main(headless=args.headless, report_dir=args.report, workers=args.workers)
\ No newline at end of file
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import sys
+
+from os import path
+
+
+#The modules of the program are in the repository root rather than a package
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import os
+import pandas as pd
+import pytest
+
+from TweetCache import TweetCache
+from TweetDataHandler import TweetDataHandler
+
+
+@pytest.fixture
+def processed_frame():
+    """
+    Function to return a processed dataframe with a non-default index, a list column, a nested sentiment column and dates.
+    """
+    return pd.DataFrame({
+        'author': ['A', 'B', 'C'],
+        'following': [1, 20, 300],
+        'publish_date': pd.to_datetime(['2016-01-01 10:00', '2016-02-01 11:30', '2017-03-01 00:00']),
+        'hash_tags': [['MAGA', 'news'], [], ['vote']],
+        'processed_content': ['great news', None, 'vote today'],
+        'sentiment': [[0.8, 0.75, [(['great'], 0.8, 0.75, None)]], None, [0.0, 0.0, []]]
+        }, index=[5, 7, 11])
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    """
+    Function to return the path of a source file.
+    """
+    file = str(tmp_path / "tweets_1.csv")
+    with open(file, 'w') as f:
+        f.write("content\nfirst tweet\n")
+
+    return file
+
+
+def test_round_trip(tmp_path, processed_frame):
+    """
+    Test that a dataframe read from the cache matches the saved dataframe, with list columns as lists and nested columns as
+    the strings they would be in a CSV file.
+    """
+    cache = TweetCache(str(tmp_path) + "/", "processed_tweets")
+    cache.save(processed_frame, "fingerprint", str_columns=['sentiment'])
+    df = cache.load(list_columns=['hash_tags'])
+
+    expected = processed_frame.copy()
+    expected['sentiment'] = expected['sentiment'].astype(str).where(expected['sentiment'].notna())
+    assert list(df.columns) == list(processed_frame.columns)
+    assert df['hash_tags'].tolist() == processed_frame['hash_tags'].tolist()
+    pd.testing.assert_frame_equal(df.drop(columns='hash_tags'), expected.drop(columns='hash_tags'), check_dtype=False)
+    assert list(cache.load(columns=['author', 'following']).columns) == ['author', 'following']
+
+
+def test_fingerprint_invalidation(tmp_path, processed_frame, source_file):
+    """
+    Test that the cache is only valid for the fingerprint it was saved with, and that the fingerprint changes when a source
+    file or a setting changes.
+    """
+    settings = {"preproc_version": 3}
+    fingerprint = TweetCache.fingerprint([source_file], settings)
+    cache = TweetCache(str(tmp_path) + "/", "processed_tweets")
+    assert cache.is_valid(fingerprint) == False
+
+    cache.save(processed_frame, fingerprint, str_columns=['sentiment'])
+    assert cache.is_valid(fingerprint) == True
+    assert TweetCache.fingerprint([source_file], settings) == fingerprint
+    assert TweetCache.fingerprint([source_file], {"preproc_version": 4}) != fingerprint
+    assert TweetCache.fingerprint([source_file, source_file + ".missing"], settings) != fingerprint
+
+    with open(source_file, 'a') as f:
+        f.write("appended tweet\n")
+    assert cache.is_valid(TweetCache.fingerprint([source_file], settings)) == False
+
+    #An entry whose data file is missing is never valid
+    os.remove(cache.data_file)
+    assert cache.is_valid(fingerprint) == False
+
+
+def test_handler_fingerprint_uses_preproc_settings():
+    """
+    Test that the cache fingerprint of the data handler changes with the pre-processing settings only.
+    """
+    handler = TweetDataHandler()
+    fingerprint = handler.get_cache_fingerprint()
+
+    handler.config["isMsg"] = False
+    assert handler.get_cache_fingerprint() == fingerprint
+    handler.config["preproc_sentiment_fast"] = not handler.config["preproc_sentiment_fast"]
+    assert handler.get_cache_fingerprint() != fingerprint
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetCalculator import TweetCalculator
+
+
+CATEGORIES = ['LeftTroll', 'RightTroll', 'NewsFeed', 'Commercial']
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return tweets of 60 authors in random order, with distinct publish dates and distinct follower figures. Some
+    authors tweet in two account categories.
+    """
+    rng = np.random.default_rng(0)
+    rows = 600
+    authors = rng.integers(0, 60, size=rows)
+
+    return pd.DataFrame({
+        'author': ['AUTHOR_' + str(author) for author in authors],
+        'account_category': [CATEGORIES[(author + (row % 7 == 0)) % len(CATEGORIES)] for row, author in enumerate(authors)],
+        'publish_date': pd.Timestamp('2016-01-01') + pd.to_timedelta(rng.permutation(rows), unit='h'),
+        'following': rng.permutation(rows) * 3,
+        'followers': rng.permutation(rows) * 5
+        }, index=range(10, 10 + rows))
+
+
+def get_groupby_profiles(df):
+    """
+    Function to return the author profiles as built by the original groupby, merge and drop_duplicates steps.
+    """
+    author_df = df[['author', 'publish_date', 'account_category']]
+    author_df = author_df.groupby(by=['author', 'account_category'], as_index=False, observed=True).max()
+    profiles = author_df.merge(df[['author', 'publish_date', 'account_category', 'following', 'followers']],
+                               on=['author', 'account_category', 'publish_date'], how='left')
+
+    return profiles[['author', 'account_category', 'following', 'followers']].drop_duplicates()
+
+
+def sort_profiles(df):
+    """
+    Function to return profiles sorted by author and category, with a default index.
+    """
+    return df.sort_values(by=['author', 'account_category']).reset_index(drop=True)
+
+
+def test_profiles_match_groupby(tweets):
+    """
+    Test that the profiles built in one sorted pass match the original groupby profiles.
+    """
+    calc = TweetCalculator(tweets)
+
+    pd.testing.assert_frame_equal(sort_profiles(calc.tweeters_and_followers), sort_profiles(get_groupby_profiles(tweets)))
+
+
+def test_latest_date_ties_keep_one_profile(tweets):
+    """
+    Test that an author with several tweets at the latest date keeps one profile, from the last of those tweets.
+    """
+    latest = tweets['publish_date'].max()
+    tweets = pd.concat([tweets, pd.DataFrame({'author': ['TIED'] * 3, 'account_category': ['NewsFeed'] * 3,
+                                              'publish_date': [latest] * 3, 'following': [1, 2, 3],
+                                              'followers': [4, 5, 6]})], ignore_index=True)
+    profiles = TweetCalculator(tweets).tweeters_and_followers
+
+    assert profiles[profiles['author'] == 'TIED'][['following', 'followers']].values.tolist() == [[3, 6]]
+
+
+@pytest.mark.parametrize("top_k", [100, 5])
+def test_top_profiles_match_sort(tweets, top_k):
+    """
+    Test that the precomputed top profiles, and the profiles selected beyond them, match sorting the groupby profiles.
+    """
+    calc = TweetCalculator(tweets, top_k=top_k)
+    profiles = get_groupby_profiles(tweets)
+
+    for category in [None] + CATEGORIES + ['Unknown']:
+        category_profiles = profiles if category is None else profiles[profiles['account_category'] == category]
+        for sort_col in ['followers', 'following']:
+            for num in [1, 10, 80]:
+                expected = category_profiles.sort_values(by=sort_col, ascending=False).head(num)
+                top_profiles = calc.get_top_profiles(num, sort_col, category)
+                assert top_profiles[['author', 'account_category', sort_col]].values.tolist() == \
+                    expected[['author', 'account_category', sort_col]].values.tolist()
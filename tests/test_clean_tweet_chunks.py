@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import pandas as pd
+import pytest
+
+from TweetDataHandler import TweetDataHandler, tokenize_tweets
+
+
+#Stopwords of the test corpus, a fixed list so the test does not need the nltk corpora
+STOP = ['the', 'a', 'and', 'is', 'to', 'of', 'in', 'I', 'it', 'The']
+
+#Tweets covering each text pre-processing step, repeated so the corpus is split into several chunks
+CORPUS = [
+    "The quick brown fox jumps over the lazy dog",
+    "Check this out https://t.co/AbC123 #MAGA and #BlackLivesMatter!!!",
+    "RT @user: It is 2016... vote, vote, VOTE! http://bit.ly/x-y_z",
+    "#only #hashtags #here",
+    "",
+    None,
+    "Ünïcödé wörds — and émojis 🇺🇸 are kept?",
+    "I can't believe it's not butter; really.",
+    "   leading and trailing   spaces   ",
+    "a link inside text: see www.example.com/page?x=1 and ftp://files.example.org/file.txt now",
+    ]
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return the test corpus as a series with a non-default index, as the English tweets of the processed dataframe.
+    """
+    corpus = CORPUS * 25
+
+    return pd.Series(corpus, index=range(3, 3 + 2 * len(corpus), 2), name='processed_content', dtype=object)
+
+
+@pytest.fixture
+def handler():
+    """
+    Function to return a data handler splitting the text pre-processing into small chunks for two worker processes.
+    """
+    handler = TweetDataHandler()
+    handler.config["isMsg"] = False
+    handler.config["isParallelPreproc"] = True
+    handler.config["text_chunk_size"] = 7
+    handler.config["text_workers"] = 2
+
+    return handler
+
+
+def test_parallel_matches_serial(handler, tweets):
+    """
+    Test that the chunks processed by the process pool reassemble to the serial result, words and index.
+    """
+    serial = tokenize_tweets(tweets, STOP)
+    parallel = handler.clean_tweet_chunks(tweets, STOP, lemmatize=False)
+
+    pd.testing.assert_series_equal(parallel, serial)
+
+
+def test_parallel_keeps_index_order(handler, tweets):
+    """
+    Test that tweets without content are removed and the remaining tweets keep their index order.
+    """
+    parallel = handler.clean_tweet_chunks(tweets, STOP, lemmatize=False)
+
+    assert list(parallel.index) == [index for index, tweet in tweets.items() if isinstance(tweet, str)]
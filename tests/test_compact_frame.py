@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import pandas as pd
+import pytest
+
+from TweetDataHandler import TweetDataHandler
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return a small processed troll tweet dataframe with the index of the English tweets.
+    """
+    return pd.DataFrame({
+        'author': ['alpha', 'beta', 'alpha', 'gamma'],
+        'account_category': ['LeftTroll', 'RightTroll', 'LeftTroll', 'NewsFeed'],
+        'followers': [10, 2500, 10, 70000],
+        'hash_tags': [['MAGA', 'news'], [], ['news', 'news'], ['BlackLivesMatter']]
+        }, index=[2, 5, 6, 11])
+
+
+def set_processed_frame(handler, df):
+    """
+    Function to set the processed dataframe of a data handler as the end of tweet_pre_processing does, returns the frame
+    passed to the dataset.
+    """
+    handler.troll_tweet_df = df
+    handler.hashtag_index = handler.get_hashtag_index()
+    handler.hashtag_set_list = handler.get_cat_hash_tags()
+    if handler.config["isCompact"] == True:
+        handler.troll_tweet_df = handler.compact_frame(handler.troll_tweet_df)
+    handler.get_dataset().set_frame(handler.troll_tweet_df)
+    
+    return handler.troll_tweet_df
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_hash_tags_column(tweets, compact):
+    """
+    Test that the hash_tags column of the dataset matches the processed dataframe, with and without the compact layout.
+    """
+    handler = TweetDataHandler()
+    handler.config["isMsg"] = False
+    handler.config["isCompact"] = compact
+    frame = set_processed_frame(handler, tweets.copy())
+    
+    assert ('hash_tags' in frame.columns) != compact
+    hash_tags = handler.get_dataset().get_column('hash_tags')
+    
+    assert list(hash_tags.index) == list(tweets.index)
+    assert hash_tags.tolist() == tweets['hash_tags'].tolist()
+
+
+def test_compact_columns_with_hash_tags(tweets):
+    """
+    Test that hash tags requested with frame columns of a compact dataframe are aligned with the other columns.
+    """
+    handler = TweetDataHandler()
+    handler.config["isMsg"] = False
+    handler.config["isCompact"] = True
+    set_processed_frame(handler, tweets.copy())
+    
+    df = handler.get_dataset().get_columns(['author', 'hash_tags'])
+    
+    assert df['author'].astype(str).tolist() == tweets['author'].tolist()
+    assert df['hash_tags'].tolist() == tweets['hash_tags'].tolist()
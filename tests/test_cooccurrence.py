@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from collections import Counter
+from itertools import combinations
+from TweetCooccurrence import TweetCooccurrence
+from TweetHashtagIndex import TweetHashtagIndex
+
+
+#Hash tags of the tweets, including hash tags differing only in case
+TAGS = ['MAGA', 'maga', 'tcot', 'TCOT', 'news', 'vote', 'pjnet', 'blacklivesmatter', 'sports']
+
+CATEGORIES = ['LeftTroll', 'RightTroll', 'NewsFeed', None]
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return the hash tags and category of tweets, some tweets use a hash tag more than once, have no hash tags or
+    have no category.
+    """
+    rng = np.random.default_rng(0)
+    rows = 600
+
+    return pd.DataFrame({
+        'hash_tags': [list(rng.choice(TAGS, size=rng.integers(0, 6))) for row in range(rows)],
+        'account_category': [CATEGORIES[row % len(CATEGORIES)] for row in range(rows)]
+        }, index=range(20, 20 + rows))
+
+
+def get_counters(tweets, account_category=None):
+    """
+    Function to return a Counter of the pairs of distinct lower case hash tags of the tweets of a category, or of every tweet
+    if account_category is None, a Counter of the tweets containing each hash tag and the number of tweets.
+    """
+    if account_category is not None:
+        tweets = tweets[tweets['account_category'].map(lambda category: 'None' if pd.isna(category) else category) == account_category]
+    pairs, tags = Counter(), Counter()
+    for row_tags in tweets['hash_tags']:
+        row_tags = sorted(set(tag.lower() for tag in row_tags))
+        pairs.update(combinations(row_tags, 2))
+        tags.update(row_tags)
+
+    return (pairs, tags, len(tweets))
+
+
+@pytest.mark.parametrize("account_category", [None, 'LeftTroll', 'NewsFeed', 'None'])
+def test_counts_match_counter(tweets, account_category):
+    """
+    Test that the pairs and shared tweets of the matrix match a Counter of the hash tag pairs of the tweets, counted in one
+    chunk and in chunks by a pool of threads.
+    """
+    pairs = get_counters(tweets, account_category)[0]
+
+    for chunk_size, workers in [(100000, 1), (37, 4)]:
+        matrix = TweetCooccurrence.from_index(TweetHashtagIndex(tweets['hash_tags']), tweets['account_category'],
+                                              chunk_size=chunk_size, workers=workers)
+        frame = matrix.to_frame(account_category)
+        assert {tuple(sorted(pair)): count for pair, count in zip(zip(frame['tag'], frame['other_tag']), frame['tweets'])} == dict(pairs)
+
+
+@pytest.mark.parametrize("metric", ['tweets', 'jaccard', 'pmi'])
+def test_associated_weights_match_counter(tweets, metric):
+    """
+    Test that the hash tags associated with a hash tag and their weights match the weights computed from the Counters, ranked
+    by weight and then by shared tweets.
+    """
+    matrix = TweetCooccurrence.from_index(TweetHashtagIndex(tweets['hash_tags']), tweets['account_category'])
+
+    for account_category in [None, 'RightTroll']:
+        pairs, tags, num_tweets = get_counters(tweets, account_category)
+        for tag in ['maga', '#TCOT', 'vote']:
+            tag = tag.lstrip('#').lower()
+            expected = {}
+            for pair, count in pairs.items():
+                if tag in pair:
+                    other = pair[1] if pair[0] == tag else pair[0]
+                    if metric == 'tweets':
+                        expected[other] = float(count)
+                    elif metric == 'jaccard':
+                        expected[other] = count / (tags[tag] + tags[other] - count)
+                    else:
+                        expected[other] = np.log(count * num_tweets / (tags[tag] * tags[other]))
+
+            associated = matrix.associated(tag, num=len(TAGS), metric=metric, account_category=account_category)
+            assert sorted(associated.index) == sorted(expected)
+            assert np.allclose(associated[metric].to_numpy(), [expected[other] for other in associated.index])
+            assert associated['tweets'].to_dict() == {other: pairs[tuple(sorted((tag, other)))] for other in associated.index}
+            ranks = list(zip(associated[metric], associated['tweets']))
+            assert ranks == sorted(ranks, reverse=True)
+
+            top = matrix.associated(tag, num=2, metric=metric, account_category=account_category)
+            pd.testing.assert_frame_equal(top, associated.iloc[:2])
+
+
+def test_empty_queries(tweets):
+    """
+    Test that a num of zero or less, an unknown hash tag or an unknown category return no hash tags, and that an unknown
+    metric raises.
+    """
+    matrix = TweetCooccurrence.from_index(TweetHashtagIndex(tweets['hash_tags']), tweets['account_category'])
+
+    assert len(matrix.associated('maga', num=0)) == 0
+    assert len(matrix.associated('maga', num=-3)) == 0
+    assert len(matrix.top_pairs(num=-1)) == 0
+    assert len(matrix.associated('missing')) == 0
+    assert len(matrix.associated('maga', account_category='Commercial')) == 0
+    assert len(matrix.top_pairs(account_category='Commercial')) == 0
+
+    with pytest.raises(ValueError):
+        matrix.associated('maga', metric='lift')
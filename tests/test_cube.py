@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetCube import CUBE_COLUMNS, TweetCube
+from TweetVisualizer import TweetVisualizer
+
+
+CATEGORIES = ['LeftTroll', 'RightTroll', 'NewsFeed', 'Fearmonger']
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return processed tweets with repeated content, missing post types, regions, dates and content.
+    """
+    rng = np.random.default_rng(0)
+    rows = 500
+    dates = pd.Series(pd.Timestamp('2015-06-01') + pd.to_timedelta(rng.integers(0, 900, size=rows), unit='D'))
+    dates[::41] = pd.NaT
+
+    return pd.DataFrame({
+        'account_category': rng.choice(CATEGORIES, size=rows),
+        'class_sentiment': rng.choice(['positive', 'neutral', 'negative'], size=rows),
+        'post_type': rng.choice(np.array(['RETWEET', 'QUOTE_TWEET', None], dtype=object), size=rows),
+        'region': rng.choice(np.array(['United States', 'Unknown', None], dtype=object), size=rows),
+        'publish_date': dates.to_numpy(),
+        'processed_content': rng.choice(np.array(['vote today', 'fake news', 'great day', 'news', None], dtype=object), size=rows),
+        'hash_tags': [[] for row in range(rows)]
+        }, index=range(7, 7 + rows))
+
+
+def get_donut_counts(tweets):
+    """
+    Function to return the number of distinct tweets by account category and sentiment class, as the donut chart counted them
+    before the cube.
+    """
+    distinct_tweets = tweets[['processed_content', 'account_category', 'class_sentiment']].drop_duplicates()
+
+    return distinct_tweets.groupby(by=['account_category', 'class_sentiment']).count()['processed_content']
+
+
+def test_rollups_match_groupby(tweets):
+    """
+    Test that the rollups of the cube match value_counts and groupby counts of the tweets.
+    """
+    cube = TweetCube.from_frame(tweets[CUBE_COLUMNS])
+
+    assert cube.rollup([]) == len(tweets)
+    for dimension in ['account_category', 'class_sentiment', 'post_type', 'region']:
+        assert cube.value_counts(dimension).to_dict() == tweets[dimension].value_counts().to_dict()
+    assert cube.rollup(['account_category', 'region']).to_dict() == tweets.groupby(['account_category', 'region']).size().to_dict()
+    assert cube.value_counts('post_type', account_category='LeftTroll').to_dict() == \
+        tweets[tweets['account_category'] == 'LeftTroll']['post_type'].value_counts().to_dict()
+
+    months = tweets['publish_date'].dt.to_period('M').dt.start_time
+    assert cube.rollup('publish_month').to_dict() == months.value_counts().to_dict()
+
+    distinct = cube.rollup(['account_category', 'class_sentiment'], 'distinct')
+    assert distinct[distinct > 0].to_dict() == get_donut_counts(tweets).to_dict()
+
+    with pytest.raises(KeyError):
+        cube.slice(author='A')
+
+
+def test_chart_data_match_groupby(tweets):
+    """
+    Test that the horizontal bar and donut chart data read from the cube of the dataset match the groupby counts of the tweets.
+    """
+    viz = TweetVisualizer()
+    handler = viz.tweedle
+    handler.config["isMsg"] = False
+    handler.config["isCache"] = False
+    handler.troll_tweet_df = tweets
+    handler.hashtag_index = handler.get_hashtag_index()
+    handler.hashtag_set_list = handler.get_cat_hash_tags()
+    handler.get_dataset().set_frame(tweets)
+
+    assert viz.get_hbar_data('account_category')['counts'].to_dict() == tweets['account_category'].value_counts().to_dict()
+
+    counts = get_donut_counts(tweets)
+    assert viz.get_donut_data()['group_size'] == [counts.groupby(level='class_sentiment').sum()[sentiment]
+                                                  for sentiment in ['positive', 'neutral', 'negative']]
+    for category in CATEGORIES:
+        assert viz.get_donut_data(category)['group_size'] == [counts.loc[category][sentiment]
+                                                              for sentiment in ['positive', 'neutral', 'negative']]
+    with pytest.raises(KeyError):
+        viz.get_donut_data('Commercial')
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import pandas as pd
+import pytest
+
+from TweetDataHandler import TweetDataHandler
+
+
+def get_frame(contents, categories, dates):
+    """
+    Function to return a processed troll tweet dataframe with the columns used by the aggregates of the dataset.
+    """
+    return pd.DataFrame({
+        'author': ['author' + str(i % 3) for i in range(len(contents))],
+        'account_category': categories,
+        'class_sentiment': ['positive'] * len(contents),
+        'post_type': ['RETWEET'] * len(contents),
+        'region': ['United States'] * len(contents),
+        'publish_date': pd.to_datetime(dates),
+        'processed_content': contents,
+        'hash_tags': [[word.upper() for word in content.split()[:2]] for content in contents]
+        })
+
+
+def set_processed_frame(handler, df):
+    """
+    Method to set the processed dataframe of a data handler as the end of tweet_pre_processing does.
+    """
+    handler.troll_tweet_df = df
+    handler.hashtag_index = handler.get_hashtag_index()
+    handler.hashtag_set_list = handler.get_cat_hash_tags()
+    handler.get_dataset().set_frame(df)
+
+
+@pytest.fixture
+def handler():
+    """
+    Function to return a data handler that does not store aggregates in the processed data directory. Search queries are
+    split into words without the stopwords and lemmas, which need the nltk corpora.
+    """
+    handler = TweetDataHandler()
+    handler.config["isMsg"] = False
+    handler.config["isCache"] = False
+    handler.get_query_words = lambda query: query.split()
+
+    return handler
+
+
+def test_set_frame_rebuilds_aggregates(handler):
+    """
+    Test that the aggregates and indexes of the dataset are built from the new frame after the processed dataframe is replaced,
+    as an incremental run replaces it.
+    """
+    set_processed_frame(handler, get_frame(['cat dog', 'cat dog', 'bird fish'], ['LeftTroll', 'RightTroll', 'LeftTroll'],
+                                           ['2016-01-01', '2016-01-02', '2016-02-01']))
+    dataset = handler.get_dataset()
+    before = {
+        'cube': dataset.get_cube().rollup([]),
+        'hashtags': dataset.get_frequency_table('hashtags').sum().sum(),
+        'cooccurrence': dataset.get_hashtag_cooccurrence().associated('cat')['tweets'].sum(),
+        'time': dataset.get_time_counts(column=None).sum(),
+        'search': len(dataset.search_tweets('cat')),
+        'clusters': dataset.get_duplicate_clusters().nunique()
+        }
+
+    set_processed_frame(handler, get_frame(['cat dog', 'cat dog', 'bird fish', 'cat dog', 'eel cat'],
+                                           ['LeftTroll', 'RightTroll', 'LeftTroll', 'NewsFeed', 'NewsFeed'],
+                                           ['2016-01-01', '2016-01-02', '2016-02-01', '2016-03-01', '2016-03-02']))
+    after = {
+        'cube': dataset.get_cube().rollup([]),
+        'hashtags': dataset.get_frequency_table('hashtags').sum().sum(),
+        'cooccurrence': dataset.get_hashtag_cooccurrence().associated('cat')['tweets'].sum(),
+        'time': dataset.get_time_counts(column=None).sum(),
+        'search': len(dataset.search_tweets('cat')),
+        'clusters': dataset.get_duplicate_clusters().nunique()
+        }
+
+    assert before == {'cube': 3, 'hashtags': 6, 'cooccurrence': 2, 'time': 3, 'search': 2, 'clusters': 2}
+    assert after == {'cube': 5, 'hashtags': 10, 'cooccurrence': 4, 'time': 5, 'search': 4, 'clusters': 3}
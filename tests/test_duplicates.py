@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetDuplicates import TweetDuplicates, get_campaigns, union_find
+
+
+@pytest.fixture
+def planted():
+    """
+    Function to return tweets in random order with the group each tweet was planted in. Each group is a tweet of 20 distinct
+    words with exact copies and copies with one word replaced, the other tweets are unrelated tweets and tweets without words,
+    which are in groups of their own.
+    """
+    rng = np.random.default_rng(0)
+    vocabulary = np.array(['word' + str(num) for num in range(5000)], dtype=object)
+    content = []
+    groups = []
+    for group in range(30):
+        words = list(rng.choice(vocabulary, size=20, replace=False))
+        for copy in range(int(rng.integers(2, 8))):
+            copy_words = list(words)
+            if copy % 2 == 1:
+                copy_words[int(rng.integers(0, 20))] = 'edit' + str(group) + '_' + str(copy)
+            content.append(" ".join(copy_words))
+            groups.append(group)
+    for single in range(100):
+        content.append(" ".join(rng.choice(vocabulary, size=int(rng.integers(1, 25)), replace=False)))
+        groups.append(100 + single)
+    for empty in range(4):
+        content.append(None if empty % 2 == 0 else "")
+        groups.append(1000 + empty)
+
+    order = rng.permutation(len(content))
+
+    return pd.DataFrame({
+        'processed_content': pd.Series(content, dtype=object).to_numpy()[order],
+        'group': np.array(groups)[order],
+        'author': ['AUTHOR_' + str(num % 9) for num in range(len(content))],
+        'account_category': ['LeftTroll', 'RightTroll'] * (len(content) // 2)
+        }, index=range(10, 10 + len(content)))
+
+
+def get_partition(labels):
+    """
+    Function to return the set of row positions of each label.
+    """
+    return set(frozenset(rows) for rows in pd.Series(labels).groupby(labels).indices.values())
+
+
+def test_clusters_match_planted_groups(planted):
+    """
+    Test that the clusters are the planted groups, numbered in order of their first tweet, with the first tweet of each cluster
+    as its representative.
+    """
+    duplicates = TweetDuplicates()
+    clusters = duplicates.fit(planted['processed_content'])
+
+    assert clusters.index.equals(planted.index)
+    assert get_partition(clusters.to_numpy()) == get_partition(planted['group'].to_numpy())
+
+    first_rows = np.unique(clusters.to_numpy(), return_index=True)[1]
+    assert (np.diff(first_rows) > 0).all()
+    assert duplicates.get_representatives().tolist() == first_rows[clusters.to_numpy()].tolist()
+
+
+def test_union_find_matches_components():
+    """
+    Test that the roots of random edges are the smallest rows of the components found by a breadth-first search.
+    """
+    rng = np.random.default_rng(1)
+    num_rows = 300
+    left, right = rng.integers(0, num_rows, size=200), rng.integers(0, num_rows, size=200)
+
+    neighbours = {row: set() for row in range(num_rows)}
+    for a, b in zip(left, right):
+        neighbours[a].add(b)
+        neighbours[b].add(a)
+    expected = [None] * num_rows
+    for row in range(num_rows):
+        if expected[row] is None:
+            component, queue = {row}, [row]
+            while queue:
+                for other in neighbours[queue.pop()] - component:
+                    component.add(other)
+                    queue.append(other)
+            for member in component:
+                expected[member] = min(component)
+
+    assert union_find(num_rows, left, right).tolist() == expected
+
+
+def test_campaigns_match_groupby(planted):
+    """
+    Test that the campaigns are the clusters with enough tweets and authors, sorted by the number of tweets.
+    """
+    clusters = TweetDuplicates().fit(planted['processed_content'])
+    campaigns = get_campaigns(clusters, planted[['author', 'account_category', 'processed_content']], min_tweets=4, min_authors=3)
+
+    tweets = planted.assign(cluster=clusters.to_numpy()).groupby('cluster')
+    expected = tweets['author'].agg(['size', 'nunique'])
+    expected = expected[(expected['size'] >= 4) & (expected['nunique'] >= 3)]
+
+    assert len(campaigns) > 0
+    assert sorted(campaigns.index) == sorted(expected.index)
+    assert campaigns['tweets'].tolist() == sorted(campaigns['tweets'], reverse=True)
+    assert (campaigns['tweets'] == expected.loc[campaigns.index, 'size']).all()
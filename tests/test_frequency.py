@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from collections import Counter
+from TweetFrequency import get_frequencies, hashtag_frequencies, token_frequencies, wordcloud_frequencies
+from TweetHashtagIndex import TweetHashtagIndex
+
+
+#Words of the processed tweets, including plurals, numbers and stopwords of the word cloud
+WORDS = ['vote', 'votes', 'voter', 'news', 'new', 'class', 'clas', 'police', 'polices', '2016', '100', 'the', 'and', 'great',
+         'america', 'americas', 'people', 'would', 'dog', 'dogs', 'dogs']
+
+CATEGORIES = ['LeftTroll', 'RightTroll', 'NewsFeed', None]
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return processed tweets, hash tags and categories, some tweets have no content or no category.
+    """
+    rng = np.random.default_rng(0)
+    rows = 300
+    content = [" ".join(rng.choice(WORDS, size=rng.integers(0, 12))) for row in range(rows)]
+    content[::17] = [None] * len(content[::17])
+
+    return pd.DataFrame({
+        'processed_content': content,
+        'hash_tags': [list(rng.choice(['MAGA', 'maga', 'News', 'tcot', 'TCOT', 'vote'], size=rng.integers(0, 3))) for row in range(rows)],
+        'account_category': [CATEGORIES[row % len(CATEGORIES)] for row in range(rows)]
+        }, index=range(50, 50 + rows))
+
+
+def get_counters(tokens, categories):
+    """
+    Function to return a Counter of the tokens of each category, and of every category as None.
+    """
+    counters = {None: Counter()}
+    for row_tokens, category in zip(tokens, categories):
+        counters.setdefault('None' if pd.isna(category) else category, Counter()).update(row_tokens)
+        counters[None].update(row_tokens)
+
+    return counters
+
+
+def test_token_frequencies_match_counter(tweets):
+    """
+    Test that the token frequency table matches a Counter of the words of each category.
+    """
+    table = token_frequencies(tweets['processed_content'], tweets['account_category'])
+    counters = get_counters([text.split() if isinstance(text, str) else [] for text in tweets['processed_content']],
+                            tweets['account_category'])
+
+    assert sorted(table.columns) == sorted(category for category in counters if category is not None)
+    for category, counter in counters.items():
+        assert get_frequencies(table, category).to_dict() == dict(counter)
+    assert len(get_frequencies(table, 'Commercial')) == 0
+
+
+def test_hashtag_frequencies_match_counter(tweets):
+    """
+    Test that the hash tag frequency table matches a Counter of the lower case hash tags of each category.
+    """
+    table = hashtag_frequencies(TweetHashtagIndex(tweets['hash_tags']), tweets['account_category'])
+    counters = get_counters([[tag.lower() for tag in tags] for tags in tweets['hash_tags']], tweets['account_category'])
+
+    for category, counter in counters.items():
+        assert get_frequencies(table, category).to_dict() == dict(counter)
+
+
+def test_wordcloud_frequencies_match_process_text(tweets):
+    """
+    Test that the word cloud counts of each category match the counts WordCloud computes from the joined tweet text, without
+    collocations.
+    """
+    from wordcloud import STOPWORDS, WordCloud
+
+    table = token_frequencies(tweets['processed_content'], tweets['account_category'])
+    for category in [None, 'LeftTroll', 'RightTroll', 'NewsFeed']:
+        texts = tweets['processed_content'] if category is None else tweets[tweets['account_category'] == category]['processed_content']
+        expected = WordCloud(collocations=False, stopwords=STOPWORDS).process_text(" ".join(texts.dropna()))
+        assert wordcloud_frequencies(table, category, STOPWORDS) == expected
+
+
+def test_frequency_tables_are_cached(tmp_path, tweets, monkeypatch):
+    """
+    Test that the frequency tables stored by one dataset are read back by a new dataset without being built again.
+    """
+    import TweetDataset
+    from TweetDataHandler import TweetDataHandler
+
+    tables = {}
+    for run in range(2):
+        handler = TweetDataHandler()
+        handler.my_path = str(tmp_path) + "/"
+        handler.config["isMsg"] = False
+        handler.troll_tweet_df = tweets
+        handler.hashtag_index = handler.get_hashtag_index()
+        handler.hashtag_set_list = handler.get_cat_hash_tags()
+        handler.get_dataset().set_frame(tweets)
+        tables[run] = {kind: handler.get_dataset().get_frequency_table(kind) for kind in ['tokens', 'hashtags']}
+
+        #The second dataset fails if it builds a table
+        monkeypatch.setattr(TweetDataset, "token_frequencies", None)
+        monkeypatch.setattr(TweetDataset, "hashtag_frequencies", None)
+
+    for kind in ['tokens', 'hashtags']:
+        pd.testing.assert_frame_equal(tables[1][kind], tables[0][kind], check_index_type=False)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import re
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetDataHandler import TweetDataHandler
+from TweetHashtagIndex import TweetHashtagIndex
+
+
+#Tweet content covering the hash tag edge cases of the source data
+CONTENT = [
+    "#MAGA and #maga are different tags",
+    "no tags here",
+    None,
+    "repeated #tag #tag twice",
+    "##double and a#b and # alone",
+    "#Ünïcödé #日本 #tag_with_underscore #2016",
+    np.nan,
+    "trailing punctuation #end. #comma, #bang!",
+    "",
+    "https://t.co/abc#fragment #real",
+    ]
+
+
+def get_regex_hash_tags(content):
+    """
+    Function to return the hash tags of each tweet found by the regular expression of the original loop, tweets without
+    content have an empty list.
+    """
+    return [re.findall(r"#(\w+)", tweet) if isinstance(tweet, str) else [] for tweet in content]
+
+
+@pytest.fixture
+def handler():
+    """
+    Function to return a data handler that does not print status messages.
+    """
+    handler = TweetDataHandler()
+    handler.config["isMsg"] = False
+
+    return handler
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return a source dataframe of the test content with a non-default index.
+    """
+    return pd.DataFrame({
+        'content': pd.Series(CONTENT * 3, dtype=object),
+        'account_category': ['LeftTroll', 'RightTroll', 'NewsFeed'] * 10
+        }, index=range(100, 100 + 3 * len(CONTENT) * 3, 3))
+
+
+def test_hash_tags_match_regex(handler, tweets):
+    """
+    Test that the vectorized hash tags of each tweet match the regular expression of the original loop, with an empty list for
+    tweets without content, and that the distinct hash tags match.
+    """
+    hash_tags, distinct_hash_tags = handler.get_hash_tags(tweets, "content")
+    expected = get_regex_hash_tags(tweets['content'])
+
+    assert hash_tags.index.equals(tweets.index)
+    assert hash_tags.tolist() == expected
+    assert distinct_hash_tags == set(tag for tags in expected for tag in tags)
+
+
+def test_put_hash_tags_keeps_rows(handler, tweets):
+    """
+    Test that every row is kept with its own hash tags when the hash tags are joined to the dataframe.
+    """
+    df, distinct_hash_tags = handler.put_hash_tags(tweets, "content")
+
+    assert df.index.equals(tweets.index)
+    assert df['hash_tags'].tolist() == get_regex_hash_tags(tweets['content'])
+    assert sorted(distinct_hash_tags) == sorted(set(df['hash_tags'].explode().dropna()))
+
+
+def test_index_matches_scan(handler, tweets):
+    """
+    Test that the rows, counts and frequencies read from the inverted index match a scan of the hash tag lists.
+    """
+    df = handler.put_hash_tags(tweets, "content")[0]
+    index = TweetHashtagIndex(df['hash_tags'])
+
+    for tag in set(df['hash_tags'].explode().dropna()):
+        rows = [row for row, tags in enumerate(df['hash_tags']) if tag in tags]
+        assert index.tweet_rows(tag).tolist() == rows
+        assert index.tweet_rows('#' + tag).tolist() == rows
+        assert index.tweet_index(tag).tolist() == df.index[rows].tolist()
+        assert index.tweet_counts(df, tag, 'account_category').to_dict() == df.iloc[rows]['account_category'].value_counts().to_dict()
+    assert len(index.tweet_rows('missing')) == 0
+
+    assert index.to_lists().tolist() == df['hash_tags'].tolist()
+    assert index.tag_frequencies().to_dict() == df['hash_tags'].explode().dropna().value_counts().to_dict()
+    mask = (df['account_category'] == 'LeftTroll').to_numpy()
+    assert index.distinct_tags(mask) == set(df[mask]['hash_tags'].explode().dropna())
+
+
+@pytest.fixture
+def category_tags():
+    """
+    Function to return a dataframe of random hash tag lists by account category. The number of hash tags is not a multiple
+    of eight, one category of cat_list has no tweets and one category of the tweets is not in cat_list.
+    """
+    rng = np.random.default_rng(0)
+    categories = ['Fearmonger', 'HashtagGamer', 'LeftTroll', 'NewsFeed', 'RightTroll', 'Unknown']
+
+    return pd.DataFrame({
+        'account_category': rng.choice(categories, size=400),
+        'hash_tags': [list(rng.choice(['tag' + str(num) for num in range(203)], size=rng.integers(0, 4))) for i in range(400)]
+        }, index=range(1000, 1400))
+
+
+def test_bitsets_match_sets(handler, category_tags):
+    """
+    Test that the hash tag sets of each category and the overlap matrices computed with bitsets match Python set operations.
+    """
+    handler.troll_tweet_df = category_tags
+    handler.hashtag_index = TweetHashtagIndex(category_tags['hash_tags'])
+    expected = [set(category_tags[category_tags['account_category'] == category]['hash_tags'].explode().dropna())
+                for category in handler.cat_list]
+
+    assert handler.get_cat_hash_tags() == expected
+    assert expected[handler.cat_list.index('Commercial')] == set()
+
+    intersection = TweetHashtagIndex.bitset_overlap(handler.category_bitsets, handler.cat_list)
+    jaccard = TweetHashtagIndex.bitset_overlap(handler.category_bitsets, handler.cat_list, metric='jaccard')
+    for row, first in zip(handler.cat_list, expected):
+        for col, second in zip(handler.cat_list, expected):
+            assert intersection.loc[row, col] == len(first & second)
+            assert jaccard.loc[row, col] == pytest.approx(len(first & second) / len(first | second) if first | second else 0)
+
+    with pytest.raises(ValueError):
+        TweetHashtagIndex.bitset_overlap(handler.category_bitsets, handler.cat_list, metric='cosine')
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import pandas as pd
+import pytest
+
+import TweetCache
+import TweetDataHandler as data_handler
+from TweetBenchmark import generate_tweets
+from TweetDataHandler import TweetDataHandler
+
+
+#Stopwords of the test corpus, a fixed list so the test does not need the nltk corpora
+STOP = frozenset(['the', 'a', 'is', 'are', 'to', 'of', 'and', 'in'])
+
+
+@pytest.fixture(autouse=True)
+def text_steps(monkeypatch):
+    """
+    Function to replace the stopwords and lemmas with fixed values, as they need the nltk corpora. Words are kept as their own
+    lemma.
+    """
+    monkeypatch.setattr(data_handler, "get_stopwords", lambda: STOP)
+    monkeypatch.setattr(TweetCache, "lemmatize_words", lambda words: list(words))
+
+
+def get_handler(my_path, incremental):
+    """
+    Function to return a data handler reading two source files in my_path.
+    """
+    handler = TweetDataHandler()
+    handler.my_path = my_path
+    handler.data_sources['troll_tweets'][0][2] = 2
+    handler.config.update({"isMsg": False, "isSavePreproc": False, "isProfile": False, "isIncremental": incremental,
+                           "preproc_sentiment_fast": True})
+
+    return handler
+
+
+def test_incremental_run_matches_full_run(tmp_path):
+    """
+    Test that an incremental run after a new source file is added and rows are appended to an existing file processes only the
+    new rows, and returns the same processed tweets and distinct hash tags as pre-processing every file again.
+    """
+    my_path = str(tmp_path) + "/"
+    first_file = my_path + "\\data\\IRAhandle_tweets_1.csv"
+    tweets = generate_tweets(260, seed=1)
+    tweets.iloc[:200].to_csv(first_file, index=False)
+    get_handler(my_path, True).run_pre_processing()
+
+    #Append rows to the first file and add a second file
+    tweets.iloc[200:].to_csv(first_file, mode='a', header=False, index=False)
+    generate_tweets(120, seed=2).to_csv(my_path + "\\data\\IRAhandle_tweets_2.csv", index=False)
+
+    handler = get_handler(my_path, True)
+    processed_rows = []
+    process_tweet_frame = handler.process_tweet_frame
+    handler.process_tweet_frame = lambda df: processed_rows.append(len(df)) or process_tweet_frame(df)
+    incremental_df, incremental_hashtags = handler.run_pre_processing()
+    full_df, full_hashtags = get_handler(my_path, False).run_pre_processing()
+
+    assert sorted(processed_rows) == [60, 120]
+    assert incremental_df.index.equals(full_df.index)
+    assert set(incremental_hashtags) == set(full_hashtags)
+    assert incremental_df['hash_tags'].tolist() == full_df['hash_tags'].tolist()
+
+    #Nested sentiment columns are read back from the processed parts as the strings they would be in a CSV file
+    for col in ['sentiment', 'sent_assessments']:
+        full_df[col] = full_df[col].astype(str).where(full_df[col].notna())
+    pd.testing.assert_frame_equal(incremental_df.drop(columns='hash_tags'), full_df.drop(columns='hash_tags'), check_dtype=False)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetStatistics import FollowStatistics, KLLSketch, RunningMoments
+
+
+#Quantiles compared with the exact quantiles of the values
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+@pytest.fixture
+def values():
+    """
+    Function to return skewed values, as the followers figures are.
+    """
+    return np.random.default_rng(0).lognormal(7, 1.5, size=100000)
+
+
+def get_rank_error(sketch, values):
+    """
+    Function to return the largest normalized rank error of the quantiles estimated by a sketch, and of the ranks it estimates
+    for the exact quantiles.
+    """
+    sorted_values = np.sort(values)
+    quantile_ranks = np.searchsorted(sorted_values, sketch.quantile(QUANTILES), side='right') / len(values)
+    exact_quantiles = np.quantile(values, QUANTILES)
+    exact_ranks = np.searchsorted(sorted_values, exact_quantiles, side='right') / len(values)
+    estimated_ranks = np.array([sketch.rank(value) for value in exact_quantiles])
+
+    return max(np.abs(quantile_ranks - QUANTILES).max(), np.abs(estimated_ranks - exact_ranks).max())
+
+
+def test_exact_before_compaction():
+    """
+    Test that the quantiles are exact while the sketch holds every value.
+    """
+    values = np.random.default_rng(1).integers(0, 1000, size=150).astype(np.float64)
+    sketch = KLLSketch(k=200).update(np.append(values, np.nan))
+
+    assert sketch.n == 150
+    assert sketch.quantile(QUANTILES).tolist() == np.quantile(values, QUANTILES, method='inverted_cdf').tolist()
+    assert np.isnan(KLLSketch().quantile(0.5))
+
+
+def test_rank_error_bound(values):
+    """
+    Test that the rank error of a sketch updated in chunks is within twice the approximate error bound, in a bounded number
+    of items.
+    """
+    sketch = KLLSketch(k=200, seed=0)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+
+    assert sketch.n == len(values)
+    assert sketch.size() < 4 * sketch.k
+    assert get_rank_error(sketch, values) <= 2 * sketch.error_bound()
+    assert get_rank_error(KLLSketch(k=KLLSketch.k_for_error(0.02), seed=0).update(values), values) <= 2 * 0.02
+
+
+def test_merge(values):
+    """
+    Test that sketches and statistics built on separate chunks merge into the statistics of all the values.
+    """
+    chunks = np.array_split(values, 10)
+    sketch = KLLSketch(k=200, seed=0)
+    moments = RunningMoments()
+    for num, chunk in enumerate(chunks):
+        sketch.merge(KLLSketch(k=200, seed=num).update(chunk))
+        moments.merge(RunningMoments().update(chunk))
+
+    assert sketch.n == len(values)
+    assert sketch.size() < 4 * sketch.k
+    assert get_rank_error(sketch, values) <= 2 * sketch.error_bound()
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.variance() == pytest.approx(values.var())
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+
+def test_follow_statistics_merge(values):
+    """
+    Test that follow statistics merged from chunks of tweets match the moments of each category.
+    """
+    df = pd.DataFrame({
+        'account_category': np.where(np.arange(len(values)) % 3 == 0, 'LeftTroll', 'RightTroll'),
+        'followers': values.astype(np.int64),
+        'following': values[::-1].astype(np.int64)
+        })
+    statistics = FollowStatistics()
+    for start in range(0, len(df), 30000):
+        statistics.merge(FollowStatistics().update(df.iloc[start:start + 30000]))
+
+    for category in [None, 'LeftTroll', 'RightTroll']:
+        rows = df if category is None else df[df['account_category'] == category]
+        for column in ['followers', 'following']:
+            moments, sketch = statistics.get_statistics(category, column)
+            assert moments.count == sketch.n == len(rows)
+            assert moments.sum == rows[column].sum()
+            assert abs(sketch.rank(rows[column].median()) - 0.5) <= 2 * sketch.error_bound()
+        assert statistics.follow_ratio(category) == pytest.approx(rows['followers'].sum() / rows['following'].sum())
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import gc
+import tracemalloc
+import pandas as pd
+import pytest
+
+import TweetCache
+import TweetDataHandler as data_handler
+from TweetDataHandler import TweetDataHandler
+
+
+#Stopwords of the test corpus, a fixed list so the test does not need the nltk corpora
+STOP = frozenset(['the', 'a', 'and', 'is', 'to', 'of', 'in'])
+
+#Rows in each chunk of the test corpus
+CHUNK_SIZE = 200
+
+
+def get_chunk(chunk_num):
+    """
+    Function to return a chunk of troll tweet source data. Every tweet and one word of every tweet are new, while the
+    authors, categories and hash tags are repeated, so only the text caches would grow with the number of chunks.
+    """
+    rows = range(chunk_num * CHUNK_SIZE, (chunk_num + 1) * CHUNK_SIZE)
+
+    return pd.DataFrame({
+        'external_author_id': [str(row % 10) for row in rows],
+        'author': ['author' + str(row % 10) for row in rows],
+        'content': ['the great new story number' + str(row) + ' #tag' + str(row % 7) for row in rows],
+        'region': ['United States'] * CHUNK_SIZE,
+        'language': ['English'] * CHUNK_SIZE,
+        'publish_date': pd.to_datetime(['2016-01-01'] * CHUNK_SIZE) + pd.to_timedelta(list(rows), unit='min'),
+        'harvested_date': pd.to_datetime(['2016-02-01'] * CHUNK_SIZE),
+        'following': [row % 100 for row in rows],
+        'followers': [row % 50 for row in rows],
+        'updates': [row for row in rows],
+        'post_type': ['RETWEET'] * CHUNK_SIZE,
+        'account_type': ['Right'] * CHUNK_SIZE,
+        'new_june_2018': [0] * CHUNK_SIZE,
+        'retweet': [1] * CHUNK_SIZE,
+        'account_category': [['LeftTroll', 'RightTroll'][row % 2] for row in rows]
+        }, index=pd.RangeIndex(rows.start, rows.stop))
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    """
+    Function to return a data handler streaming the test corpus with caches in a temporary directory. Words are kept as their
+    own lemma, as lemmatization needs the nltk corpora.
+    """
+    monkeypatch.setattr(data_handler, "get_stopwords", lambda: STOP)
+    monkeypatch.setattr(TweetCache, "lemmatize_words", lambda words: list(words))
+
+    handler = TweetDataHandler()
+    handler.my_path = str(tmp_path) + "/"
+    handler.config["isMsg"] = False
+    handler.config["isProfile"] = False
+    handler.config["isSavePreproc"] = False
+    handler.config["stream_cache_size"] = CHUNK_SIZE
+
+    return handler
+
+
+def get_stream_peak(handler, chunks):
+    """
+    Function to return the peak memory allocated while streaming a number of chunks of the test corpus.
+    """
+    handler.lemma_cache = None
+    handler.sentiment_cache = None
+    handler.iter_troll_tweet_chunks = lambda chunk_size: (get_chunk(chunk_num) for chunk_num in range(chunks))
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        aggregator = handler.stream_pre_processing(CHUNK_SIZE)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert aggregator.rows == chunks * CHUNK_SIZE
+
+    return peak
+
+
+def test_stream_peak_memory_does_not_grow_with_chunks(handler):
+    """
+    Test that the peak memory of streaming four times as many chunks stays close to the peak memory of the shorter run, and
+    that the text caches hold at most "stream_cache_size" entries. The untrimmed caches of the longer run would hold several
+    thousand more lemmas and sentiment scores. The sentiment lexicon, which is loaded once per process, is loaded first.
+    """
+    handler.get_tweet_sentiment("great")
+    short_peak = get_stream_peak(handler, 3)
+    long_peak = get_stream_peak(handler, 12)
+
+    assert long_peak < short_peak * 1.5
+    assert len(handler.lemma_cache.lemmas) <= CHUNK_SIZE
+    assert all(len(scores) <= CHUNK_SIZE for scores in handler.sentiment_cache.scores.values())
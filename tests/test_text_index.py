@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from itertools import product
+from TweetTextIndex import TweetTextIndex
+
+
+#Words of the processed tweets, a small vocabulary so that words repeat within and across tweets
+WORDS = ['vote', 'fake', 'news', 'great', 'day', 'dog']
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return processed tweets with a non-default index, some tweets have no content.
+    """
+    rng = np.random.default_rng(0)
+    content = [" ".join(rng.choice(WORDS, size=rng.integers(0, 8))) for row in range(400)]
+    content[::23] = [None] * len(content[::23])
+
+    return pd.Series(content, index=range(1000, 1400), name='processed_content', dtype=object)
+
+
+def get_queries():
+    """
+    Function to return the queries of one to three words, including repeated words and a word that is not indexed.
+    """
+    words = WORDS[:4] + ['missing']
+
+    return [list(query) for size in [1, 2, 3] for query in product(words, repeat=size)]
+
+
+def scan(tweets, words, mode):
+    """
+    Function to return the row positions of the tweets matching a query, found by scanning the words of every tweet.
+    """
+    rows = []
+    for row, content in enumerate(tweets):
+        tokens = content.split() if isinstance(content, str) else []
+        if mode == 'and':
+            matched = all(word in tokens for word in words)
+        elif mode == 'or':
+            matched = any(word in tokens for word in words)
+        else:
+            matched = any(tokens[start:start + len(words)] == words for start in range(len(tokens)))
+        if matched:
+            rows.append(row)
+
+    return rows
+
+
+@pytest.mark.parametrize("mode", ['and', 'or', 'phrase'])
+def test_search_matches_scan(tweets, mode):
+    """
+    Test that the rows of AND, OR and phrase queries read from the index match a scan of the tweets, with and without a mask.
+    """
+    index = TweetTextIndex.from_series(tweets)
+    mask = np.arange(len(tweets)) % 3 != 0
+
+    for words in get_queries():
+        expected = scan(tweets, words, mode)
+        assert index.search(words, mode).tolist() == expected
+        assert index.search(words, mode, mask=mask).tolist() == [row for row in expected if mask[row]]
+    assert index.tweet_index(index.search(['vote'])).tolist() == tweets.index[scan(tweets, ['vote'], 'and')].tolist()
+    assert len(index.search([], mode)) == 0
+
+
+def test_saved_index_matches(tmp_path, tweets):
+    """
+    Test that an index loaded memory-mapped from its files gives the same results, and is only loaded with its fingerprint.
+    """
+    cache_dir = str(tmp_path) + "/"
+    index = TweetTextIndex.from_series(tweets)
+    index.save(cache_dir, "text_index", "fingerprint")
+    loaded = TweetTextIndex.load(cache_dir, "text_index", "fingerprint")
+
+    assert isinstance(loaded.postings_rows, np.memmap)
+    for words, mode in product(get_queries()[::7], ['and', 'or', 'phrase']):
+        assert loaded.search(words, mode).tolist() == index.search(words, mode).tolist()
+    assert TweetTextIndex.load(cache_dir, "text_index", "other fingerprint") is None
+    assert TweetTextIndex.load(cache_dir, "missing_index") is None
+
+    with pytest.raises(ValueError):
+        index.search(['vote'], mode='near')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import numpy as np
+import pandas as pd
+import pytest
+
+from TweetTimeIndex import DATE_FORMAT, TweetTimeIndex, parse_dates
+
+
+@pytest.fixture
+def tweets():
+    """
+    Function to return tweets with publish dates at minute resolution in the format of the source files, some of them
+    missing or not matching the format, and an account category.
+    """
+    rng = np.random.default_rng(0)
+    rows = 2000
+    dates = pd.Timestamp('2016-01-01') + pd.to_timedelta(rng.integers(0, 60 * 24 * 20, size=rows), unit='min')
+    date_strings = pd.Series(dates.strftime(DATE_FORMAT), dtype=object)
+    date_strings[::97] = None
+    date_strings[5::151] = "not a date"
+
+    return pd.DataFrame({
+        'publish_date': date_strings.to_numpy(),
+        'account_category': rng.choice(['LeftTroll', 'RightTroll', 'NewsFeed'], size=rows)
+        }, index=range(3, 3 + 2 * rows, 2))
+
+
+@pytest.fixture
+def ranges():
+    """
+    Function to return ranges of publish dates, including open, empty and reversed ranges and bounds on a tweet's date.
+    """
+    return [(None, None), ('2016-01-05', None), (None, '2016-01-05'), ('2016-01-03 10:15', '2016-01-11 08:00'),
+            ('2016-01-04', '2016-01-04'), ('2016-01-10', '2016-01-02'), ('2015-01-01', '2015-02-01'),
+            ('2016-01-07 13:00', '2016-01-07 13:01')]
+
+
+def test_parse_dates_match_to_datetime(tweets):
+    """
+    Test that the dates parsed once per distinct string match parsing every string.
+    """
+    expected = pd.to_datetime(tweets['publish_date'], format=DATE_FORMAT, errors='coerce')
+
+    pd.testing.assert_series_equal(parse_dates(tweets['publish_date']), expected, check_dtype=False)
+
+
+def test_range_rows_match_mask(tweets, ranges):
+    """
+    Test that the rows of each date range read from the index match a boolean mask over the parsed dates, in date order.
+    """
+    dates = parse_dates(tweets['publish_date'])
+    index = TweetTimeIndex(dates)
+
+    for start, end in ranges:
+        mask = dates.notna()
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates < pd.Timestamp(end)
+        expected = np.flatnonzero(mask.to_numpy())
+        expected = expected[np.argsort(dates.to_numpy()[expected], kind='stable')]
+
+        assert index.range_rows(start, end).tolist() == expected.tolist()
+        assert index.range_index(start, end).tolist() == tweets.index[expected].tolist()
+
+        #Filtering a list of rows keeps the order of the list
+        rows = np.arange(len(tweets))[::-3]
+        assert index.filter_rows(rows, start, end).tolist() == [row for row in rows if mask.iloc[row]]
+
+
+def test_counts_match_groupby(tweets, ranges):
+    """
+    Test that the counts per day of each date range match grouping the masked dates by day.
+    """
+    dates = parse_dates(tweets['publish_date'])
+    index = TweetTimeIndex(dates)
+
+    assert index.get_partitions().sum() == dates.notna().sum()
+    for start, end in ranges:
+        mask = dates.notna()
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates < pd.Timestamp(end)
+        days = dates[mask].dt.floor('D')
+
+        assert index.counts(start, end).to_dict() == days.value_counts().sort_index().to_dict()
+        expected = pd.crosstab(days, tweets['account_category'][mask]).to_dict('index')
+        assert index.counts(start, end, by=tweets['account_category']).to_dict('index') == expected
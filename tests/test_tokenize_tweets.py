@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Cole Thompson
+"""
+#Import modules
+import json
+import pandas as pd
+import pytest
+
+from os import path
+from TweetDataHandler import tokenize_tweets
+
+
+#Tweets and their processed content from the text pre-processing steps before tokenize_tweets, which rebuilt each tweet with
+#str.replace, split and join for every step, with the nltk english stopwords and without lemmatization. Processed content is
+#null for tweets removed from the series.
+GOLDEN_FILE = path.join(path.dirname(path.abspath(__file__)), 'data', 'golden_clean_tweets.json')
+
+
+@pytest.fixture(scope='module')
+def golden():
+    """
+    Function to return the golden stopwords, tweets and processed content.
+    """
+    with open(GOLDEN_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_matches_golden(golden, dtype):
+    """
+    Test that tokenize_tweets returns the processed content of the previous pre-processing steps for every golden tweet, and
+    removes the same tweets, for tweets held as objects or as strings.
+    """
+    tweets = pd.Series(golden['tweets'], dtype=dtype, name='processed_content')
+    processed = tokenize_tweets(tweets, golden['stopwords']).map(" ".join)
+    expected = {i: text for i, text in enumerate(golden['processed']) if text is not None}
+    
+    assert list(processed.index) == list(expected)
+    mismatches = [(i, golden['tweets'][i], processed[i], text) for i, text in expected.items() if processed[i] != text]
+    assert mismatches == []